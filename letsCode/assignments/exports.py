@@ -0,0 +1,68 @@
+from django.db.models import Prefetch
+
+from questions.exports import (
+    EXPORT_CHUNK_SIZE,
+    QUESTION_EXPORT_FIELDS,
+    question_rows,
+)
+from questions.models import Question
+
+from .models import Assignment, AssignmentEnrollment
+
+ASSIGNMENT_EXPORT_FIELDS = ["id", "title", "description", "creator", "questions"]
+ENROLLMENT_EXPORT_FIELDS = ["id", "user", "assignment", "status", "enrollment_date"]
+
+
+def assignment_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over every assignment with the ids of its questions, for export.
+
+    Rows are read through a server-side cursor ``chunk_size`` at a time and
+    the question ids of each chunk are loaded with one extra query.
+
+    Args:
+    - chunk_size (int): Rows fetched from the database per round trip.
+
+    Yields:
+    - dict: One row per assignment, keyed by ``ASSIGNMENT_EXPORT_FIELDS``.
+    """
+    queryset = (
+        Assignment.objects.order_by("id")
+        .only("id", "title", "description", "creator_id")
+        .prefetch_related(
+            Prefetch("questions", queryset=Question.objects.only("id").order_by("id"))
+        )
+    )
+    for assignment in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            "id": assignment.id,
+            "title": assignment.title,
+            "description": assignment.description,
+            "creator": assignment.creator_id,
+            "questions": [question.id for question in assignment.questions.all()],
+        }
+
+
+def enrollment_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over every enrollment, for export.
+
+    Args:
+    - chunk_size (int): Rows fetched from the database per round trip.
+
+    Yields:
+    - dict: One row per enrollment, keyed by ``ENROLLMENT_EXPORT_FIELDS``.
+    """
+    return (
+        AssignmentEnrollment.objects.order_by("id")
+        .values(*ENROLLMENT_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+# Export name -> (column names, row iterator factory).
+EXPORTS = {
+    "questions": (QUESTION_EXPORT_FIELDS, question_rows),
+    "assignments": (ASSIGNMENT_EXPORT_FIELDS, assignment_rows),
+    "enrollments": (ENROLLMENT_EXPORT_FIELDS, enrollment_rows),
+}
@@ -0,0 +1,165 @@
+"""
+Per-assignment leaderboards, maintained as scores are written.
+
+Each scored enrollment has a ``LeaderboardEntry``, and ``ScoreBucket`` keeps
+how many entries of an assignment share each score. Both are updated in the
+same transaction as the score, so reads never sort the enrollments:
+
+* the top N entries are an index range scan of ``leaderboard_rank_idx``;
+* a rank is one plus the sizes of the buckets above the score, found
+  through the bucket table's unique index.
+
+Ties share a rank ("1, 2, 2, 4"); within a tie the entry that reached the
+score first is listed first.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import AssignmentEnrollment, LeaderboardEntry, ScoreBucket
+
+
+def _add_to_bucket(assignment_id, score, delta):
+    buckets = ScoreBucket.objects.filter(assignment_id=assignment_id, score=score)
+    if buckets.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ScoreBucket.objects.create(
+                assignment_id=assignment_id, score=score, count=delta
+            )
+    except IntegrityError:
+        # Created concurrently since the UPDATE above.
+        buckets.update(count=F("count") + delta)
+
+
+@transaction.atomic
+def record_score(enrollment, score):
+    """
+    Place an enrollment on its leaderboard with a new score.
+
+    Args:
+    - enrollment (AssignmentEnrollment): The enrollment that was scored.
+    - score (int): Its new score.
+    """
+    entry = (
+        LeaderboardEntry.objects.select_for_update()
+        .filter(enrollment_id=enrollment.id)
+        .first()
+    )
+    if entry is None:
+        LeaderboardEntry.objects.create(
+            enrollment_id=enrollment.id,
+            assignment_id=enrollment.assignment_id,
+            user_id=enrollment.user_id,
+            score=score,
+            scored_at=timezone.now(),
+        )
+        _add_to_bucket(enrollment.assignment_id, score, 1)
+    elif entry.score != score:
+        _add_to_bucket(entry.assignment_id, entry.score, -1)
+        _add_to_bucket(entry.assignment_id, score, 1)
+        entry.score = score
+        entry.scored_at = timezone.now()
+        entry.save(update_fields=["score", "scored_at"])
+
+
+def rank_for_score(assignment_id, score):
+    """
+    Return the rank an entry with ``score`` holds on a leaderboard.
+    """
+    above = ScoreBucket.objects.filter(
+        assignment_id=assignment_id, score__gt=score
+    ).aggregate(total=Sum("count"))["total"]
+    return 1 + (above or 0)
+
+
+def top(assignment_id, limit):
+    """
+    Return the best ``limit`` entries of an assignment's leaderboard.
+
+    Args:
+    - assignment_id (int): The assignment.
+    - limit (int): How many entries to return.
+
+    Returns:
+    - list: Dicts with ``rank``, ``user``, ``username`` and ``score``.
+    """
+    rows = (
+        LeaderboardEntry.objects.filter(assignment_id=assignment_id)
+        .order_by("-score", "scored_at")
+        .values_list("user_id", "user__username", "score")[:limit]
+    )
+    entries = []
+    for position, (user_id, username, score) in enumerate(rows, start=1):
+        if entries and entries[-1]["score"] == score:
+            rank = entries[-1]["rank"]
+        else:
+            rank = position
+        entries.append(
+            {"rank": rank, "user": user_id, "username": username, "score": score}
+        )
+    return entries
+
+
+def rank_of(assignment_id, user_id):
+    """
+    Return a user's place on an assignment's leaderboard.
+
+    Returns:
+    - dict: ``rank`` and ``score``, or None if the user is not ranked.
+    """
+    entry = (
+        LeaderboardEntry.objects.filter(assignment_id=assignment_id, user_id=user_id)
+        .order_by("-score", "scored_at")
+        .values_list("score", flat=True)
+        .first()
+    )
+    if entry is None:
+        return None
+    return {"rank": rank_for_score(assignment_id, entry), "score": entry}
+
+
+@transaction.atomic
+def rebuild(assignment_id):
+    """
+    Recompute an assignment's leaderboard from its graded submissions.
+
+    For recovery, and after scores are rewritten in bulk.
+
+    Returns:
+    - int: The number of entries written.
+    """
+    LeaderboardEntry.objects.filter(assignment_id=assignment_id).delete()
+    ScoreBucket.objects.filter(assignment_id=assignment_id).delete()
+
+    scored = (
+        AssignmentEnrollment.objects.filter(
+            assignment_id=assignment_id, submissions__status="graded"
+        )
+        .values("id", "user_id", "score")
+        .annotate(
+            scored_at=Coalesce(
+                Max("submissions__graded_at"), Max("submissions__submitted_at")
+            )
+        )
+    )
+    entries = LeaderboardEntry.objects.bulk_create(
+        LeaderboardEntry(
+            enrollment_id=row["id"],
+            assignment_id=assignment_id,
+            user_id=row["user_id"],
+            score=row["score"],
+            scored_at=row["scored_at"],
+        )
+        for row in scored.iterator()
+    )
+    ScoreBucket.objects.bulk_create(
+        ScoreBucket(assignment_id=assignment_id, score=row["score"], count=row["n"])
+        for row in LeaderboardEntry.objects.filter(assignment_id=assignment_id)
+        .values("score")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    return len(entries)
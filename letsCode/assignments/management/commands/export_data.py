@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from assignments.exports import EXPORTS
+from letsCode.streaming import FORMATS, encode_rows
+
+
+class Command(BaseCommand):
+    help = "Stream an export of questions, assignments or enrollments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=sorted(EXPORTS))
+        parser.add_argument("--fmt", choices=sorted(FORMATS), default="ndjson")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument(
+            "--output", default="-", help="File to write to, '-' for stdout."
+        )
+
+    def handle(self, *args, **options):
+        fields, rows = EXPORTS[options["resource"]]
+        chunks = encode_rows(rows(), fields, options["fmt"], options["gzip"])
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
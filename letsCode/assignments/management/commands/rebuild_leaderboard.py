@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from assignments import leaderboard
+from assignments.models import Assignment
+
+
+class Command(BaseCommand):
+    help = "Rebuild assignment leaderboards from their graded submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "assignments",
+            nargs="*",
+            type=int,
+            help="Ids of the assignments to rebuild, all of them if omitted.",
+        )
+
+    def handle(self, *args, **options):
+        ids = options["assignments"] or Assignment.objects.order_by("id").values_list(
+            "id", flat=True
+        )
+        for assignment_id in ids:
+            entries = leaderboard.rebuild(assignment_id)
+            self.stdout.write(f"Assignment {assignment_id}: {entries} entries.")
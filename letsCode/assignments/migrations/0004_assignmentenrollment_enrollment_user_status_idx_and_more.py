@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assignments", "0003_alter_assignmentenrollment_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="assignmentenrollment",
+            index=models.Index(
+                fields=["user", "status", "id"], name="enrollment_user_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignmentenrollment",
+            index=models.Index(
+                fields=["assignment", "status"], name="enrollment_assign_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignmentenrollment",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["id"],
+                name="enrollment_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.5 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "assignments",
+            "0004_assignmentenrollment_enrollment_user_status_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignmentenrollment",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assignments", "0006_leaderboard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
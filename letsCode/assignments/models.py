@@ -1,6 +1,9 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 
+from letsCode.cache import bump_version_on_commit
 from questions.models import Question
 
 
@@ -9,6 +12,9 @@ class Assignment(models.Model):
     description = models.TextField()
     creator = models.ForeignKey(User, on_delete=models.CASCADE)
     questions = models.ManyToManyField(Question, related_name="assignemt")
+    # AssignmentSerializer.update saves the assignment when only its
+    # questions change as well, which keeps the list ETag current.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
@@ -21,12 +27,105 @@ class AssignmentEnrollment(models.Model):
         ("pending", "Pending"),
         ("approved", "Approved"),
         ("attempted", "attempted"),
+        ("rejected", "Rejected"),
     )
+    # Status -> statuses it may move to.
+    TRANSITIONS = {
+        "pending": ("approved", "rejected"),
+        "approved": ("attempted",),
+        "attempted": (),
+        "rejected": (),
+    }
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
     enrollment_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
-    # score = models.IntegerField(default=0)
+    score = models.IntegerField(default=0)
 
     objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # A user's enrollments in one status, in page order.
+            models.Index(
+                fields=["user", "status", "id"], name="enrollment_user_status_idx"
+            ),
+            # An assignment's enrollments in one status, for bulk status changes.
+            models.Index(
+                fields=["assignment", "status"], name="enrollment_assign_status_idx"
+            ),
+            # The pending enrollments queue, in page order.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="pending"),
+                name="enrollment_pending_idx",
+            ),
+        ]
+
+    @classmethod
+    def sources_for(cls, status):
+        """Return the statuses that are allowed to move to ``status``."""
+        return [
+            source for source, targets in cls.TRANSITIONS.items() if status in targets
+        ]
+
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS[self.status]
+
+
+class LeaderboardEntry(models.Model):
+    """
+    An enrollment's place on its assignment's leaderboard.
+
+    Entries are written whenever a graded score is, see ``leaderboard``.
+    """
+
+    enrollment = models.OneToOneField(
+        AssignmentEnrollment, on_delete=models.CASCADE, related_name="leaderboard"
+    )
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    score = models.IntegerField()
+    # When the current score was reached; earlier ones rank first in a tie.
+    scored_at = models.DateTimeField()
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # The leaderboard itself, best first.
+            models.Index(
+                fields=["assignment", "-score", "scored_at"],
+                name="leaderboard_rank_idx",
+            ),
+        ]
+
+
+class ScoreBucket(models.Model):
+    """
+    How many leaderboard entries of an assignment have a given score.
+
+    A rank is one plus the entries in higher buckets, so it is found by
+    summing a handful of rows instead of counting every better entry.
+    """
+
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assignment", "score"], name="score_bucket_unique_score"
+            ),
+        ]
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(m2m_changed, sender=Assignment.questions.through)
+def invalidate_assignment_lists(sender, **kwargs):
+    bump_version_on_commit("assignments")
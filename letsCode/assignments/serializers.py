@@ -1,8 +1,17 @@
+from collections.abc import Mapping
+
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.serializers import ValidationError
 
+from letsCode.rendering import value_rows
+from letsCode.sparse_fields import SparseFieldsMixin
 from questions.models import Question
-from questions.serializers import QuestionSerializer
+from questions.serializers import (
+    QUESTION_VALUES,
+    QuestionSerializer,
+    question_values,
+)
 
 from .models import Assignment, AssignmentEnrollment
 
@@ -10,37 +19,253 @@ from .models import Assignment, AssignmentEnrollment
 class AssignmentEnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = AssignmentEnrollment
-        fields = ["id", "assignment", "status", "user"]
+        fields = ["id", "assignment", "status", "user", "score"]
+        read_only_fields = ["score"]
+
+
+# AssignmentEnrollmentSerializer's fields and the columns behind them, for
+# list views that render ``.values()`` rows with ``letsCode.rendering``.
+ENROLLMENT_VALUES = {
+    "id": "id",
+    "assignment": "assignment_id",
+    "status": "status",
+    "user": "user_id",
+    "score": "score",
+}
+
+
+class EnrollmentStatusChangeSerializer(serializers.Serializer):
+    """
+    Serializer for moving many enrollments to a new status at once.
+
+    Fields:
+    - status (str): The status to move the enrollments to.
+    - ids (list): Ids of the enrollments to move.
+    - assignment (int): Move the enrollments of this assignment.
+
+    At least one of ``ids`` and ``assignment`` is required; when both are
+    given only enrollments matching both are moved.
+    """
+
+    status = serializers.ChoiceField(choices=AssignmentEnrollment.STATUS_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False
+    )
+    assignment = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        if "ids" not in data and "assignment" not in data:
+            raise ValidationError("Either ids or assignment is required.")
+        if not AssignmentEnrollment.sources_for(data["status"]):
+            raise ValidationError(
+                f"No enrollment can be moved to \"{data['status']}\"."
+            )
+        return data
+
+
+# The fields AssignmentSerializer reads back other than ``questions``, for
+# list views that render ``.values()`` rows, see ``with_active_questions``.
+ASSIGNMENT_LIST_VALUES = {"id": "id", "title": "title", "description": "description"}
+
+# What ``?fields=`` may name on assignment endpoints, see
+# letsCode.sparse_fields.
+ASSIGNMENT_FIELDS = {
+    **dict.fromkeys(ASSIGNMENT_LIST_VALUES),
+    "questions": list(QUESTION_VALUES),
+}
+
+
+def assignment_values(fields):
+    """
+    Return the ``ASSIGNMENT_LIST_VALUES`` of some ``requested_fields``.
+    """
+    return {
+        name: ASSIGNMENT_LIST_VALUES[name]
+        for name in fields
+        if name in ASSIGNMENT_LIST_VALUES
+    }
+
+
+def active_question_rows(assignment_ids, values=QUESTION_VALUES):
+    """
+    Query the live questions of some assignments as ``.values_list()`` rows.
+
+    Args:
+    - assignment_ids (list): Ids of the assignments.
+    - values (dict): The ``QUESTION_VALUES`` to fetch.
+
+    Returns:
+    - QuerySet: ``(assignment id, *question columns)`` tuples, in question id
+      order.
+    """
+    Through = Assignment.questions.through
+    return (
+        Through.objects.filter(
+            assignment_id__in=assignment_ids, question__isDeleted=False
+        )
+        .order_by("question_id")
+        .values_list(
+            "assignment_id",
+            *(f"question__{column}" for column in values.values()),
+        )
+    )
+
+
+def attach_questions(assignments, question_rows, values=QUESTION_VALUES):
+    """
+    Add their ``questions`` to ``.values()`` rows of assignments.
 
+    Args:
+    - assignments (list): Rows with at least the assignment ids.
+    - question_rows (iterable): Their ``active_question_rows``.
+    - values (dict): The ``QUESTION_VALUES`` the question rows hold.
 
-class AssignmentSerializer(serializers.ModelSerializer):
-    questions = QuestionSerializer(many=True)
+    Returns:
+    - list: The assignments.
+    """
+    questions = {assignment["id"]: [] for assignment in assignments}
+    for assignment_id, *columns in question_rows:
+        questions[assignment_id].append(dict(zip(values, columns)))
+    for assignment in assignments:
+        assignment["questions"] = questions[assignment["id"]]
+    return assignments
+
+
+def with_active_questions(assignments, fields=ASSIGNMENT_FIELDS):
+    """
+    Add their questions to a page of assignment rows in one query, if the
+    ``requested_fields`` include them.
+    """
+    assignments = list(assignments)
+    if not assignments or "questions" not in fields:
+        return assignments
+    values = question_values(fields["questions"])
+    ids = [assignment["id"] for assignment in assignments]
+    return attach_questions(assignments, active_question_rows(ids, values), values)
+
+
+async def awith_active_questions(assignments, fields=ASSIGNMENT_FIELDS):
+    """
+    Async variant of ``with_active_questions``.
+    """
+    assignments = list(assignments)
+    if not assignments or "questions" not in fields:
+        return assignments
+    values = question_values(fields["questions"])
+    ids = [assignment["id"] for assignment in assignments]
+    rows = [row async for row in active_question_rows(ids, values)]
+    return attach_questions(assignments, rows, values)
+
+
+def assignment_rows(assignments, fields=ASSIGNMENT_FIELDS):
+    """
+    Turn assignment rows, completed by ``with_active_questions``, into the
+    output of ``AssignmentSerializer`` narrowed to ``fields``, with soft-deleted
+    questions left out.
+    """
+    values = assignment_values(fields)
+    if "questions" in fields:
+        values["questions"] = "questions"
+    return value_rows(assignments, values)
+
+
+class AssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for creating and updating assignments.
+
+    Questions are read back nested, but attached by id through the write-only
+    ``question_ids`` list. All ids are resolved in a single query and any that
+    do not match a live question are reported together. Nested ``questions``
+    are rejected rather than ignored, so that clients still sending them learn
+    that they were not attached.
+    """
+
+    questions = QuestionSerializer(many=True, read_only=True)
+    question_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        write_only=True,
+        required=False,
+    )
 
     class Meta:
         model = Assignment
-        fields = ["id", "title", "description", "questions"]
+        fields = ["id", "title", "description", "questions", "question_ids"]
 
-    def create(self, validated_data):
-        questions_data = validated_data.pop("questions", [])
-        assignment = Assignment.objects.create(**validated_data)
-
-        question_titles = [question_data["title"] for question_data in questions_data]
-        questions = Question.objects.filter(title__in=question_titles)
+    def to_internal_value(self, data):
+        if isinstance(data, Mapping) and "questions" in data:
+            raise ValidationError(
+                {
+                    "questions": [
+                        "Questions are attached by id: send their ids as "
+                        "question_ids instead."
+                    ]
+                }
+            )
+        return super().to_internal_value(data)
 
-        assignment.questions.add(*questions)
+    def validate_question_ids(self, value):
+        question_ids = list(dict.fromkeys(value))
+        found = set(
+            Question.objects.filter(id__in=question_ids, isDeleted=False).values_list(
+                "id", flat=True
+            )
+        )
+        unknown = [
+            question_id for question_id in question_ids if question_id not in found
+        ]
+        if unknown:
+            raise ValidationError(
+                "Unknown question ids: " + ", ".join(str(i) for i in unknown) + "."
+            )
+        return question_ids
 
+    @transaction.atomic
+    def create(self, validated_data):
+        question_ids = validated_data.pop("question_ids", [])
+        assignment = Assignment.objects.create(**validated_data)
+        self.attach_questions(assignment, question_ids)
         return assignment
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.title = validated_data.get("title", instance.title)
         instance.description = validated_data.get("description", instance.description)
+        instance.save()
 
-        existing_questions = instance.questions.all()
-        questions_data = validated_data.get("questions", [])
+        question_ids = validated_data.get("question_ids")
+        if question_ids is not None:
+            Through = Assignment.questions.through
+            current = set(
+                Through.objects.filter(assignment_id=instance.id).values_list(
+                    "question_id", flat=True
+                )
+            )
+            removed = current.difference(question_ids)
+            if removed:
+                Through.objects.filter(
+                    assignment_id=instance.id, question_id__in=removed
+                ).delete()
+            self.attach_questions(
+                instance,
+                [
+                    question_id
+                    for question_id in question_ids
+                    if question_id not in current
+                ],
+            )
 
-        new_questions = [Question.objects.get(title=q["title"]) for q in questions_data]
+        return instance
 
-        instance.questions.set(new_questions)
+    def attach_questions(self, assignment, question_ids):
+        """
+        Insert the through rows for ``question_ids`` in one statement.
 
-        instance.save()
-        return instance
+        Args:
+        - assignment (Assignment): The assignment to attach questions to.
+        - question_ids (list): Ids of questions not yet attached.
+        """
+        Through = Assignment.questions.through
+        Through.objects.bulk_create(
+            Through(assignment_id=assignment.id, question_id=question_id)
+            for question_id in question_ids
+        )
@@ -1,3 +1,775 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from letsCode import datagen, loadtest, metrics
+from letsCode.testing import (
+    QueryBudgetAssertionsMixin,
+    QueryPlanAssertionsMixin,
+    handlers_without_budget,
+)
+from questions.models import Question
+from user_profile.authentication import issue_tokens
+
+from .models import Assignment, AssignmentEnrollment
+from .serializers import AssignmentEnrollmentSerializer, AssignmentSerializer
+
+
+class AssignmentListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user("creator", password="secret")
+        cls.active = Question.objects.create(title="active", data={}, type="mcq")
+        cls.deleted = Question.objects.create(
+            title="deleted", data={}, type="mcq", isDeleted=True
+        )
+
+    def create_assignments(self, count):
+        assignments = Assignment.objects.bulk_create(
+            Assignment(title=f"a{i}", description="", creator=self.creator)
+            for i in range(count)
+        )
+        Through = Assignment.questions.through
+        Through.objects.bulk_create(
+            Through(assignment_id=assignment.id, question_id=question.id)
+            for assignment in assignments
+            for question in (self.active, self.deleted)
+        )
+
+    def get_all(self, path):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, {"page_size": 1000})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"], len(queries)
+
+    def test_query_count_does_not_grow_with_assignments(self):
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            with self.subTest(path=path):
+                Assignment.objects.all().delete()
+                self.create_assignments(10)
+                small, small_queries = self.get_all(path)
+
+                self.create_assignments(1000 - 10)
+                large, large_queries = self.get_all(path)
+
+                self.assertEqual((len(small), len(large)), (10, 1000))
+                self.assertEqual(large_queries, small_queries)
+
+    def test_soft_deleted_questions_are_left_out(self):
+        self.create_assignments(1)
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            (assignment,), _ = self.get_all(path)
+            self.assertEqual(
+                assignment["questions"],
+                [{"id": self.active.id, "title": "active", "data": {}, "type": "mcq"}],
+            )
+
+
+class EnrollmentQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        users = User.objects.bulk_create(User(username=f"u{i}") for i in range(50))
+        question = Question.objects.create(title="q", data={}, type="mcq")
+        assignments = Assignment.objects.bulk_create(
+            Assignment(title=f"a{i}", description="", creator=cls.admin)
+            for i in range(20)
+        )
+        Through = Assignment.questions.through
+        Through.objects.bulk_create(
+            Through(assignment_id=assignment.id, question_id=question.id)
+            for assignment in assignments
+        )
+        statuses = ["pending", "approved", "attempted", "rejected"]
+        AssignmentEnrollment.objects.bulk_create(
+            AssignmentEnrollment(
+                user=users[i % len(users)],
+                assignment=assignments[i % len(assignments)],
+                status=statuses[i % len(statuses)],
+            )
+            for i in range(2000)
+        )
+        cls.user = users[0]
+        cls.assignment = assignments[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def assertRequestUsesIndexes(self, client, method, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(path, data, format="json")
+        self.assertLess(response.status_code, 400)
+        self.assertNoFullScans(context.captured_queries)
+
+    def test_user_enrollments_use_an_index(self):
+        self.assertRequestUsesIndexes(
+            self.client_for(self.user), "get", "/api/user-enrollments/"
+        )
+
+    def test_pending_enrollments_use_an_index(self):
+        self.assertRequestUsesIndexes(
+            self.client_for(self.admin), "get", "/api/enrollments/"
+        )
+
+    def test_assignment_list_uses_an_index(self):
+        self.assertRequestUsesIndexes(
+            self.client_for(self.admin), "get", "/api/assignments/"
+        )
+
+    def test_bulk_status_change_uses_an_index(self):
+        self.assertRequestUsesIndexes(
+            self.client_for(self.admin),
+            "post",
+            "/api/enrollments/bulk-status/",
+            {"status": "approved", "assignment": self.assignment.id},
+        )
+
+
+class EnrollmentStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.assignments = [
+            Assignment.objects.create(title=f"a{i}", description="", creator=cls.admin)
+            for i in range(2)
+        ]
+        cls.enrollments = {}
+        for assignment in cls.assignments:
+            for status in ("pending", "approved", "attempted", "rejected"):
+                user = User.objects.create_user(f"{assignment.title}-{status}")
+                cls.enrollments[
+                    assignment.title, status
+                ] = AssignmentEnrollment.objects.create(
+                    user=user, assignment=assignment, status=status
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def bulk_status(self, **data):
+        return self.client.post("/api/enrollments/bulk-status/", data, format="json")
+
+    def statuses(self):
+        return {
+            key: AssignmentEnrollment.objects.get(id=enrollment.id).status
+            for key, enrollment in self.enrollments.items()
+        }
+
+    def test_can_transition_to(self):
+        for source, allowed in (
+            ("pending", {"approved", "rejected"}),
+            ("approved", {"attempted"}),
+            ("attempted", set()),
+            ("rejected", set()),
+        ):
+            enrollment = AssignmentEnrollment(status=source)
+            for target, _ in AssignmentEnrollment.STATUS_CHOICES:
+                with self.subTest(source=source, target=target):
+                    self.assertEqual(
+                        enrollment.can_transition_to(target), target in allowed
+                    )
+
+    def test_only_allowed_sources_are_moved(self):
+        ids = [enrollment.id for enrollment in self.enrollments.values()]
+        missing = max(ids) + 1
+        before = self.statuses()
+
+        response = self.bulk_status(status="attempted", ids=ids + [missing])
+        self.assertEqual(response.status_code, 200, response.content)
+        # One approved enrollment per assignment; the other 6 and the unknown
+        # id are skipped.
+        self.assertEqual(
+            response.json(), {"status": "attempted", "transitioned": 2, "skipped": 7}
+        )
+        expected = {
+            key: "attempted" if status == "approved" else status
+            for key, status in before.items()
+        }
+        self.assertEqual(self.statuses(), expected)
+
+    def test_assignment_filter(self):
+        first, second = self.assignments
+        response = self.bulk_status(status="approved", assignment=first.id)
+        self.assertEqual(
+            response.json(), {"status": "approved", "transitioned": 1, "skipped": 3}
+        )
+        statuses = self.statuses()
+        self.assertEqual(statuses["a0", "pending"], "approved")
+        self.assertEqual(statuses["a1", "pending"], "pending")
+
+        # With ids too, only the ids of that assignment are moved.
+        ids = [self.enrollments["a0", "approved"].id]
+        ids.append(self.enrollments["a1", "approved"].id)
+        response = self.bulk_status(status="attempted", ids=ids, assignment=second.id)
+        self.assertEqual(
+            response.json(), {"status": "attempted", "transitioned": 1, "skipped": 1}
+        )
+        statuses = self.statuses()
+        self.assertEqual(statuses["a0", "approved"], "approved")
+        self.assertEqual(statuses["a1", "approved"], "attempted")
+
+    def test_invalid_requests_are_rejected(self):
+        for data in (
+            {"status": "approved"},
+            {"status": "pending", "assignment": self.assignments[0].id},
+            {"status": "approved", "ids": []},
+            {"status": "unknown", "ids": [1]},
+        ):
+            with self.subTest(**data):
+                self.assertEqual(self.bulk_status(**data).status_code, 400)
+        self.assertEqual(
+            set(self.statuses().values()),
+            {"pending", "approved", "attempted", "rejected"},
+        )
+
+    def test_single_updates_refuse_disallowed_transitions(self):
+        enrollment = self.enrollments["a0", "rejected"]
+        response = self.client.put(
+            f"/api/enrollments/{enrollment.id}/", {"status": "approved"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        enrollment = self.enrollments["a0", "pending"]
+        response = self.client.put(
+            f"/api/enrollments/{enrollment.id}/", {"status": "rejected"}, format="json"
+        )
+        self.assertEqual(response.json()["status"], "rejected")
+
+
+class LoadTestScenarioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = datagen.generate(scale=0.01, seed=1)
+        cls.context = loadtest.prepare(cls.dataset, submissions=1)
+
+    def test_every_route_has_a_scenario(self):
+        self.assertEqual(
+            [
+                name
+                for name in loadtest.discover_routes()
+                if name not in loadtest.SCENARIOS
+            ],
+            [],
+        )
+
+    def test_scenarios_get_their_expected_status(self):
+        for name, scenario in loadtest.SCENARIOS.items():
+            request = scenario(self.context, 0)
+            kwargs = {}
+            if request["token"]:
+                token = self.context["tokens"][request["token"]]
+                kwargs["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            if "data" in request:
+                kwargs["data"] = json.dumps(request["data"])
+                kwargs["content_type"] = "application/json"
+            response = getattr(self.client, request["method"])(
+                request["path"], **kwargs
+            )
+            self.assertEqual(response.status_code, request["status"], name)
+
+    def test_generation_is_reproducible(self):
+        def questions():
+            return list(
+                Question.objects.order_by("id").values_list(
+                    "title", "type", "data", "isDeleted"
+                )
+            )
+
+        generated = questions()
+        Question.objects.all().delete()
+        User.objects.filter(username__startswith="load1-").delete()
+        datagen.generate(scale=0.01, seed=1)
+        self.assertEqual(questions(), generated)
+
+
+class AssignmentQueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = loadtest.prepare(datagen.generate(scale=0.02), submissions=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def send(self, method, path, role, data=None):
+        kwargs = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.context['tokens'][role]}",
+        }
+        if data is not None:
+            kwargs.update(data=json.dumps(data), content_type="application/json")
+        return self.assertWithinQueryBudget(method, path, **kwargs)
+
+    def test_every_view_declares_a_budget(self):
+        self.assertEqual(handlers_without_budget("assignments.views"), [])
+
+    def test_load_test_requests_stay_within_budget(self):
+        for name, scenario in loadtest.SCENARIOS.items():
+            request = scenario(self.context, 0)
+            path = request["path"].split("?")[0]
+            if resolve(path).func.__module__ != "assignments.views":
+                continue
+            response = self.send(
+                request["method"].upper(),
+                request["path"],
+                request["token"],
+                request.get("data"),
+            )
+            self.assertEqual(response.status_code, request["status"], name)
+
+    def test_writes_stay_within_budget(self):
+        assignment_id = self.context["assignments"][0]
+        enrollment_id = self.context["enrollments"][0]
+        edit = f"/api/edit-assignment/{assignment_id}/"
+        assignment = {
+            "title": "edited",
+            "description": "edited",
+            "question_ids": self.context["questions"][:10],
+        }
+        self.assertEqual(self.send("PUT", edit, "admin", assignment).status_code, 200)
+        response = self.send("PATCH", edit, "admin", {"title": "patched"})
+        self.assertEqual(response.status_code, 200)
+
+        enrollment = {
+            "assignment": assignment_id,
+            "user": User.objects.get(username="load-submitter").id,
+            "status": "pending",
+        }
+        response = self.send("POST", "/api/enrollments/", "admin", enrollment)
+        self.assertEqual(response.status_code, 201)
+        detail = f"/api/enrollments/{response.json()['id']}/"
+        self.assertEqual(self.send("PUT", detail, "admin", {}).status_code, 200)
+        response = self.send("DELETE", f"/api/enrollments/{enrollment_id}/", "admin")
+        self.assertEqual(response.status_code, 204)
+
+
+class AssignmentWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.questions = [
+            Question.objects.create(title=f"q{i}", data={}, type="mcq")
+            for i in range(4)
+        ]
+        cls.deleted = Question.objects.create(
+            title="deleted", data={}, type="mcq", isDeleted=True
+        )
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def send(self, method, path, data):
+        return self.client.generic(
+            method,
+            path,
+            json.dumps(data),
+            content_type="application/json",
+            **self.auth,
+        )
+
+    def held(self, assignment_id):
+        Through = Assignment.questions.through
+        return dict(
+            Through.objects.filter(assignment_id=assignment_id).values_list(
+                "question_id", "id"
+            )
+        )
+
+    def test_nested_questions_are_rejected(self):
+        response = self.send(
+            "POST",
+            "/api/create-assignment/",
+            {
+                "title": "a",
+                "description": "d",
+                "questions": [{"title": "q0", "data": {}, "type": "mcq"}],
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("question_ids", response.json()["questions"][0])
+        self.assertFalse(Assignment.objects.exists())
+
+    def test_unknown_and_deleted_question_ids_are_reported_together(self):
+        missing = self.deleted.id + 100
+        response = self.send(
+            "POST",
+            "/api/create-assignment/",
+            {
+                "title": "a",
+                "description": "d",
+                "question_ids": [self.questions[0].id, self.deleted.id, missing],
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["question_ids"],
+            [f"Unknown question ids: {self.deleted.id}, {missing}."],
+        )
+        self.assertFalse(Assignment.objects.exists())
+
+    def test_updates_only_add_and_remove_the_difference(self):
+        q0, q1, q2, q3 = (question.id for question in self.questions)
+        response = self.send(
+            "POST",
+            "/api/create-assignment/",
+            {"title": "a", "description": "d", "question_ids": [q0, q1, q2]},
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        assignment_id = response.json()["id"]
+        before = self.held(assignment_id)
+
+        response = self.send(
+            "PATCH",
+            f"/api/edit-assignment/{assignment_id}/",
+            {"question_ids": [q1, q3, q2, q3]},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [question["id"] for question in response.json()["questions"]],
+            [q1, q2, q3],
+        )
+        after = self.held(assignment_id)
+        self.assertEqual(set(after), {q1, q2, q3})
+        # The questions kept are not detached and attached again.
+        self.assertEqual((after[q1], after[q2]), (before[q1], before[q2]))
+
+        response = self.send(
+            "PATCH", f"/api/edit-assignment/{assignment_id}/", {"title": "b"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.held(assignment_id), after)
+
+
+class AssignmentWriteBudgetTests(QueryBudgetAssertionsMixin, TransactionTestCase):
+    """
+    Writes outside a test transaction, where atomic blocks start real
+    transactions rather than savepoints.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", password="secret")
+        self.questions = Question.objects.bulk_create(
+            Question(title=f"q{i}", data={}, type="mcq") for i in range(3)
+        )
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def send(self, method, path, data):
+        with self.assertNoLogs("letsCode.timing", "WARNING"):
+            return self.assertWithinQueryBudget(
+                method,
+                path,
+                data=json.dumps(data),
+                content_type="application/json",
+                **self.auth,
+            )
+
+    def test_writes_stay_within_budget(self):
+        ids = [question.id for question in self.questions]
+        assignment = {"title": "a", "description": "d", "question_ids": ids[:2]}
+        response = self.send("POST", "/api/create-assignment/", assignment)
+        self.assertEqual(response.status_code, 201)
+        edit = f"/api/edit-assignment/{response.json()['id']}/"
+        response = self.send("PATCH", edit, {"question_ids": ids[1:]})
+        self.assertEqual(response.status_code, 200)
+
+
+class ListRenderingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = loadtest.prepare(datagen.generate(scale=0.02), submissions=3)
+        Question.objects.filter(id__in=cls.context["questions"][::3]).update(
+            isDeleted=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertPagesMatch(self, path, role, serialize):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.context['tokens'][role]}")
+        url = path + "?page_size=1"
+        pages = 0
+        while url:
+            response = client.get(url)
+            body = response.json()
+            expected = {
+                "next": body["next"],
+                "previous": body["previous"],
+                "results": serialize([row["id"] for row in body["results"]]),
+            }
+            self.assertEqual(response.content, JSONRenderer().render(expected), url)
+            url = body["next"]
+            pages += 1
+        self.assertGreater(pages, 1, path)
+
+    def test_pages_match_the_serializers_byte_for_byte(self):
+        def assignments(ids):
+            # What the list rendered through AssignmentSerializer before,
+            # minus the soft-deleted questions.
+            live = Question.objects.filter(isDeleted=False).order_by("id")
+            queryset = (
+                Assignment.objects.prefetch_related(Prefetch("questions", live))
+                .filter(id__in=ids)
+                .order_by("id")
+            )
+            return AssignmentSerializer(queryset, many=True).data
+
+        def enrollments(ids):
+            queryset = AssignmentEnrollment.objects.filter(id__in=ids).order_by("id")
+            return AssignmentEnrollmentSerializer(queryset, many=True).data
+
+        for path, role, serialize in (
+            ("/api/assignments/", "candidate", assignments),
+            ("/api/assignments/async/", "candidate", assignments),
+            ("/api/enrollments/", "admin", enrollments),
+            ("/api/user-enrollments/", "submitter", enrollments),
+            ("/api/user-enrollments/async/", "submitter", enrollments),
+        ):
+            with self.subTest(path=path):
+                self.assertPagesMatch(path, role, serialize)
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.question = Question.objects.create(
+            title="q", data={"blob": "x" * 100}, type="coding"
+        )
+        cls.assignment = Assignment.objects.create(
+            title="a", description="d", creator=cls.admin
+        )
+        cls.assignment.questions.add(cls.question)
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def get(self, path, fields):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, {"fields": fields}, **self.auth)
+        self.assertEqual(response.status_code, 200, response.content)
+        for query in queries:
+            self.assertNotIn('"data"', query["sql"])
+        return response.json(), queries
+
+    def test_embedded_questions_are_narrowed(self):
+        question = {"id": self.question.id, "title": "q", "type": "coding"}
+        detail = f"/api/edit-assignment/{self.assignment.id}/"
+        fields = "title,questions.type,questions.title,questions.id"
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            body, _ = self.get(path, fields)
+            self.assertEqual(body["results"], [{"title": "a", "questions": [question]}])
+        body, _ = self.get(detail, fields)
+        self.assertEqual(body, {"title": "a", "questions": [question]})
+
+    def test_questions_left_out_are_not_queried(self):
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            body, queries = self.get(path, "id,description")
+            self.assertEqual(
+                body["results"], [{"id": self.assignment.id, "description": "d"}]
+            )
+            for query in queries:
+                self.assertNotIn("assignments_assignment_questions", query["sql"])
+
+
+class ConditionalAssignmentListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.questions = [
+            Question.objects.create(title=f"q{i}", data={}, type="mcq")
+            for i in range(2)
+        ]
+        cls.assignment = Assignment.objects.create(
+            title="a", description="d", creator=cls.admin
+        )
+        cls.assignment.questions.add(cls.questions[0])
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def assertModified(self, etag):
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag[path])
+            self.assertEqual(response.status_code, 200, path)
+            etag[path] = response["ETag"]
+
+    def test_etag_follows_assignments_and_their_questions(self):
+        etag = {}
+        for path in ("/api/assignments/", "/api/assignments/async/"):
+            etag[path] = self.client.get(path)["ETag"]
+            with self.assertNumQueries(1):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag[path])
+            self.assertEqual(response.status_code, 304, path)
+
+        # Changing only the questions an assignment holds still saves it.
+        response = self.client.patch(
+            f"/api/edit-assignment/{self.assignment.id}/",
+            json.dumps({"question_ids": [q.id for q in self.questions]}),
+            content_type="application/json",
+            **self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertModified(etag)
+
+        response = self.client.patch(
+            f"/api/questions/{self.questions[1].id}/",
+            json.dumps({"title": "edited"}),
+            content_type="application/json",
+            **self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertModified(etag)
+
+    def test_cached_list_follows_changes_to_the_questions_held(self):
+        def held():
+            (row,) = self.client.get("/api/assignments/").json()["results"]
+            return [question["title"] for question in row["questions"]]
+
+        self.assertEqual(held(), ["q0"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assignment.questions.add(self.questions[1])
+        self.assertEqual(held(), ["q0", "q1"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assignment.questions.remove(self.questions[0])
+        self.assertEqual(held(), ["q1"])
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.candidate = User.objects.create_user("candidate", password="secret")
+
+    def setUp(self):
+        cache.clear()
+
+    def bearer(self, user):
+        token = issue_tokens(user).access_token
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def sample(self, name, **labels):
+        response = self.client.get("/metrics", **self.bearer(self.admin))
+        body = response.content.decode()
+        selector = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+        prefix = f"{name}{{{selector}}} " if labels else f"{name} "
+        for line in body.splitlines():
+            if line.startswith(prefix):
+                return float(line.split()[-1])
+        return 0.0
+
+    def test_requests_are_counted_by_route(self):
+        labels = {"method": "GET", "route": "assignments"}
+        responses = self.sample("letscode_responses_total", status="200", **labels)
+        latencies = self.sample("letscode_request_duration_seconds_count", **labels)
+        queries = self.sample("letscode_request_queries_count", **labels)
+
+        self.client.get("/api/assignments/")
+        self.client.get("/api/assignments/")
+        self.client.get("/no-such-page/")
+
+        self.assertEqual(
+            self.sample("letscode_responses_total", status="200", **labels),
+            responses + 2,
+        )
+        self.assertEqual(
+            self.sample("letscode_request_duration_seconds_count", **labels),
+            latencies + 2,
+        )
+        self.assertEqual(
+            self.sample("letscode_request_queries_count", **labels), queries + 2
+        )
+        self.assertGreaterEqual(
+            self.sample(
+                "letscode_responses_total",
+                method="GET",
+                route=metrics.UNMATCHED,
+                status="404",
+            ),
+            1,
+        )
+
+    def test_only_staff_and_the_scraper_may_read_them(self):
+        for auth in (
+            {},
+            self.bearer(self.candidate),
+            {"HTTP_AUTHORIZATION": "Bearer scrape"},
+            {"HTTP_AUTHORIZATION": "Bearer not-a-jwt"},
+        ):
+            response = self.client.get("/metrics", **auth)
+            self.assertEqual(response.status_code, 403, auth)
+            self.assertEqual(response.content, b"")
+
+        with self.settings(METRICS_TOKEN="scrape"):
+            for auth in (
+                {"HTTP_AUTHORIZATION": "Bearer scrape"},
+                self.bearer(self.admin),
+            ):
+                response = self.client.get("/metrics", **auth)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b"letscode_responses_total", response.content)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer other")
+            self.assertEqual(response.status_code, 403)
+
+    def test_worker_processes_are_added_up(self):
+        record = (
+            "from letsCode.metrics import IN_FLIGHT, RESPONSES; "
+            "RESPONSES.labels('questions', 'GET', 200).inc(); IN_FLIGHT.inc(); "
+            "import os; print(os.getpid())"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory}
+            pids = [
+                int(
+                    subprocess.run(
+                        [sys.executable, "-c", record],
+                        cwd=settings.BASE_DIR,
+                        env=env,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    ).stdout
+                )
+                for _ in range(2)
+            ]
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                self.assertEqual(
+                    self.sample(
+                        "letscode_responses_total",
+                        method="GET",
+                        route="questions",
+                        status="200",
+                    ),
+                    2,
+                )
+                self.assertEqual(self.sample("letscode_requests_in_flight"), 2)
+                for pid in pids:
+                    metrics.mark_process_dead(pid)
+                self.assertEqual(self.sample("letscode_requests_in_flight"), 0)
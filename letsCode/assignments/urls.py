@@ -6,7 +6,11 @@ from .views import (
     AssignmentCreateView,
     AssignmentListView,
     AssignmentUpdateView,
+    AsyncApprovedEnrollmentsForUserListView,
+    AsyncAssignmentListView,
     EnrollmentsViewSet,
+    ExportView,
+    LeaderboardView,
 )
 
 enrollment_router = DefaultRouter()
@@ -18,7 +22,17 @@ urlpatterns = [
         ApprovedEnrollmentsForUserListView.as_view(),
         name="user-enrollments",
     ),
+    path(
+        "user-enrollments/async/",
+        AsyncApprovedEnrollmentsForUserListView.as_view(),
+        name="user-enrollments-async",
+    ),
     path("assignments/", AssignmentListView.as_view(), name="assignments"),
+    path(
+        "assignments/async/",
+        AsyncAssignmentListView.as_view(),
+        name="assignments-async",
+    ),
     path(
         "create-assignment/", AssignmentCreateView.as_view(), name="create-assignment"
     ),
@@ -27,4 +41,10 @@ urlpatterns = [
         AssignmentUpdateView.as_view(),
         name="update-assignment",
     ),
+    path(
+        "assignments/<int:pk>/leaderboard/",
+        LeaderboardView.as_view(),
+        name="leaderboard",
+    ),
+    path("export/<str:resource>/", ExportView.as_view(), name="export"),
 ]
@@ -1,6 +1,13 @@
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import viewsets
-from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView
+from rest_framework.decorators import action
+from rest_framework.generics import (
+    ListAPIView,
+    RetrieveUpdateAPIView,
+    get_object_or_404,
+)
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import (
@@ -12,21 +19,53 @@ from rest_framework.status import (
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from letsCode.async_views import AsyncListView
+from letsCode.cache import acached_list_data, cached_list_data
+from letsCode.conditional import etag_list
+from letsCode.rendering import encode_json, encoded_page, page_columns, value_rows
+from letsCode.sparse_fields import requested_fields
+from letsCode.streaming import FORMATS, streaming_export_response
+from letsCode.timing import query_budget
+from questions.models import Question
+from user_profile.authentication import StatelessJWTAuthentication
+
+from . import leaderboard
+from .exports import EXPORTS
 from .models import Assignment, AssignmentEnrollment
-from .serializers import AssignmentEnrollmentSerializer, AssignmentSerializer
+from .serializers import (
+    ASSIGNMENT_FIELDS,
+    ENROLLMENT_VALUES,
+    AssignmentEnrollmentSerializer,
+    AssignmentSerializer,
+    EnrollmentStatusChangeSerializer,
+    assignment_rows,
+    assignment_values,
+    awith_active_questions,
+    with_active_questions,
+)
 
+LEADERBOARD_DEFAULT_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
 
+
+@query_budget(get=2)
 class ApprovedEnrollmentsForUserListView(ListAPIView):
     serializer_class = AssignmentEnrollmentSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [StatelessJWTAuthentication]
 
     def get_queryset(self):
         user = self.request.user
         queryset = AssignmentEnrollment.objects.filter(user=user.id, status="approved")
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        return Response(encoded_page(self, self.get_queryset(), ENROLLMENT_VALUES))
+
 
+@query_budget(
+    list=2, create=4, retrieve=2, update=3, partial_update=3, destroy=8, bulk_status=3
+)
 class EnrollmentsViewSet(viewsets.ModelViewSet):
     queryset = AssignmentEnrollment.objects.all()
     serializer_class = AssignmentEnrollmentSerializer
@@ -43,8 +82,7 @@ class EnrollmentsViewSet(viewsets.ModelViewSet):
 
     def list(self, request):
         queryset = AssignmentEnrollment.objects.filter(status="pending")
-        serializer = AssignmentEnrollmentSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(encoded_page(self, queryset, ENROLLMENT_VALUES))
 
     def update(self, request, pk=None):
         try:
@@ -52,14 +90,66 @@ class EnrollmentsViewSet(viewsets.ModelViewSet):
         except:
             return Response(status=HTTP_404_NOT_FOUND)
 
-        new_status = "approved"
+        new_status = request.data.get("status", "approved")
+        if not enrollment.can_transition_to(new_status):
+            return Response(
+                {
+                    "detail": f'Cannot move an enrollment from "{enrollment.status}" '
+                    f'to "{new_status}".'
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
 
         enrollment.status = new_status
-        enrollment.save()
+        enrollment.save(update_fields=["status"])
 
         serializer = AssignmentEnrollmentSerializer(enrollment)
         return Response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-status",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_status(self, request):
+        """
+        Move many enrollments to a new status with a single UPDATE.
+
+        Only enrollments whose current status may move to the requested one
+        are changed; the rest, and ids that do not exist, are skipped.
+
+        Returns:
+        - Response: The target status with the number of transitioned and
+          skipped enrollments.
+        """
+        serializer = EnrollmentStatusChangeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data["status"]
+        ids = serializer.validated_data.get("ids")
+        assignment = serializer.validated_data.get("assignment")
+
+        queryset = AssignmentEnrollment.objects.all()
+        if ids is not None:
+            ids = set(ids)
+            queryset = queryset.filter(id__in=ids)
+        if assignment is not None:
+            queryset = queryset.filter(assignment_id=assignment)
+
+        with transaction.atomic():
+            matched = len(ids) if ids is not None else queryset.count()
+            transitioned = queryset.filter(
+                status__in=AssignmentEnrollment.sources_for(new_status)
+            ).update(status=new_status)
+
+        return Response(
+            {
+                "status": new_status,
+                "transitioned": transitioned,
+                "skipped": matched - transitioned,
+            }
+        )
+
     def create(self, request):
         serializer = AssignmentEnrollmentSerializer(data=request.data)
 
@@ -80,11 +170,68 @@ class EnrollmentsViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
+@query_budget(get=4)
 class AssignmentListView(ListAPIView):
-    queryset = Assignment.objects.all()
-    serializer_class = AssignmentSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+
+    @etag_list(Assignment, Question)
+    def list(self, request, *args, **kwargs):
+        fields = requested_fields(request, ASSIGNMENT_FIELDS)
+        columns = page_columns(assignment_values(fields))
+
+        def build():
+            page = self.paginate_queryset(Assignment.objects.values(*columns))
+            rows = assignment_rows(with_active_questions(page, fields), fields)
+            return encode_json(self.get_paginated_response(rows).data)
+
+        # Assignments embed their questions, so both versions key the entry.
+        return Response(cached_list_data(request, ["assignments", "questions"], build))
+
+
+@query_budget(get=2)
+class AsyncApprovedEnrollmentsForUserListView(AsyncListView):
+    """
+    Async variant of ``ApprovedEnrollmentsForUserListView``.
+    """
+
+    authentication_required = True
+
+    async def get_page(self, request):
+        queryset = AssignmentEnrollment.objects.filter(
+            user=request.user.id, status="approved"
+        )
+        data = await self.paginate(
+            request,
+            queryset.values(*ENROLLMENT_VALUES.values()),
+            lambda page: value_rows(page, ENROLLMENT_VALUES),
+        )
+        return encode_json(data)
+
 
+@query_budget(get=4)
+class AsyncAssignmentListView(AsyncListView):
+    """
+    Async variant of ``AssignmentListView``.
+    """
 
+    etag_models = (Assignment, Question)
+
+    async def get_page(self, request):
+        fields = requested_fields(request, ASSIGNMENT_FIELDS)
+        columns = page_columns(assignment_values(fields))
+
+        async def build():
+            data = await self.paginate(
+                request, Assignment.objects.values(*columns), list
+            )
+            rows = await awith_active_questions(data["results"], fields)
+            data["results"] = assignment_rows(rows, fields)
+            return encode_json(data)
+
+        return await acached_list_data(request, ["assignments", "questions"], build)
+
+
+@query_budget(post=5)
 class AssignmentCreateView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
     authentication_classes = [JWTAuthentication]
@@ -100,8 +247,80 @@ class AssignmentCreateView(APIView):
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
+@query_budget(get=3, put=8, patch=8)
 class AssignmentUpdateView(RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
     authentication_classes = [JWTAuthentication]
     queryset = Assignment.objects.all()
     serializer_class = AssignmentSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        fields = requested_fields(request, ASSIGNMENT_FIELDS)
+        queryset = Assignment.objects.only(*assignment_values(fields))
+        if "questions" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "questions", queryset=Question.objects.only(*fields["questions"])
+                )
+            )
+        assignment = get_object_or_404(queryset, pk=kwargs["pk"])
+        return Response(AssignmentSerializer(assignment, fields=fields).data)
+
+
+@query_budget(get=4)
+class LeaderboardView(APIView):
+    """
+    An assignment's leaderboard and the requesting user's place on it.
+
+    Query parameters:
+    - limit: How many of the best entries to list, at most
+      ``LEADERBOARD_MAX_LIMIT``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get(self, request, pk):
+        try:
+            limit = int(request.query_params.get("limit", LEADERBOARD_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {"detail": "limit must be an integer."}, status=HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(1, limit), LEADERBOARD_MAX_LIMIT)
+
+        return Response(
+            {
+                "results": leaderboard.top(pk, limit),
+                "me": leaderboard.rank_of(pk, request.user.id),
+            }
+        )
+
+
+@query_budget(get=1)
+class ExportView(APIView):
+    """
+    Stream a full export of questions, assignments or enrollments.
+
+    Query parameters:
+    - fmt: ``ndjson`` (default) or ``csv``.
+    - gzip: ``1`` to gzip the download.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            return Response(status=HTTP_404_NOT_FOUND)
+
+        fmt = request.query_params.get("fmt", "ndjson")
+        if fmt not in FORMATS:
+            return Response(
+                {"detail": f"fmt must be one of: {', '.join(FORMATS)}."},
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        fields, rows = EXPORTS[resource]
+        compress = request.query_params.get("gzip") in ("1", "true")
+        return streaming_export_response(rows(), fields, resource, fmt, compress)
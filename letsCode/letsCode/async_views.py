@@ -0,0 +1,108 @@
+"""
+Native async list views for ASGI deployments.
+
+DRF views are synchronous, so under ASGI every request to one is handed to
+a worker thread for its whole duration. The views here run on the event
+loop instead: they authenticate, query through the async ORM and the
+cache's async API, and render the same JSON as their DRF counterparts.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+
+from letsCode.conditional import list_etag
+from letsCode.pagination import IdCursorPagination
+from letsCode.rendering import PreEncodedJSONRenderer
+from user_profile.authentication import StatelessJWTAuthentication
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncListView(View):
+    """
+    Base class for async, cursor-paginated list endpoints.
+
+    Subclasses implement ``get_page``.
+
+    Attributes:
+    - authentication_required (bool): Reject anonymous requests with 401.
+      Tokens that are sent are always checked, as in DRF.
+    - etag_models (tuple): Models the response is built from. When set,
+      responses carry their ``letsCode.conditional`` ETag and matching
+      ``If-None-Match`` requests are answered with 304.
+    """
+
+    http_method_names = ["get"]
+    authentication_required = False
+    etag_models = ()
+
+    async def get(self, request, *args, **kwargs):
+        authenticator = StatelessJWTAuthentication()
+        drf_request = Request(request, authenticators=())
+        try:
+            result = await authenticator.aauthenticate(request)
+            if result is None and self.authentication_required:
+                raise NotAuthenticated()
+            if result is not None:
+                drf_request.user, drf_request.auth = result
+
+            etag = None
+            if self.etag_models:
+                etag = await sync_to_async(list_etag)(drf_request, *self.etag_models)
+                not_modified = get_conditional_response(request, etag=etag)
+                if not_modified is not None:
+                    not_modified["ETag"] = etag
+                    return not_modified
+
+            data = await self.get_page(drf_request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {"detail": detail}
+            response = self.render(detail, status=exc.status_code)
+            if exc.status_code == 401:
+                response["WWW-Authenticate"] = authenticator.authenticate_header(
+                    request
+                )
+            return response
+        response = self.render(data)
+        if etag is not None:
+            response["ETag"] = etag
+        return response
+
+    async def get_page(self, request, *args, **kwargs):
+        """
+        Return the response data.
+
+        Args:
+        - request (Request): The request, wrapped for its ``query_params``
+          and authenticated ``user``.
+        """
+        raise NotImplementedError
+
+    async def paginate(self, request, queryset, serialize):
+        """
+        Fetch a page of ``queryset`` and return the paginated response data.
+
+        Args:
+        - request (Request): The request, carrying the cursor.
+        - queryset (QuerySet): The rows to page through.
+        - serialize (callable): Turns the page's objects into a list.
+
+        Returns:
+        - dict: ``next``, ``previous`` and ``results``, as DRF renders them.
+        """
+        paginator = IdCursorPagination()
+        page = await paginator.apaginate_queryset(queryset, request)
+        return paginator.get_paginated_response(serialize(page)).data
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            PreEncodedJSONRenderer().render(data),
+            content_type="application/json",
+            status=status,
+        )
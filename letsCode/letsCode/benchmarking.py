@@ -0,0 +1,89 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+Benchmarks never touch the configured database: they run inside a throwaway
+test database created with the same backend, exactly like the test runner.
+"""
+
+import resource
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def isolated_database():
+    """
+    Create a fresh test database and test environment for the block.
+
+    Yields:
+    - str: The name of the temporary database.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    test_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield test_name
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(values, pct):
+    """
+    Return the ``pct`` percentile of ``values`` using nearest-rank.
+
+    Args:
+    - values (list): The samples.
+    - pct (float): The percentile, between 0 and 100.
+
+    Returns:
+    - float: The sample at that rank.
+    """
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def measure(func, repeat=5):
+    """
+    Call ``func`` ``repeat`` times and report its latency and memory use.
+
+    Args:
+    - func (callable): The zero-argument callable to benchmark.
+    - repeat (int): How many timed calls to make.
+
+    Returns:
+    - dict: ``median_ms`` and ``p95_ms`` latency, ``peak_kib`` as the
+      Python heap high-water mark of a single call, and ``rss_growth_kib``
+      as how far the calls pushed up the process peak resident set size.
+    """
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    func()  # warm up connections, caches and lazy imports
+
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Traced separately so that tracemalloc does not skew the timings.
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "peak_kib": peak / 1024,
+        "rss_growth_kib": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        ),
+    }
@@ -0,0 +1,223 @@
+"""
+Versioned read-through caching for list endpoints.
+
+Every cached entry is keyed by the current version of each model namespace it
+was built from. Writers call ``bump_version`` instead of deleting keys, which
+makes all older entries unreachable at once; they then age out on their own.
+The models' ``post_save`` and ``post_delete`` receivers bump their namespace
+through ``bump_version_on_commit``, so only bulk writes, which send no
+signals, need to bump it themselves.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "cache-version:{}"
+LOCK_SUFFIX = ":lock"
+
+_local_locks = weakref.WeakValueDictionary()
+_local_locks_guard = threading.Lock()
+
+
+def _initial_version():
+    # A counter that restarted from 1 after an eviction could line up with
+    # entries written before the eviction, so restart from the clock instead.
+    return time.time_ns()
+
+
+def get_version(namespace):
+    """
+    Return the current version of a namespace, initialising it if needed.
+
+    Args:
+    - namespace (str): The model namespace, e.g. ``"questions"``.
+
+    Returns:
+    - int: The current version.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*namespaces):
+    """
+    Invalidate every cached entry built from the given namespaces.
+
+    Args:
+    - *namespaces (str): The model namespaces that changed.
+    """
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_version_on_commit(*namespaces):
+    """
+    Call ``bump_version`` once the current transaction commits, or right
+    away outside of one.
+
+    Bumping earlier would let a concurrent request cache the old rows under
+    the new version until the next write.
+
+    Args:
+    - *namespaces (str): The model namespaces that changed.
+    """
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _local_locks[key] = lock
+        return lock
+
+
+def single_flight(key, build, timeout=None):
+    """
+    Return the cached value for ``key``, building it at most once on a miss.
+
+    Concurrent misses in the same process wait on a lock, and misses in other
+    processes wait on a lock entry in the cache itself, so a cold key causes a
+    single call to ``build`` instead of one per waiting request.
+
+    Args:
+    - key (str): The cache key.
+    - build (callable): Zero-argument callable producing the value.
+    - timeout (int): Cache timeout in seconds, defaults to
+      ``LIST_CACHE_TIMEOUT``.
+
+    Returns:
+    - The cached or freshly built value.
+    """
+    if timeout is None:
+        timeout = settings.LIST_CACHE_TIMEOUT
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    with _local_lock(key):
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        lock_key = key + LOCK_SUFFIX
+        acquired = cache.add(lock_key, 1, timeout=settings.LIST_CACHE_LOCK_TIMEOUT)
+        if not acquired:
+            deadline = time.monotonic() + settings.LIST_CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(0.01)
+                value = cache.get(key)
+                if value is not None:
+                    return value
+            # The other builder died or is too slow; build it ourselves.
+
+        try:
+            value = build()
+            cache.set(key, value, timeout)
+        finally:
+            if acquired:
+                cache.delete(lock_key)
+        return value
+
+
+def cached_list_data(request, namespaces, build):
+    """
+    Serve list response data through the cache.
+
+    Args:
+    - request (Request): The request, whose absolute URI (including the
+      host the pagination links point at, the cursor and the page
+      size) is part of the key.
+    - namespaces (list): Model namespaces the response is built from.
+    - build (callable): Zero-argument callable returning the response data.
+
+    Returns:
+    - The response data.
+    """
+    versions = ":".join(f"{ns}{get_version(ns)}" for ns in namespaces)
+    uri = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return single_flight(f"list:{versions}:{uri}", build)
+
+
+# Async variants for the async views, built on the cache's async API.
+
+_local_async_locks = weakref.WeakValueDictionary()
+
+
+async def aget_version(namespace):
+    """
+    Async variant of ``get_version``.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+async def asingle_flight(key, build, timeout=None):
+    """
+    Async variant of ``single_flight``; ``build`` is a coroutine function.
+    """
+    if timeout is None:
+        timeout = settings.LIST_CACHE_TIMEOUT
+
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock = _local_async_locks.get(key)
+    if lock is None:
+        lock = _local_async_locks[key] = asyncio.Lock()
+
+    async with lock:
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+
+        lock_key = key + LOCK_SUFFIX
+        acquired = await cache.aadd(
+            lock_key, 1, timeout=settings.LIST_CACHE_LOCK_TIMEOUT
+        )
+        if not acquired:
+            deadline = time.monotonic() + settings.LIST_CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+                value = await cache.aget(key)
+                if value is not None:
+                    return value
+
+        try:
+            value = await build()
+            await cache.aset(key, value, timeout)
+        finally:
+            if acquired:
+                await cache.adelete(lock_key)
+        return value
+
+
+async def acached_list_data(request, namespaces, build):
+    """
+    Async variant of ``cached_list_data``; ``build`` is a coroutine function.
+    """
+    versions = ":".join([f"{ns}{await aget_version(ns)}" for ns in namespaces])
+    uri = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return await asingle_flight(f"list:{versions}:{uri}", build)
@@ -0,0 +1,90 @@
+"""
+Conditional GET for list endpoints.
+
+A list response only changes when a row of a table it is built from does, so
+its ETag is derived from the latest ``updated_at`` and the row count of each
+of those tables, plus everything about the request that shapes the body. A
+client repeating a request with ``If-None-Match`` is answered with ``304 Not
+Modified`` after that single query, before the cached list, the queryset or
+the serializers are touched.
+
+The count catches deletions, which leave no newer ``updated_at`` behind. A
+write that commits after a concurrent one with a later timestamp does not
+move the maximum either, so the tag also includes the ``letsCode.cache``
+versions of the tables, which writers bump once they have committed.
+"""
+import hashlib
+
+from django.db import connections, router
+from django.utils.cache import quote_etag
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from letsCode.cache import get_version
+
+
+def table_state(*models):
+    """
+    Return the latest ``updated_at`` and the row count of each model's table,
+    in one query.
+
+    Args:
+    - *models (Model): Models with an ``updated_at`` field.
+
+    Returns:
+    - tuple: ``(max updated_at, count)`` for each model, flattened.
+    """
+    connection = connections[router.db_for_read(models[0])]
+    qn = connection.ops.quote_name
+    columns = []
+    for model in models:
+        table = qn(model._meta.db_table)
+        updated_at = qn(model._meta.get_field("updated_at").column)
+        columns.append(f"(SELECT MAX({updated_at}) FROM {table})")
+        columns.append(f"(SELECT COUNT(*) FROM {table})")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT " + ", ".join(columns))
+        return cursor.fetchone()
+
+
+def list_etag(request, *models):
+    """
+    Return the ETag of a list response built from ``models``.
+
+    Args:
+    - request (Request): The request; its absolute URL, which carries the
+      host of the pagination links, the cursor and the filters, and its
+      negotiated media type are part of the tag.
+    - *models (Model): The models the response is built from. Each app's
+      label is its cache namespace.
+
+    Returns:
+    - str: The quoted, strong ETag.
+    """
+    parts = [
+        request.build_absolute_uri(),
+        getattr(request, "accepted_media_type", ""),
+        *map(str, table_state(*models)),
+        *(str(get_version(model._meta.app_label)) for model in models),
+    ]
+    return quote_etag(hashlib.sha1("\n".join(parts).encode()).hexdigest())
+
+
+def etag_list(*models):
+    """
+    Decorate a view method to answer ``If-None-Match`` with its list ETag.
+
+    On DRF views, decorate the handler rather than the class's ``dispatch``,
+    so that authentication and content negotiation run first::
+
+        @etag_list(Question)
+        def list(self, request): ...
+
+    Args:
+    - *models (Model): The models the response is built from.
+    """
+    return method_decorator(
+        condition(
+            etag_func=lambda request, *args, **kwargs: list_etag(request, *models)
+        )
+    )
@@ -0,0 +1,259 @@
+"""
+Synthetic, reproducible datasets for load tests and benchmarks.
+
+``generate`` fills the database with users, MCQ and coding questions,
+assignments, enrollments in every status and graded submissions, all drawn
+from a seeded random generator so that the same arguments always produce
+the same data. Rows are written with ``bulk_create`` in batches.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from assignments import leaderboard
+from assignments.models import Assignment, AssignmentEnrollment
+from questions.models import Question
+from submissions.models import Answer, Submission
+
+# Every generated user shares this password.
+PASSWORD = "loadtest-password"
+
+# Entity counts at scale 1.
+BASE_COUNTS = {
+    "users": 1000,
+    "questions": 2000,
+    "assignments": 100,
+}
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+# Share of enrollments in each status.
+STATUS_WEIGHTS = {"pending": 2, "approved": 3, "attempted": 4, "rejected": 1}
+
+WORDS = (
+    "array graph tree string sort search hash stack queue heap matrix prime "
+    "sum path cycle binary window interval greedy recursion number"
+).split()
+
+CODING_SOURCE = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+def counts_for(scale):
+    """
+    Return the entity counts for a scale factor, at least one of each.
+    """
+    return {name: max(1, round(count * scale)) for name, count in BASE_COUNTS.items()}
+
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "?"
+
+
+def mcq_data(rng):
+    options = [_sentence(rng, 3) for _ in range(rng.choice([2, 3, 4, 4, 5]))]
+    return {
+        "question": _sentence(rng),
+        "options": options,
+        "answer": rng.choice(options),
+        "difficulty": rng.choice(DIFFICULTIES),
+    }
+
+
+def coding_data(rng):
+    tests = []
+    for _ in range(rng.randint(2, 6)):
+        a, b = rng.randint(-1000, 1000), rng.randint(-1000, 1000)
+        tests.append({"input": f"{a} {b}\n", "output": f"{a + b}\n"})
+    return {
+        "statement": _sentence(rng, 20),
+        "language": "python",
+        "difficulty": rng.choice(DIFFICULTIES),
+        "tests": tests,
+        "time_limit": rng.choice([1, 2, 2, 3]),
+    }
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_create(model, rows, batch_size):
+    created = []
+    for batch in _batches(rows, batch_size):
+        created.extend(model.objects.bulk_create(batch))
+    return created
+
+
+@transaction.atomic
+def generate(
+    scale=1.0,
+    coding_share=0.3,
+    questions_per_assignment=10,
+    enrollments_per_user=3,
+    seed=0,
+    batch_size=5000,
+):
+    """
+    Generate a dataset.
+
+    Args:
+    - scale (float): Multiplier applied to ``BASE_COUNTS``.
+    - coding_share (float): Share of questions that are coding questions.
+    - questions_per_assignment (int): Questions attached to each assignment.
+    - enrollments_per_user (int): Assignments each candidate enrolls in.
+    - seed (int): Seed of the random generator.
+    - batch_size (int): Rows per ``bulk_create``.
+
+    Returns:
+    - dict: How many rows of each kind were created, plus the ``admin``
+      and ``candidate`` usernames to log in as.
+    """
+    rng = random.Random(seed)
+    counts = counts_for(scale)
+    prefix = f"load{seed}"
+    password = make_password(PASSWORD)
+
+    admin = User.objects.create_superuser(
+        f"{prefix}-admin", email=f"{prefix}-admin@example.com", password=PASSWORD
+    )
+    users = _bulk_create(
+        User,
+        (
+            User(
+                username=f"{prefix}-user{i}",
+                email=f"{prefix}-user{i}@example.com",
+                first_name=rng.choice(WORDS).capitalize(),
+                last_name=rng.choice(WORDS).capitalize(),
+                password=password,
+            )
+            for i in range(counts["users"])
+        ),
+        batch_size,
+    )
+
+    def question(i):
+        coding = rng.random() < coding_share
+        return Question(
+            title=f"{_sentence(rng, 5)} #{i}",
+            type="coding" if coding else "mcq",
+            data=coding_data(rng) if coding else mcq_data(rng),
+            isDeleted=rng.random() < 0.05,
+        )
+
+    questions = _bulk_create(
+        Question, (question(i) for i in range(counts["questions"])), batch_size
+    )
+    live = [question for question in questions if not question.isDeleted]
+
+    assignments = _bulk_create(
+        Assignment,
+        (
+            Assignment(
+                title=f"Assignment {i}", description=_sentence(rng, 12), creator=admin
+            )
+            for i in range(counts["assignments"])
+        ),
+        batch_size,
+    )
+    questions_of = {
+        assignment.id: rng.sample(live, min(questions_per_assignment, len(live)))
+        for assignment in assignments
+    }
+    Through = Assignment.questions.through
+    _bulk_create(
+        Through,
+        (
+            Through(assignment_id=assignment_id, question_id=question.id)
+            for assignment_id, chosen in questions_of.items()
+            for question in chosen
+        ),
+        batch_size,
+    )
+
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    per_user = min(enrollments_per_user, len(assignments))
+    enrollments = _bulk_create(
+        AssignmentEnrollment,
+        (
+            AssignmentEnrollment(
+                user=user,
+                assignment=assignment,
+                status=rng.choices(statuses, weights)[0],
+            )
+            for user in users
+            for assignment in rng.sample(assignments, per_user)
+        ),
+        batch_size,
+    )
+
+    attempted = [e for e in enrollments if e.status == "attempted"]
+    now = timezone.now()
+    submissions = _bulk_create(
+        Submission,
+        (
+            Submission(enrollment=enrollment, status="graded", graded_at=now)
+            for enrollment in attempted
+        ),
+        batch_size,
+    )
+
+    def answers(submission, enrollment):
+        for question in questions_of[enrollment.assignment_id]:
+            if question.type == "coding":
+                correct = rng.random() < 0.6
+                response = CODING_SOURCE if correct else "print(0)\n"
+            else:
+                response = rng.choice(question.data["options"])
+                correct = response == question.data["answer"]
+            yield Answer(
+                submission=submission,
+                question=question,
+                response=response,
+                is_correct=correct,
+            )
+
+    scores = {}
+    created_answers = 0
+    for batch in _batches(zip(submissions, attempted), max(1, batch_size // 10)):
+        rows = [
+            answer
+            for submission, enrollment in batch
+            for answer in answers(submission, enrollment)
+        ]
+        Answer.objects.bulk_create(rows)
+        created_answers += len(rows)
+        for answer in rows:
+            scores.setdefault(answer.submission, 0)
+            scores[answer.submission] += answer.is_correct
+
+    for submission, score in scores.items():
+        submission.score = score
+        submission.enrollment.score = score
+    Submission.objects.bulk_update(scores, ["score"], batch_size=batch_size)
+    AssignmentEnrollment.objects.bulk_update(
+        [submission.enrollment for submission in scores],
+        ["score"],
+        batch_size=batch_size,
+    )
+    for assignment in assignments:
+        leaderboard.rebuild(assignment.id)
+
+    return {
+        "users": len(users) + 1,
+        "questions": len(questions),
+        "assignments": len(assignments),
+        "enrollments": len(enrollments),
+        "submissions": len(submissions),
+        "answers": created_answers,
+        "admin": admin.username,
+        "candidate": attempted[0].user.username if attempted else users[0].username,
+    }
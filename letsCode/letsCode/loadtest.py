@@ -0,0 +1,363 @@
+"""
+An in-process load harness for every route of the project.
+
+Each named route in ``letsCode/urls.py`` is matched with a scenario in
+``SCENARIOS`` that builds its requests from a dataset made by ``datagen``.
+A route is driven by a fixed number of threads, each with its own test
+client, and every request records its latency and the queries it ran.
+Routes without a scenario are reported, so a new endpoint cannot silently
+fall out of the benchmark.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+
+from assignments.models import Assignment, AssignmentEnrollment
+from letsCode import datagen
+from letsCode.benchmarking import percentile
+from questions.models import Question
+from submissions.models import Submission
+from user_profile.authentication import issue_tokens
+
+# URL namespaces that are not part of the API.
+EXCLUDED_PREFIXES = ("admin/",)
+
+
+def _get(path, token=None, status=200):
+    return {"method": "get", "path": path, "token": token, "status": status}
+
+
+def _post(path, data, token=None, status=200):
+    return {
+        "method": "post",
+        "path": path,
+        "data": data,
+        "token": token,
+        "status": status,
+    }
+
+
+def _login(context, i):
+    return {"username": context["candidate"], "password": datagen.PASSWORD}
+
+
+# Route name -> function of (context, request number) returning the request.
+# ``token`` names the user the request is sent as and ``status`` is the
+# expected response status; any other status counts as an error.
+SCENARIOS = {
+    "api-root": lambda context, i: _get("/"),
+    "metrics": lambda context, i: _get("/metrics", "admin"),
+    "register": lambda context, i: _post(
+        "/api/register/",
+        {
+            "username": f"load-register-{i}",
+            "email": f"load-register-{i}@example.com",
+            "password": datagen.PASSWORD,
+            "first_name": "Load",
+            "last_name": "Test",
+        },
+        status=201,
+    ),
+    "login": lambda context, i: _post(
+        "/api/login/", {**_login(context, i), "session": False}
+    ),
+    "login-async": lambda context, i: _post(
+        "/api/login/async/", {**_login(context, i), "session": False}
+    ),
+    "token_obtain_pair": lambda context, i: _post("/api/token/", _login(context, i)),
+    "token_refresh": lambda context, i: _post(
+        "/api/token/refresh/", {"refresh": context["refresh"]}
+    ),
+    "update": lambda context, i: _get("/api/update/", "candidate"),
+    "logout": lambda context, i: _post("/api/logout/", {}, "candidate"),
+    "question-list": lambda context, i: _get("/api/questions/", "candidate"),
+    "questions-async": lambda context, i: _get("/api/questions/async/", "candidate"),
+    "question-detail": lambda context, i: _get(
+        f"/api/questions/{_pick(context['questions'], i)}/", "candidate"
+    ),
+    "question-search": lambda context, i: _get(
+        f"/api/questions/search/?q={_pick(datagen.WORDS, i)}", "candidate"
+    ),
+    "question-bulk-import": lambda context, i: _post(
+        "/api/questions/import/",
+        [{"title": f"Imported {i}", "type": "mcq", "data": context["mcq"]}],
+        "admin",
+        status=201,
+    ),
+    "assignmentenrollment-list": lambda context, i: _get("/api/enrollments/", "admin"),
+    "assignmentenrollment-detail": lambda context, i: _get(
+        f"/api/enrollments/{_pick(context['enrollments'], i)}/", "admin"
+    ),
+    "assignmentenrollment-bulk-status": lambda context, i: _post(
+        "/api/enrollments/bulk-status/",
+        {"status": "approved", "ids": [_pick(context["pending"], i)]},
+        "admin",
+    ),
+    "user-enrollments": lambda context, i: _get("/api/user-enrollments/", "candidate"),
+    "user-enrollments-async": lambda context, i: _get(
+        "/api/user-enrollments/async/", "candidate"
+    ),
+    "assignments": lambda context, i: _get("/api/assignments/", "candidate"),
+    "assignments-async": lambda context, i: _get(
+        "/api/assignments/async/", "candidate"
+    ),
+    "create-assignment": lambda context, i: _post(
+        "/api/create-assignment/",
+        {
+            "title": f"Load {i}",
+            "description": "Created by the load test.",
+            "question_ids": context["questions"][:10],
+        },
+        "admin",
+        status=201,
+    ),
+    "update-assignment": lambda context, i: _get(
+        f"/api/edit-assignment/{_pick(context['assignments'], i)}/", "admin"
+    ),
+    "leaderboard": lambda context, i: _get(
+        f"/api/assignments/{context['attempted_assignment']}/leaderboard/",
+        "candidate",
+    ),
+    "export": lambda context, i: _get(
+        f"/api/export/{_pick(['questions', 'assignments', 'enrollments'], i)}/",
+        "admin",
+    ),
+    "submissions": lambda context, i: _post(
+        "/api/submissions/",
+        _pick(context["submittable"], i),
+        "submitter",
+        status=202,
+    ),
+    "submission-detail": lambda context, i: _get(
+        f"/api/submissions/{context['submission']}/", "candidate"
+    ),
+}
+
+
+def _pick(values, i):
+    return values[i % len(values)]
+
+
+def discover_routes():
+    """
+    Return the names of the project's routes, in URLconf order.
+
+    Returns:
+    - list: Route names, each once, without ``EXCLUDED_PREFIXES``.
+    """
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if route.startswith(EXCLUDED_PREFIXES):
+                continue
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, route)
+            elif pattern.name:
+                yield pattern.name
+
+    return list(dict.fromkeys(walk(get_resolver().url_patterns, "")))
+
+
+def prepare(dataset, submissions):
+    """
+    Collect what the scenarios need from a generated dataset.
+
+    Submitting uses up an approved enrollment, so a dedicated user is given
+    one for each submission the run will make.
+
+    Args:
+    - dataset (dict): What ``datagen.generate`` returned.
+    - submissions (int): How many submissions the run will make.
+
+    Returns:
+    - dict: The scenario context, including a token per user role.
+    """
+    admin = User.objects.get(username=dataset["admin"])
+    candidate = User.objects.get(username=dataset["candidate"])
+    submitter = User.objects.create_user("load-submitter")
+
+    questions_of = {}
+    for assignment_id, question_id in Assignment.questions.through.objects.values_list(
+        "assignment_id", "question_id"
+    ):
+        questions_of.setdefault(assignment_id, []).append(question_id)
+    assignments = sorted(questions_of)
+    AssignmentEnrollment.objects.bulk_create(
+        AssignmentEnrollment(
+            user=submitter, assignment_id=_pick(assignments, i), status="approved"
+        )
+        for i in range(submissions)
+    )
+
+    enrollments = list(
+        AssignmentEnrollment.objects.order_by("id").values_list("id", flat=True)
+    )
+    pending = list(
+        AssignmentEnrollment.objects.filter(status="pending")
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    submission = Submission.objects.filter(enrollment__user=candidate).first()
+    refresh = issue_tokens(candidate)
+    return {
+        "candidate": candidate.username,
+        "refresh": str(refresh),
+        "tokens": {
+            "admin": issue_tokens(admin).access_token,
+            "candidate": refresh.access_token,
+            "submitter": issue_tokens(submitter).access_token,
+        },
+        "questions": list(
+            Question.objects.filter(isDeleted=False)
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+        "mcq": datagen.mcq_data(random.Random(0)),
+        "assignments": assignments,
+        "enrollments": enrollments,
+        # Ids that are no longer pending are skipped rather than rejected.
+        "pending": pending or enrollments,
+        "submittable": [
+            {
+                "assignment": _pick(assignments, i),
+                "answers": [
+                    {"question": question_id, "response": "a"}
+                    for question_id in questions_of[_pick(assignments, i)]
+                ],
+            }
+            for i in range(submissions)
+        ],
+        "submission": submission.id if submission else 0,
+        "attempted_assignment": (
+            submission.enrollment.assignment_id if submission else assignments[0]
+        ),
+    }
+
+
+def run_route(name, context, requests, concurrency, warmup=0):
+    """
+    Send ``requests`` requests to a route from ``concurrency`` threads.
+
+    Args:
+    - name (str): The route, a key of ``SCENARIOS``.
+    - context (dict): What ``prepare`` returned.
+    - requests (int): Measured requests, shared between the threads.
+    - concurrency (int): Threads sending requests at the same time.
+    - warmup (int): Unmeasured requests sent first, from one thread.
+
+    Returns:
+    - dict: The route's statistics, see ``summarize``.
+    """
+    scenario = SCENARIOS[name]
+    counter = iter(range(warmup + requests))
+    lock = threading.Lock()
+
+    def send(client, i):
+        request = scenario(context, i)
+        headers = {}
+        if request["token"]:
+            headers[
+                "HTTP_AUTHORIZATION"
+            ] = f"Bearer {context['tokens'][request['token']]}"
+        call = getattr(client, request["method"])
+        kwargs = {"content_type": "application/json"} if "data" in request else {}
+        args = (json.dumps(request["data"]),) if "data" in request else ()
+
+        with CaptureQueriesContext(connections["default"]) as queries:
+            started = time.perf_counter()
+            response = call(request["path"], *args, **kwargs, **headers)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        return request, elapsed, len(queries), response.status_code
+
+    def worker(count):
+        client = Client(raise_request_exception=False)
+        results = []
+        try:
+            for _ in range(count):
+                with lock:
+                    i = next(counter)
+                results.append(send(client, i))
+        finally:
+            connections.close_all()
+        return results
+
+    if warmup:
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(worker, warmup).result()
+
+    share, extra = divmod(requests, concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        chunks = pool.map(worker, (share + (n < extra) for n in range(concurrency)))
+        results = [result for chunk in chunks for result in chunk]
+    return summarize(results, time.perf_counter() - started)
+
+
+def summarize(results, elapsed):
+    """
+    Reduce a route's request results to its statistics.
+
+    Args:
+    - results (list): ``(request, seconds, queries, status)`` per request.
+    - elapsed (float): Wall time of the whole run, in seconds.
+
+    Returns:
+    - dict: Method and path of the first request, request and error
+      counts, responses per status, latency percentiles in milliseconds,
+      requests per second and queries per request.
+    """
+    latencies = [seconds * 1000 for _, seconds, _, _ in results]
+    queries = [count for _, _, count, _ in results]
+    statuses = {}
+    for _, _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    first = results[0][0]
+    return {
+        "method": first["method"].upper(),
+        "path": first["path"],
+        "requests": len(results),
+        "errors": sum(
+            1 for request, _, _, status in results if status != request["status"]
+        ),
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "rps": round(len(results) / elapsed, 1),
+        "queries_mean": round(statistics.mean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def compare(baseline, current):
+    """
+    Pair up the routes of two runs.
+
+    Args:
+    - baseline (dict): An earlier run, as saved by the ``loadtest`` command.
+    - current (dict): The run to compare with it.
+
+    Returns:
+    - list: ``(route, baseline stats, current stats)`` for the routes in
+      both runs, in the current run's order.
+    """
+    return [
+        (name, baseline["routes"][name], stats)
+        for name, stats in current["routes"].items()
+        if name in baseline["routes"]
+    ]
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+from assignments.models import Assignment, AssignmentEnrollment
+from letsCode.benchmarking import isolated_database, percentile
+from questions.management.commands.bench_question_list import sample_question
+from questions.models import Question
+from user_profile.authentication import issue_tokens
+
+# (name, sync DRF path, async path)
+ENDPOINTS = [
+    ("questions", "/api/questions/", "/api/questions/async/"),
+    ("assignments", "/api/assignments/", "/api/assignments/async/"),
+    ("enrollments", "/api/user-enrollments/", "/api/user-enrollments/async/"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the sync (WSGI) and async (ASGI) read endpoints "
+        "as concurrent connections grow. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--concurrency",
+            default="1,10,50,100",
+            help="Comma separated numbers of concurrent connections.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="WSGI worker threads, e.g. gunicorn --threads.",
+        )
+        parser.add_argument("--page-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            user = User.objects.create_user("bench")
+            questions = Question.objects.bulk_create(
+                sample_question(i) for i in range(1000)
+            )
+            assignments = Assignment.objects.bulk_create(
+                Assignment(title=f"Assignment {i}", description="", creator=user)
+                for i in range(200)
+            )
+            Through = Assignment.questions.through
+            Through.objects.bulk_create(
+                Through(assignment_id=assignment.id, question_id=question.id)
+                for n, assignment in enumerate(assignments)
+                for question in questions[n * 5 : n * 5 + 5]
+            )
+            AssignmentEnrollment.objects.bulk_create(
+                AssignmentEnrollment(
+                    user=user, assignment=assignment, status="approved"
+                )
+                for assignment in assignments
+            )
+            token = f"Bearer {issue_tokens(user).access_token}"
+            query = f"?page_size={options['page_size']}"
+
+            self.stdout.write(
+                f"{'endpoint':>12} {'conns':>6} {'server':>6} {'req/s':>8} "
+                f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+            )
+            for name, sync_path, async_path in ENDPOINTS:
+                for concurrency in (int(n) for n in options["concurrency"].split(",")):
+                    for server, run in (
+                        ("wsgi", self.run_wsgi),
+                        ("asgi", self.run_asgi),
+                    ):
+                        path = (sync_path if server == "wsgi" else async_path) + query
+                        elapsed, results = run(path, token, concurrency, options)
+                        self.report(name, concurrency, server, elapsed, results)
+
+    def run_wsgi(self, path, token, concurrency, options):
+        # Each connection waits for one of the server's worker threads, and
+        # that wait counts towards its latency.
+        workers = threading.BoundedSemaphore(options["threads"])
+
+        def connection(requests):
+            client = Client(raise_request_exception=False)
+            results = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                with workers:
+                    response = client.get(path, HTTP_AUTHORIZATION=token)
+                results.append((time.perf_counter() - started, response.status_code))
+            return results
+
+        share, extra = divmod(options["requests"], concurrency)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = pool.map(
+                connection, (share + (n < extra) for n in range(concurrency))
+            )
+            results = [result for chunk in results for result in chunk]
+        return time.perf_counter() - started, results
+
+    def run_asgi(self, path, token, concurrency, options):
+        async def connection(requests, results):
+            client = AsyncClient(raise_request_exception=False)
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(path, headers={"Authorization": token})
+                results.append((time.perf_counter() - started, response.status_code))
+
+        async def run():
+            results = []
+            share, extra = divmod(options["requests"], concurrency)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(connection(share + (n < extra), results) for n in range(concurrency))
+            )
+            return time.perf_counter() - started, results
+
+        return asyncio.run(run())
+
+    def report(self, name, concurrency, server, elapsed, results):
+        latencies = [seconds * 1000 for seconds, _ in results]
+        errors = sum(1 for _, status in results if status != 200)
+        self.stdout.write(
+            f"{name:>12} {concurrency:>6} {server:>6} "
+            f"{len(results) / elapsed:>8.0f} {percentile(latencies, 50):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {errors:>7}"
+        )
@@ -0,0 +1,110 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from assignments.models import Assignment, AssignmentEnrollment
+from assignments.serializers import (
+    ASSIGNMENT_LIST_VALUES,
+    ENROLLMENT_VALUES,
+    AssignmentEnrollmentSerializer,
+    AssignmentSerializer,
+    with_active_questions,
+)
+from letsCode import datagen
+from letsCode.benchmarking import isolated_database, measure
+from letsCode.rendering import encode_json, value_rows
+from questions.models import Question
+from questions.serializers import QUESTION_VALUES, QuestionSerializer
+
+
+def serializer_page(queryset, serializer_class):
+    """
+    Render rows the way the list views did: model instances through their
+    serializer, then through ``JSONRenderer``.
+    """
+
+    def render():
+        return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+    return render
+
+
+def values_page(queryset, fields, complete=list):
+    """
+    Render rows the way the list views do now, see ``letsCode.rendering``.
+    """
+
+    def render():
+        rows = value_rows(queryset.values(*fields.values()), fields)
+        return encode_json(complete(rows))
+
+    return render
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how many rows per second the question, assignment and "
+        "enrollment lists render through their serializers and through the "
+        ".values() fast path. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Size of the generated dataset, see generate_dataset.",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=1000, help="Rows rendered per call."
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with isolated_database():
+            datagen.generate(scale=options["scale"])
+            questions = Question.objects.filter(isDeleted=False).order_by("id")[:rows]
+            assignments = Assignment.objects.order_by("id")[:rows]
+            live = Question.objects.filter(isDeleted=False).order_by("id")
+            enrollments = AssignmentEnrollment.objects.order_by("id")[:rows]
+            lists = [
+                (
+                    "questions",
+                    questions,
+                    serializer_page(questions, QuestionSerializer),
+                    values_page(questions, QUESTION_VALUES),
+                ),
+                (
+                    "assignments",
+                    assignments,
+                    serializer_page(
+                        assignments.prefetch_related(Prefetch("questions", live)),
+                        AssignmentSerializer,
+                    ),
+                    values_page(
+                        assignments, ASSIGNMENT_LIST_VALUES, with_active_questions
+                    ),
+                ),
+                (
+                    "enrollments",
+                    enrollments,
+                    serializer_page(enrollments, AssignmentEnrollmentSerializer),
+                    values_page(enrollments, ENROLLMENT_VALUES),
+                ),
+            ]
+
+            self.stdout.write(
+                f"{'list':<12} {'rows':>6} {'serializer rows/s':>18} "
+                f"{'values rows/s':>14} {'speedup':>8}"
+            )
+            for name, queryset, before, after in lists:
+                if before() != after():
+                    self.stderr.write(f"{name}: the two renderings differ.")
+                count = queryset.count()
+                slow = measure(before, repeat=options["repeat"])["median_ms"]
+                fast = measure(after, repeat=options["repeat"])["median_ms"]
+                self.stdout.write(
+                    f"{name:<12} {count:>6} {count / slow * 1000:>18,.0f} "
+                    f"{count / fast * 1000:>14,.0f} {slow / fast:>7.1f}x"
+                )
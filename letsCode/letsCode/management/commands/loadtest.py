@@ -0,0 +1,149 @@
+import json
+import logging
+import platform
+import re
+import subprocess
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from letsCode import datagen, loadtest
+from letsCode.benchmarking import isolated_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every route at a fixed concurrency against a generated dataset "
+        "and report latency percentiles and queries per request. Runs against "
+        "a throwaway test database. SQLite serializes writes, so write routes "
+        "report lock errors there under concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Unmeasured requests sent to each route first.",
+        )
+        parser.add_argument("--scale", type=float, default=0.1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--routes", help="Only run the routes whose name matches this regex."
+        )
+        parser.add_argument("--output", help="Save the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Show the change from the results in this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as stream:
+                baseline = json.load(stream)
+
+        routes = loadtest.discover_routes()
+        unscripted = [name for name in routes if name not in loadtest.SCENARIOS]
+        if options["routes"]:
+            pattern = re.compile(options["routes"])
+            routes = [name for name in routes if pattern.search(name)]
+        routes = [name for name in routes if name in loadtest.SCENARIOS]
+        if not routes:
+            raise CommandError("No route matches --routes.")
+
+        with isolated_database():
+            started = time.perf_counter()
+            dataset = datagen.generate(scale=options["scale"], seed=options["seed"])
+            context = loadtest.prepare(dataset, options["warmup"] + options["requests"])
+            self.stdout.write(
+                f"Generated {dataset['questions']} questions, "
+                f"{dataset['assignments']} assignments and "
+                f"{dataset['enrollments']} enrollments in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+
+            results = {
+                "meta": self.meta(options, dataset),
+                "routes": {},
+                "unscripted": unscripted,
+            }
+            self.stdout.write(
+                f"{'route':<34} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+                f"{'p99 ms':>8} {'queries':>7} {'errors':>6}"
+            )
+            # Failed requests are counted; their tracebacks would bury the table.
+            logging.getLogger("django.request").disabled = True
+            for name in routes:
+                stats = loadtest.run_route(
+                    name,
+                    context,
+                    options["requests"],
+                    options["concurrency"],
+                    options["warmup"],
+                )
+                results["routes"][name] = stats
+                self.stdout.write(
+                    f"{name:<34} {stats['rps']:>7.0f} {stats['p50_ms']:>8.1f} "
+                    f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                    f"{stats['queries_mean']:>7.1f} {stats['errors']:>6}"
+                )
+
+        for name in unscripted:
+            self.stderr.write(f"No scenario for route {name!r}; add one to SCENARIOS.")
+
+        if baseline is not None:
+            self.report_comparison(baseline, results)
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                json.dump(results, stream, indent=2)
+            self.stdout.write(f"Saved to {options['output']}.")
+
+    def meta(self, options, dataset):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "started_at": timezone.now().isoformat(),
+            "commit": commit,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "warmup": options["warmup"],
+            "scale": options["scale"],
+            "seed": options["seed"],
+            "dataset": dataset,
+        }
+
+    def report_comparison(self, baseline, results):
+        self.stdout.write(
+            f"\nChange from {baseline['meta'].get('commit') or 'baseline'}:\n"
+            f"{'route':<34} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}"
+        )
+        for name, before, after in loadtest.compare(baseline, results):
+            changes = [
+                self.change(before[key], after[key])
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            ]
+            queries = after["queries_mean"] - before["queries_mean"]
+            self.stdout.write(
+                f"{name:<34} {changes[0]:>8} {changes[1]:>8} {changes[2]:>8} "
+                f"{queries:>+8.1f}"
+            )
+
+    def change(self, before, after):
+        if not before:
+            return "n/a"
+        return f"{(after - before) / before:+.0%}"
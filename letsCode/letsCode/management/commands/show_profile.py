@@ -0,0 +1,48 @@
+import io
+import json
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from letsCode.profiling import profile_dir, profile_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a request profile saved by ProfilingMiddleware, or list the "
+        "saved profiles when no id is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("id", nargs="?", help="The X-Profile-Id of the request.")
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            help="pstats sort key, e.g. cumulative, tottime or ncalls.",
+        )
+        parser.add_argument("--limit", type=int, default=30)
+
+    def handle(self, *args, **options):
+        if options["id"] is None:
+            for path in sorted(profile_dir().glob("*.json"), reverse=True):
+                meta = json.loads(path.read_text())
+                self.stdout.write(
+                    f"{meta['id']}  {meta['status']}  {meta['duration_ms']:>9.1f} ms  "
+                    f"{meta['method']} {meta['path']}"
+                )
+            return
+
+        try:
+            path = profile_path(options["id"])
+        except ValueError as exc:
+            raise CommandError(exc)
+        if not path.exists():
+            raise CommandError(f"No profile {options['id']} in {profile_dir()}.")
+
+        meta = path.with_suffix(".json")
+        if meta.exists():
+            self.stdout.write(json.dumps(json.loads(meta.read_text()), indent=2))
+        report = io.StringIO()
+        stats = pstats.Stats(str(path), stream=report)
+        stats.sort_stats(options["sort"]).print_stats(options["limit"])
+        self.stdout.write(report.getvalue())
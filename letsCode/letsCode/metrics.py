@@ -0,0 +1,155 @@
+"""
+Prometheus metrics for every route.
+
+``MetricsMiddleware`` records request latency, responses by status, queries
+per request and requests in flight, labelled by URL name and method, and
+``metrics_view`` serves them in the Prometheus text format to staff and to
+requests bearing ``METRICS_TOKEN``.
+
+With several worker processes, each keeps its own counts. Set the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable to an empty directory
+shared by the workers before they start: every process then writes its
+metrics to memory-mapped files there, and a scrape of any worker adds up
+the files of all of them. Remove the files of exited workers with
+``mark_process_dead``, see the README.
+"""
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Labels of requests that matched no route or used a nonstandard method, so
+# that stray requests cannot add series.
+UNMATCHED = "unmatched"
+OTHER_METHOD = "other"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+REQUEST_LATENCY = Histogram(
+    "letscode_request_duration_seconds",
+    "Time to respond to a request, through all middleware.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSES = Counter(
+    "letscode_responses",
+    "Responses sent, by status code.",
+    ["route", "method", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "letscode_request_queries",
+    "Database queries run by a request's view.",
+    ["route", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+IN_FLIGHT = Gauge(
+    "letscode_requests_in_flight",
+    "Requests being handled.",
+    multiprocess_mode="livesum",
+)
+
+
+def mark_process_dead(pid):
+    """
+    Drop the live gauges of an exited worker, for a server's exit hook.
+
+    Args:
+    - pid (int): The worker's process id.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def registry():
+    """
+    Return the registry to scrape: one that adds up every worker's files in
+    multiprocess mode, this process's own otherwise.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)
+    return aggregated
+
+
+def may_scrape(request):
+    """
+    Return whether a request bears ``METRICS_TOKEN`` or a staff JWT.
+    """
+    # Imported here so that this module loads without Django set up, as in a
+    # server's exit hook calling mark_process_dead.
+    from letsCode.profiling import is_staff
+
+    token = settings.METRICS_TOKEN
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if token and constant_time_compare(header, f"Bearer {token}"):
+        return True
+    return is_staff(request)
+
+
+def metrics_view(request):
+    if not may_scrape(request):
+        return HttpResponse(status=403)
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """
+    Record the metrics of each request.
+
+    It belongs first in ``MIDDLEWARE``, so that the latency covers the other
+    middleware as well. The query count comes from ``RequestTimingMiddleware``
+    and is left out when it is not installed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            IN_FLIGHT.dec()
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            IN_FLIGHT.dec()
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, elapsed):
+        match = request.resolver_match
+        route = match.view_name if match else UNMATCHED
+        method = request.method if request.method in METHODS else OTHER_METHOD
+        REQUEST_LATENCY.labels(route, method).observe(elapsed)
+        RESPONSES.labels(route, method, response.status_code).inc()
+        timings = getattr(request, "timings", None)
+        if timings is not None:
+            REQUEST_QUERIES.labels(route, method).observe(timings.queries)
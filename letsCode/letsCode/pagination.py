@@ -0,0 +1,102 @@
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key.
+
+    Each page is fetched with ``WHERE id > <cursor> ORDER BY id LIMIT n``, so
+    the cost of a page does not depend on how deep into the table it is or
+    on how many rows the table holds.
+
+    Attributes:
+    - ordering (str): The unique, indexed column the cursor is keyed on.
+    - page_size_query_param (str): Query parameter clients may use to pick
+      a page size, capped at ``max_page_size``.
+    - max_page_size (int): The largest page size a client may request.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        window = self._window(queryset, request, view)
+        if window is None:
+            return None
+        return self._page(list(window))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of ``paginate_queryset``, fetching the page with the
+        async ORM.
+        """
+        window = self._window(queryset, request, view)
+        if window is None:
+            return None
+        return self._page([item async for item in window])
+
+    # CursorPagination.paginate_queryset, split around the one query it runs
+    # so that both variants share the cursor handling.
+
+    def _window(self, queryset, request, view):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        order = self.ordering[0]
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            if self.cursor.reverse != order.startswith("-"):
+                lookup = "__lt"
+            else:
+                lookup = "__gt"
+            queryset = queryset.filter(**{order.lstrip("-") + lookup: current_position})
+
+        self._position = reverse, current_position, offset
+        # One extra row tells whether there is a following page.
+        return queryset[offset : offset + self.page_size + 1]
+
+    def _page(self, results):
+        reverse, current_position, offset = self._position
+        self.page = results[: self.page_size]
+
+        following_position = None
+        has_following_position = len(results) > len(self.page)
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
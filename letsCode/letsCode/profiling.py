@@ -0,0 +1,165 @@
+"""
+Opt-in profiling of single requests, for staff.
+
+A request sent with a staff JWT and either an ``X-Profile: 1`` header or a
+``profile=1`` query parameter runs under ``cProfile``. The profile is saved
+as ``<id>.prof`` in ``PROFILE_DIR``, next to an ``<id>.json`` describing the
+request, and the id is returned in the ``X-Profile-Id`` response header.
+Only the newest ``PROFILE_KEEP`` profiles are kept.
+
+Open a profile with ``python manage.py show_profile <id>``, or with any
+``pstats`` viewer such as snakeviz or flameprof for a flame graph.
+
+Other requests only pay for a header lookup and a substring check.
+"""
+import cProfile
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from user_profile.authentication import StatelessJWTAuthentication
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_FLAG = "profile=1"
+
+
+def profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+def profile_path(profile_id):
+    """
+    Return the path of a saved profile.
+
+    Raises:
+    - ValueError: If ``profile_id`` is not a profile id.
+    """
+    if not profile_id.replace("-", "").isalnum():
+        raise ValueError(f"Not a profile id: {profile_id!r}")
+    return profile_dir() / f"{profile_id}.prof"
+
+
+def wants_profile(request):
+    """
+    Return whether the request asks to be profiled, without authenticating.
+    """
+    if request.META.get(HEADER) == "1":
+        return True
+    query = request.META.get("QUERY_STRING", "")
+    return QUERY_FLAG in query and request.GET.get("profile") == "1"
+
+
+def is_staff(request):
+    """
+    Return whether the request carries a valid staff JWT.
+    """
+    try:
+        result = StatelessJWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    return result is not None and result[0].is_staff
+
+
+async def ais_staff(request):
+    """
+    Async variant of ``is_staff``.
+    """
+    try:
+        result = await StatelessJWTAuthentication().aauthenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    return result is not None and result[0].is_staff
+
+
+def save_profile(profiler, request, response, elapsed):
+    """
+    Save a finished profile and evict the oldest ones beyond ``PROFILE_KEEP``.
+
+    Returns:
+    - str: The profile id.
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Ids sort by creation time, which is what eviction goes by.
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+
+    path = profile_path(profile_id)
+    partial = path.with_suffix(".prof.partial")
+    profiler.dump_stats(partial)
+    os.replace(partial, path)
+    match = request.resolver_match
+    path.with_suffix(".json").write_text(
+        json.dumps(
+            {
+                "id": profile_id,
+                "method": request.method,
+                "path": request.get_full_path(),
+                "route": match.view_name if match else None,
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+            }
+        )
+    )
+
+    profiles = sorted(directory.glob("*.prof"))
+    for stale in profiles[: max(0, len(profiles) - settings.PROFILE_KEEP)]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".json").unlink(missing_ok=True)
+    return profile_id
+
+
+class ProfilingMiddleware:
+    """
+    Profile the requests of staff that ask for it.
+
+    Async views are profiled on the event loop's thread, so other requests
+    running concurrently show up in their profile as well.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not (wants_profile(request) and is_staff(request)):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        return self.finish(profiler, request, response, started)
+
+    async def __acall__(self, request):
+        if not (wants_profile(request) and await ais_staff(request)):
+            return await self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        return self.finish(profiler, request, response, started)
+
+    def finish(self, profiler, request, response, started):
+        elapsed = time.perf_counter() - started
+        response["X-Profile-Id"] = save_profile(profiler, request, response, elapsed)
+        return response
@@ -0,0 +1,94 @@
+"""
+Serializer-free rendering for the hot list endpoints.
+
+Most of the time a list page takes goes to the per-object, per-field work
+of DRF serializers rather than to the database. The list views instead
+fetch their rows with ``.values()``, already shaped like the serializer's
+output, and render the whole page with ``JSONRenderer`` in one pass. The
+result is an ``EncodedJSON`` body, which is what the list cache stores and
+which ``PreEncodedJSONRenderer`` sends out as is.
+
+The bytes are the ones the serializers and ``JSONRenderer`` would produce;
+the list tests compare the two.
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+
+class EncodedJSON(bytes):
+    """
+    A response body already rendered by ``JSONRenderer``.
+    """
+
+
+def encode_json(data):
+    """
+    Render response data to JSON, as ``JSONRenderer`` does without indent.
+
+    Args:
+    - data: The response data.
+
+    Returns:
+    - EncodedJSON: The rendered body.
+    """
+    return EncodedJSON(JSONRenderer().render(data))
+
+
+class PreEncodedJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that sends ``EncodedJSON`` data without rendering it
+    again, unless the client asked for indented output.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, EncodedJSON):
+            if self.get_indent(accepted_media_type, renderer_context or {}) is None:
+                return bytes(data)
+            data = json.loads(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def value_rows(rows, fields):
+    """
+    Turn ``.values()`` rows into the dictionaries a serializer would return.
+
+    Args:
+    - rows (list): Rows of ``queryset.values()`` over at least the columns
+      of ``fields``.
+    - fields (dict): Serializer field name to model column, in the order of
+      the serializer's fields.
+
+    Returns:
+    - list: The rows, keyed and ordered like the serializer's output.
+    """
+    rows = list(rows)
+    if not rows or list(rows[0]) == list(fields) == list(fields.values()):
+        return rows
+    return [{name: row[column] for name, column in fields.items()} for row in rows]
+
+
+def page_columns(fields):
+    """
+    Return the columns to fetch for a page of ``fields``, see ``value_rows``,
+    which include the id the page cursor is taken from.
+    """
+    return list(dict.fromkeys(["id", *fields.values()]))
+
+
+def encoded_page(view, queryset, fields):
+    """
+    Fetch a page of ``queryset`` as ``.values()`` rows and render the
+    paginated response body.
+
+    Args:
+    - view (GenericAPIView): The list view, whose paginator pages the rows.
+    - queryset (QuerySet): The rows to page through.
+    - fields (dict): Serializer field name to model column, see
+      ``value_rows``.
+
+    Returns:
+    - EncodedJSON: The rendered body.
+    """
+    page = view.paginate_queryset(queryset.values(*page_columns(fields)))
+    return encode_json(view.get_paginated_response(value_rows(page, fields)).data)
@@ -38,12 +38,17 @@ INSTALLED_APPS = [
     "corsheaders",
     "rest_framework",
     "rest_framework_simplejwt",
+    "letsCode",
     "user_profile",
     "questions",
     "assignments",
+    "submissions",
 ]
 
 MIDDLEWARE = [
+    # First, so that its latency covers all the other middleware.
+    "letsCode.metrics.MetricsMiddleware",
+    "letsCode.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +58,8 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    # Last, so that its view time covers the view alone.
+    "letsCode.timing.RequestTimingMiddleware",
 ]
 
 ROOT_URLCONF = "letsCode.urls"
@@ -132,7 +139,14 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # JSONRenderer that passes the list views' pre-rendered pages through.
+    "DEFAULT_RENDERER_CLASSES": (
+        "letsCode.rendering.PreEncodedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "letsCode.pagination.IdCursorPagination",
+    "PAGE_SIZE": 100,
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
@@ -155,12 +169,12 @@ SIMPLE_JWT = {
     "USER_AUTHENTICATION_RULE": "rest_framework_simplejwt.authentication.default_user_authentication_rule",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
-    "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
+    "TOKEN_USER_CLASS": "user_profile.authentication.ClaimsUser",
     "JTI_CLAIM": "jti",
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
-    "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "user_profile.serializers.ClaimsTokenObtainPairSerializer",
     "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
@@ -168,5 +182,83 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
 }
 
+# How long StatelessJWTAuthentication trusts a user's cached active flag,
+# permissions and password before reading them again (seconds).
+AUTH_STATE_CACHE_TIMEOUT = 30
+
 
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Threads checking passwords for the async login view, None meaning one per
+# CPU core. Hashing is CPU bound, so more threads than cores only add queueing.
+LOGIN_HASHING_WORKERS = None
+
+# Local memory is per process; point this at a shared backend (file based,
+# Redis, memcached) when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Seconds a cached list response is kept, and how long a single rebuild may
+# hold the refill lock before other requests give up waiting on it.
+LIST_CACHE_TIMEOUT = 60 * 60
+LIST_CACHE_LOCK_TIMEOUT = 10
+
+# Coding submissions: per-test resource limits (questions may override the
+# CPU and memory limits) and how many sandboxed programs may run at once,
+# None meaning one per CPU core.
+SANDBOX_LIMITS = {
+    "cpu_seconds": 2,
+    "memory_mb": 256,
+    "wall_seconds": 5,
+    "output_bytes": 1024 * 1024,
+    # RLIMIT_NPROC counts every process of the worker's user, so anything
+    # above 0 lets a submission fork only while that user runs few enough.
+    "processes": 0,
+}
+SANDBOX_WORKERS = None
+
+# How long the result of a coding answer is reused for identical sources on
+# the same tests (seconds).
+SANDBOX_RESULT_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+# Grading queue: attempts before a job is marked failed, the base of the
+# exponential retry delay, and how long a running job may go without
+# finishing before it is assumed abandoned and queued again (seconds).
+GRADING_MAX_ATTEMPTS = 3
+GRADING_RETRY_DELAY = 10
+GRADING_JOB_TIMEOUT = 10 * 60
+
+# Send each request's query count and database, serializer and view time back
+# in a Server-Timing header.
+SERVER_TIMING_HEADER = True
+
+# Bearer token the Prometheus server scrapes /metrics with. Staff JWTs are
+# accepted as well; without a token only staff can read the metrics.
+METRICS_TOKEN = None
+
+# Where staff request profiles are saved, and how many of the newest are kept.
+PROFILE_DIR = BASE_DIR / "profiles"
+PROFILE_KEEP = 50
+
+# Per-request timing lines go to the console while DEBUG is on; route the
+# "letsCode.timing" logger to a real handler in production.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "require_debug_true": {"()": "django.utils.log.RequireDebugTrue"},
+    },
+    "handlers": {
+        "debug_console": {
+            "level": "INFO",
+            "filters": ["require_debug_true"],
+            "class": "logging.StreamHandler",
+        },
+    },
+    "loggers": {
+        "letsCode.timing": {"handlers": ["debug_console"], "level": "INFO"},
+    },
+}
@@ -0,0 +1,99 @@
+"""
+Sparse fieldsets: the ``fields`` query parameter.
+
+Clients that only need some of a resource's fields name them, e.g.
+``?fields=id,title,type``, and the views leave the others out of both the
+response and the SQL, so a large column such as ``Question.data`` is
+neither read nor sent. Fields that embed other resources take the fields of
+those after a dot: ``?fields=title,questions.id,questions.title``. Naming
+the embedding field alone keeps all of its fields.
+
+The fields always come back in their usual order, whatever the order they
+were asked for in.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+
+
+def requested_fields(request, available):
+    """
+    Parse the ``fields`` query parameter of a request.
+
+    Args:
+    - request (Request): The request.
+    - available (dict): Each field a client may ask for, in output order,
+      mapped to the names of its own fields if it embeds a resource and
+      to None otherwise.
+
+    Returns:
+    - dict: The requested fields, in output order, mapped like
+      ``available`` but with embedded fields narrowed to the requested
+      ones. Every field is returned when the parameter is absent.
+
+    Raises:
+    - ValidationError: If the parameter is empty or names an unknown field.
+    """
+    if FIELDS_PARAM not in request.query_params:
+        return {
+            name: None if nested is None else list(nested)
+            for name, nested in available.items()
+        }
+
+    names = [
+        name.strip()
+        for value in request.query_params.getlist(FIELDS_PARAM)
+        for name in value.split(",")
+        if name.strip()
+    ]
+    if not names:
+        raise ValidationError({FIELDS_PARAM: ["Name at least one field."]})
+
+    whole, parts, unknown = set(), {}, []
+    for name in names:
+        parent, _, child = name.partition(".")
+        nested = available.get(parent, ())
+        if parent not in available or (
+            child and (nested is None or child not in nested)
+        ):
+            unknown.append(name)
+        elif child:
+            parts.setdefault(parent, set()).add(child)
+        else:
+            whole.add(parent)
+    if unknown:
+        raise ValidationError(
+            {FIELDS_PARAM: [f"Unknown fields: {', '.join(unknown)}."]}
+        )
+
+    fields = {}
+    for name, nested in available.items():
+        if name in whole:
+            fields[name] = None if nested is None else list(nested)
+        elif name in parts:
+            fields[name] = [child for child in nested if child in parts[name]]
+    return fields
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that takes the ``requested_fields`` to keep as a
+    ``fields`` argument and drops the rest, along with any write-only fields.
+    Embedded serializers are narrowed to their requested fields as well.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        for name in list(self.fields):
+            if name not in fields:
+                self.fields.pop(name)
+                continue
+            if fields[name] is None:
+                continue
+            embedded = self.fields[name]
+            embedded = getattr(embedded, "child", embedded)
+            for child in list(embedded.fields):
+                if child not in fields[name]:
+                    embedded.fields.pop(child)
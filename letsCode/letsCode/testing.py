@@ -0,0 +1,170 @@
+"""
+Helpers shared by the app test suites.
+"""
+import re
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+
+from letsCode.timing import TRANSACTION_STATEMENTS, budget_for, handler_names
+
+APP_TABLE_PREFIXES = ("questions_", "assignments_")
+
+_POSTGRES_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def explain(sql):
+    """
+    Return the query plan of an already-interpolated SQL statement.
+
+    On PostgreSQL sequential scans are disabled while planning, so a table
+    that is small in the test database is still reported as a sequential
+    scan only when no index can serve the query.
+
+    Args:
+    - sql (str): The statement, as captured by ``CaptureQueriesContext``.
+
+    Returns:
+    - list: One string per plan line.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute("EXPLAIN " + sql)
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.execute("RESET enable_seqscan")
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[3] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN " + sql)
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+def full_scans(sql, plan):
+    """
+    Return the application tables that ``plan`` reads with a full scan.
+
+    SQLite reports walking a table in primary key order as a scan as well,
+    which is what an unfiltered keyset page does, so on SQLite only scans of
+    statements with a WHERE clause are counted.
+
+    Args:
+    - sql (str): The planned statement.
+    - plan (list): Its plan, as returned by ``explain``.
+
+    Returns:
+    - list: Names of the fully scanned tables.
+    """
+    if connection.vendor == "sqlite":
+        if " WHERE " not in sql:
+            return []
+        pattern = _SQLITE_FULL_SCAN
+    else:
+        pattern = _POSTGRES_SEQ_SCAN
+
+    tables = []
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match and match.group(1).startswith(APP_TABLE_PREFIXES):
+            tables.append(match.group(1))
+    return tables
+
+
+class QueryPlanAssertionsMixin:
+    """
+    TestCase mixin that checks captured queries against their query plans.
+    """
+
+    def assertNoFullScans(self, captured_queries):
+        """
+        Fail if any captured SELECT fully scans an application table.
+
+        Args:
+        - captured_queries (list): ``CaptureQueriesContext.captured_queries``.
+        """
+        for query in captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT"):
+                continue
+            plan = explain(sql)
+            tables = full_scans(sql, plan)
+            if tables:
+                self.fail(
+                    f"Full scan of {', '.join(tables)} in:\n{sql}\n\nPlan:\n"
+                    + "\n".join(plan)
+                )
+
+
+def handlers_without_budget(module):
+    """
+    Return the routed handlers of the views in ``module`` that declare no
+    query budget.
+
+    Args:
+    - module (str): Dotted path of a views module, e.g. ``"questions.views"``.
+
+    Returns:
+    - list: ``(route name, HTTP method)`` pairs.
+    """
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            else:
+                yield pattern
+
+    missing = []
+    for pattern in walk(get_resolver().url_patterns):
+        cls, actions = handler_names(pattern.callback)
+        if cls is None or cls.__module__ != module:
+            continue
+        for method in actions:
+            if budget_for(pattern.callback, method) is None:
+                missing.append((pattern.name, method.upper()))
+    return list(dict.fromkeys(missing))
+
+
+class QueryBudgetAssertionsMixin:
+    """
+    TestCase mixin that holds requests to their view's ``query_budget``.
+    """
+
+    def assertWithinQueryBudget(self, method, path, **kwargs):
+        """
+        Send a request with ``self.client`` and fail if it runs more queries
+        than its view's budget, or if the view declares none. Like
+        ``RequestTimingMiddleware``, transaction control is not counted.
+
+        Args:
+        - method (str): The HTTP method.
+        - path (str): The URL, optionally with a query string.
+        - **kwargs: Passed on to the client, e.g. ``data`` and headers.
+
+        Returns:
+        - HttpResponse: The response.
+        """
+        match = resolve(urlsplit(path).path)
+        budget = budget_for(match.func, method)
+        if budget is None:
+            self.fail(f"{match.view_name} declares no query budget for {method}.")
+
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method.lower())(path, **kwargs)
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if not query["sql"].startswith(TRANSACTION_STATEMENTS)
+        ]
+        if len(queries) > budget:
+            self.fail(
+                f"{method} {path} ran {len(queries)} queries, over its budget of "
+                f"{budget}:\n"
+                + "\n".join(f"{n}. {sql}" for n, sql in enumerate(queries, start=1))
+            )
+        return response
@@ -0,0 +1,271 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestTimingMiddleware`` counts the queries each request runs and times
+them, the serializers and the view. The numbers are sent back in a
+``Server-Timing`` header, so they show up in the browser's network panel, and
+logged as one ``key=value`` line per request on the ``letsCode.timing``
+logger.
+
+Views declare how many queries they may run with ``query_budget``. Requests
+over budget are logged as warnings, and the test suites assert the budgets
+with ``letsCode.testing.QueryBudgetAssertionsMixin``.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework import serializers
+
+logger = logging.getLogger("letsCode.timing")
+
+# Transaction control is not counted against budgets: Django issues it
+# itself, and differently per backend. SQLite runs a BEGIN for each outermost
+# atomic block where PostgreSQL runs none, and tests get savepoints instead.
+TRANSACTION_STATEMENTS = (
+    "BEGIN",
+    "COMMIT",
+    "ROLLBACK",
+    "SAVEPOINT",
+    "RELEASE SAVEPOINT",
+)
+
+_current = ContextVar("request_timings", default=None)
+_serializers_instrumented = False
+
+
+class RequestTimings:
+    """
+    What one request has spent so far; all durations are in seconds.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.view = 0.0
+        self.serializing = False
+
+
+def query_budget(queries=None, **handlers):
+    """
+    Declare the most queries a view may run for one request.
+
+    On a view method, give the budget of that method::
+
+        @query_budget(2)
+        def list(self, request): ...
+
+    On a view class, give one per HTTP method or viewset action, which
+    covers inherited handlers as well::
+
+        @query_budget(get=1, put=4)
+        class AssignmentUpdateView(RetrieveUpdateAPIView): ...
+
+    Args:
+    - queries (int): The budget of a decorated method.
+    - **handlers (int): The budgets of a decorated class, by handler name.
+    """
+
+    def decorate(view):
+        if isinstance(view, type):
+            if queries is not None or not handlers:
+                raise TypeError("Give a view class its budgets by handler name.")
+            view.query_budgets = {**getattr(view, "query_budgets", {}), **handlers}
+        else:
+            if queries is None or handlers:
+                raise TypeError("Give a view method a single budget.")
+            view.query_budget = queries
+        return view
+
+    return decorate
+
+
+def handler_names(view, method=None):
+    """
+    Return the view class and handler names behind a routed view.
+
+    Args:
+    - view (callable): The view, as returned by ``as_view``.
+    - method (str): Only return the handler for this HTTP method.
+
+    Returns:
+    - tuple: The view class, or None for function views, and a dict of HTTP
+      method to handler name: the viewset action or the method itself.
+    """
+    cls = getattr(view, "cls", None) or getattr(view, "view_class", None)
+    if cls is None:
+        return None, {}
+    actions = getattr(view, "actions", None)
+    if actions is None:
+        actions = {
+            name: name
+            for name in cls.http_method_names
+            if name not in ("head", "options") and hasattr(cls, name)
+        }
+    if method is not None:
+        method = method.lower()
+        actions = {method: actions[method]} if method in actions else {}
+    return cls, actions
+
+
+def budget_for(view, method):
+    """
+    Return the query budget of the handler serving ``method`` in ``view``.
+
+    Args:
+    - view (callable): The view, as returned by ``as_view``.
+    - method (str): The HTTP method.
+
+    Returns:
+    - int: The budget, or None if the handler declares none.
+    """
+    cls, actions = handler_names(view, method)
+    if not actions:
+        return None
+    name = actions[method.lower()]
+    budget = getattr(getattr(cls, name, None), "query_budget", None)
+    if budget is None:
+        budget = getattr(cls, "query_budgets", {}).get(name)
+    return budget
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None or sql.startswith(TRANSACTION_STATEMENTS):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def _instrument_connection(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    _instrument_connection(connection)
+
+
+def _timed_data(data):
+    # Nested serializers are timed as part of the outermost one.
+    def timed(self):
+        timings = _current.get()
+        if timings is None or timings.serializing:
+            return data.fget(self)
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            timings.serializing = False
+            timings.serialize += time.perf_counter() - started
+
+    return property(timed)
+
+
+def instrument_serializers():
+    """
+    Time ``.data`` of every DRF serializer, which is where they do their work.
+    """
+    global _serializers_instrumented
+    if _serializers_instrumented:
+        return
+    _serializers_instrumented = True
+    serializers.Serializer.data = _timed_data(serializers.Serializer.data)
+    serializers.ListSerializer.data = _timed_data(serializers.ListSerializer.data)
+
+
+class RequestTimingMiddleware:
+    """
+    Report the queries, database time, serializer time and view time of each
+    request.
+
+    It belongs last in ``MIDDLEWARE``, so that the view time covers the view
+    alone. The database and serializer times are part of the view time, and a
+    serializer's time includes the queries it triggers. The body of a
+    streaming response is produced after the middleware returns and is not
+    counted.
+
+    The request's ``RequestTimings`` are left on ``request.timings`` for the
+    middleware above it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        instrument_serializers()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(timings, token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(timings, token)
+        return self.finish(request, response, timings)
+
+    def start(self, request):
+        # Connections opened before this module was imported have not been
+        # through connection_created.
+        for connection in connections.all(initialized_only=True):
+            _instrument_connection(connection)
+        timings = RequestTimings()
+        timings.view = time.perf_counter()
+        request.timings = timings
+        return timings, _current.set(timings)
+
+    def stop(self, timings, token):
+        timings.view = time.perf_counter() - timings.view
+        _current.reset(token)
+
+    def finish(self, request, response, timings):
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = (
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+                f"serialize;dur={timings.serialize * 1000:.2f}, "
+                f"view;dur={timings.view * 1000:.2f}"
+            )
+
+        match = request.resolver_match
+        budget = budget_for(match.func, request.method) if match else None
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "route": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "budget": budget,
+            "db_ms": round(timings.db * 1000, 2),
+            "serialize_ms": round(timings.serialize * 1000, 2),
+            "view_ms": round(timings.view * 1000, 2),
+        }
+        line = " ".join(f"{key}={value}" for key, value in fields.items())
+        if budget is not None and timings.queries > budget:
+            logger.warning("over_query_budget " + line, extra={"timing": fields})
+        else:
+            logger.info(line, extra={"timing": fields})
+        return response
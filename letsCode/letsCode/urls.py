@@ -19,14 +19,19 @@ from django.urls import include, path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from assignments.urls import enrollment_router
+from letsCode.metrics import metrics_view
 from questions.urls import question_router
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("api/", include("user_profile.urls")),
+    # Before the router, whose detail route would otherwise match "async".
+    path("api/", include("questions.urls")),
     path("", include(question_router.urls)),
     path("", include(enrollment_router.urls)),
     path("api/", include("assignments.urls")),
+    path("api/", include("submissions.urls")),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
@@ -0,0 +1,24 @@
+from .models import Question
+
+EXPORT_CHUNK_SIZE = 2000
+
+QUESTION_EXPORT_FIELDS = ["id", "title", "data", "type", "isDeleted"]
+
+
+def question_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over every question, including soft-deleted ones, for export.
+
+    Rows are read through a server-side cursor ``chunk_size`` at a time.
+
+    Args:
+    - chunk_size (int): Rows fetched from the database per round trip.
+
+    Yields:
+    - dict: One row per question, keyed by ``QUESTION_EXPORT_FIELDS``.
+    """
+    return (
+        Question.objects.order_by("id")
+        .values(*QUESTION_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
@@ -0,0 +1,53 @@
+from django.db.models import IntegerField
+from rest_framework.exceptions import ValidationError
+
+from .models import DATA_FILTERS, Question
+
+
+def filter_questions(queryset, params):
+    """
+    Narrow a question queryset by the filters given in query parameters.
+
+    Soft-deleted questions are always left out: the list is public, and the
+    question indexes only cover live rows. Supported parameters are ``type``
+    and every path declared in ``DATA_FILTERS``. Data filters compare against
+    the same expressions the question indexes are built on, so they run in
+    the database with index support.
+
+    Args:
+    - queryset (QuerySet): The questions to filter.
+    - params (QueryDict): The request query parameters.
+
+    Returns:
+    - QuerySet: The filtered questions.
+
+    Raises:
+    - ValidationError: If a parameter value is invalid.
+    """
+    errors = {}
+    filters = {"isDeleted": False}
+
+    if "type" in params:
+        value = params["type"]
+        if value in dict(Question.TYPE_CHOICES):
+            filters["type"] = value
+        else:
+            errors["type"] = [f'"{value}" is not a valid choice.']
+
+    aliases = {}
+    for name, expression in DATA_FILTERS.items():
+        if name not in params:
+            continue
+        value = params[name]
+        if isinstance(expression.output_field, IntegerField):
+            try:
+                value = int(value)
+            except ValueError:
+                errors[name] = ["A valid integer is required."]
+                continue
+        aliases[f"data_{name}"] = expression
+        filters[f"data_{name}"] = value
+
+    if errors:
+        raise ValidationError(errors)
+    return queryset.alias(**aliases).filter(**filters)
@@ -0,0 +1,66 @@
+"""
+Database functions over ``Question.data`` that can back expression indexes.
+
+The JSON key is written into the SQL as a literal rather than bound as a
+parameter: an index on an expression is only used for queries whose
+expression matches it exactly, and a bound key never does on SQLite.
+"""
+import re
+
+from django.db.models import Func, IntegerField, TextField
+
+
+class JSONKeyFunc(Func):
+    """
+    Base class for functions of a single top-level key of a JSON column.
+    """
+
+    postgresql_template = None
+    sqlite_template = None
+
+    def __init__(self, expression, key, **extra):
+        if not re.fullmatch(r"\w+", key):
+            raise ValueError(f"Invalid JSON key: {key!r}")
+        self.key = key
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotImplementedError(
+            f"{self.__class__.__name__} is not supported on {connection.vendor}."
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        template = self.postgresql_template.format(key=self.key)
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        template = self.sqlite_template.format(key=self.key)
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+
+class JSONKeyText(JSONKeyFunc):
+    """
+    The value stored under ``key`` as text, or NULL when the key is missing.
+    """
+
+    output_field = TextField()
+    postgresql_template = "(%(expressions)s ->> '{key}')"
+    sqlite_template = "CAST(json_extract(%(expressions)s, '$.{key}') AS TEXT)"
+
+
+class JSONArrayLength(JSONKeyFunc):
+    """
+    Number of elements in the array stored under ``key``.
+
+    Evaluates to NULL when the key is missing or does not hold an array.
+    """
+
+    output_field = IntegerField()
+    postgresql_template = (
+        "CASE WHEN jsonb_typeof(%(expressions)s -> '{key}') = 'array' "
+        "THEN jsonb_array_length(%(expressions)s -> '{key}') END"
+    )
+    sqlite_template = (
+        "CASE WHEN json_type(%(expressions)s, '$.{key}') = 'array' "
+        "THEN json_array_length(%(expressions)s, '$.{key}') END"
+    )
@@ -0,0 +1,203 @@
+"""
+Streaming bulk import of questions.
+
+Uploads are read incrementally from a binary stream, validated with
+``QuestionSerializer`` and inserted with ``bulk_create`` one chunk per
+transaction, so memory use is bounded by the chunk size and not by the size
+of the upload.
+"""
+import codecs
+import json
+from itertools import chain
+
+from django.db import transaction
+
+from letsCode.cache import bump_version
+
+from .models import Question
+from .serializers import QuestionSerializer
+
+CHUNK_SIZE = 500
+READ_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    """Raised when a JSON array upload is malformed past the point of recovery."""
+
+
+def _read_text(stream):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+
+def _iter_ndjson(first_text, texts):
+    buffer = ""
+    row = 0
+    for text in chain([first_text], texts):
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                row += 1
+                yield row, line
+    if buffer.strip():
+        yield row + 1, buffer
+
+
+def _iter_json_array(first_text, texts):
+    decoder = json.JSONDecoder()
+    buffer = first_text.lstrip()[1:]  # drop the opening "["
+    eof = False
+    row = 0
+    expect_value = True
+
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer and not eof:
+            try:
+                buffer = next(texts)
+            except StopIteration:
+                eof = True
+            continue
+
+        if not buffer:
+            raise ImportFormatError("Unexpected end of JSON array.")
+
+        if not expect_value:
+            if buffer[0] == "]":
+                return
+            if buffer[0] != ",":
+                raise ImportFormatError(f"Expected ',' or ']' after row {row}.")
+            buffer = buffer[1:]
+            expect_value = True
+            continue
+
+        if buffer[0] == "]" and row == 0:
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as exc:
+            if eof:
+                raise ImportFormatError(f"Invalid JSON in row {row + 1}: {exc.msg}.")
+            try:
+                buffer += next(texts)
+            except StopIteration:
+                eof = True
+            continue
+
+        row += 1
+        yield row, value
+        buffer = buffer[end:]
+        expect_value = False
+
+
+def iter_records(stream):
+    """
+    Yield ``(row_number, record)`` pairs from an NDJSON or JSON array upload.
+
+    The format is detected from the first non-blank character. NDJSON rows
+    are yielded as undecoded lines so that a malformed line is reported
+    against its row instead of aborting the whole import.
+
+    Args:
+    - stream: A binary file-like object with a ``read(size)`` method.
+
+    Yields:
+    - tuple: The 1-based row number and the record (a dict, or a string
+      for NDJSON lines that still need decoding).
+
+    Raises:
+    - ImportFormatError: If a JSON array upload cannot be parsed.
+    """
+    texts = _read_text(stream)
+    first_text = ""
+    for text in texts:
+        first_text += text
+        if first_text.strip():
+            break
+
+    if first_text.lstrip().startswith("["):
+        yield from _iter_json_array(first_text, texts)
+    else:
+        yield from _iter_ndjson(first_text, texts)
+
+
+def import_questions(stream, chunk_size=CHUNK_SIZE):
+    """
+    Validate and insert every question in ``stream``.
+
+    Valid rows are inserted even when other rows fail; each chunk of valid
+    rows is committed in its own transaction.
+
+    Args:
+    - stream: A binary file-like object holding NDJSON or a JSON array.
+    - chunk_size (int): Rows validated and inserted per transaction.
+
+    Returns:
+    - dict: ``created`` and ``failed`` row counts, and ``errors`` listing
+      the row number and validation errors of up to ``MAX_REPORTED_ERRORS``
+      failed rows, with ``errors_truncated`` set if there were more. A JSON
+      array that is malformed or cut short counts as one more failed row,
+      with no row number.
+    """
+    report = {"created": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def fail(row, errors):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row, "errors": errors})
+        else:
+            report["errors_truncated"] = True
+
+    def flush(questions):
+        if questions:
+            with transaction.atomic():
+                Question.objects.bulk_create(questions)
+            report["created"] += len(questions)
+
+    pending = []
+    try:
+        for row, record in iter_records(stream):
+            if isinstance(record, str):
+                try:
+                    record = json.loads(record)
+                except json.JSONDecodeError as exc:
+                    fail(row, {"non_field_errors": [f"Invalid JSON: {exc.msg}."]})
+                    continue
+
+            serializer = QuestionSerializer(data=record)
+            if not serializer.is_valid():
+                fail(row, serializer.errors)
+                continue
+
+            pending.append(Question(**serializer.validated_data))
+            if len(pending) >= chunk_size:
+                flush(pending)
+                pending = []
+
+        flush(pending)
+    except ImportFormatError as exc:
+        # Rows decoded before the malformed one are still imported. The rest
+        # of the upload counts as one failed row, reported even past
+        # MAX_REPORTED_ERRORS since it is why the import stopped.
+        flush(pending)
+        report["failed"] += 1
+        report["errors"].append(
+            {"row": None, "errors": {"non_field_errors": [str(exc)]}}
+        )
+    finally:
+        if report["created"]:
+            bump_version("questions")
+
+    return report
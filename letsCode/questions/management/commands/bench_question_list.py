@@ -0,0 +1,81 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from letsCode.benchmarking import isolated_database, measure
+from questions.models import Question
+from questions.views import QuestionViewSet
+
+
+def sample_question(index):
+    return Question(
+        title=f"Benchmark question {index}",
+        data={
+            "question": f"What is {index} + {index}?",
+            "options": [str(index), str(index * 2), str(index * 3), str(index * 4)],
+            "answer": str(index * 2),
+        },
+        type="mcq",
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the paginated question list as the table grows. "
+        "Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000,1000000",
+            help="Comma separated table sizes to measure at.",
+        )
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        view = QuestionViewSet.as_view({"get": "list"})
+        factory = APIRequestFactory()
+
+        def fetch(params):
+            def request():
+                response = view(factory.get("/api/questions/", params))
+                response.render()
+                return response
+
+            return request
+
+        with isolated_database():
+            self.stdout.write(
+                f"{'rows':>10} {'page':>6} {'median ms':>10} {'p95 ms':>8} "
+                f"{'heap KiB':>9} {'+rss KiB':>9}"
+            )
+            rows = 0
+            for size in sizes:
+                while rows < size:
+                    batch = min(options["batch_size"], size - rows)
+                    Question.objects.bulk_create(
+                        sample_question(rows + i) for i in range(batch)
+                    )
+                    rows += batch
+
+                middle_id = Question.objects.order_by("id").values_list(
+                    "id", flat=True
+                )[size // 2]
+                cursor = b64encode(urlencode({"p": middle_id}).encode()).decode()
+                pages = {
+                    "first": {"page_size": options["page_size"]},
+                    "middle": {"page_size": options["page_size"], "cursor": cursor},
+                }
+                for label, params in pages.items():
+                    result = measure(fetch(params), repeat=options["repeat"])
+                    self.stdout.write(
+                        f"{size:>10} {label:>6} {result['median_ms']:>10.2f} "
+                        f"{result['p95_ms']:>8.2f} {result['peak_kib']:>9.0f} "
+                        f"{result['rss_growth_kib']:>9}"
+                    )
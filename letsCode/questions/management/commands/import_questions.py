@@ -0,0 +1,23 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from questions.importing import CHUNK_SIZE, import_questions
+
+
+class Command(BaseCommand):
+    help = "Import questions from an NDJSON or JSON array file ('-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            report = import_questions(sys.stdin.buffer, options["chunk_size"])
+        else:
+            with open(options["path"], "rb") as stream:
+                report = import_questions(stream, options["chunk_size"])
+
+        self.stdout.write(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("questions", "0005_question_isdeleted"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="question",
+            name="type",
+            field=models.CharField(
+                choices=[("mcq", "MCQ"), ("coding", "Coding")],
+                default="mcq",
+                max_length=100,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(("isDeleted", False)),
+                fields=["id"],
+                name="question_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+from django.db import migrations
+
+# The search index lives outside the model: a tsvector column with a GIN
+# index on PostgreSQL and an FTS5 table on SQLite. Both are kept current by
+# database triggers, so bulk_create and queryset updates are indexed too.
+
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('english', coalesce({row}.title, '')), 'A')
+    || setweight(jsonb_to_tsvector('english', {row}.data, '["string"]'), 'B')
+"""
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE questions_question ADD COLUMN search_vector tsvector",
+    f"""
+    CREATE FUNCTION questions_question_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {POSTGRES_DOCUMENT.format(row="NEW")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER questions_question_search_update
+    BEFORE INSERT OR UPDATE OF title, data ON questions_question
+    FOR EACH ROW EXECUTE FUNCTION questions_question_search_update()
+    """,
+    f"""
+    UPDATE questions_question
+    SET search_vector = {POSTGRES_DOCUMENT.format(row="questions_question")}
+    """,
+    """
+    CREATE INDEX question_search_idx ON questions_question
+    USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER questions_question_search_update ON questions_question",
+    "DROP FUNCTION questions_question_search_update()",
+    "ALTER TABLE questions_question DROP COLUMN search_vector",
+]
+
+SQLITE_BODY = (
+    "(SELECT group_concat(value, ' ') FROM json_tree({row}.data) "
+    "WHERE type = 'text')"
+)
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE questions_question_fts
+    USING fts5(title, body, tokenize = 'porter unicode61')
+    """,
+    f"""
+    CREATE TRIGGER questions_question_fts_insert
+    AFTER INSERT ON questions_question BEGIN
+        INSERT INTO questions_question_fts (rowid, title, body)
+        VALUES (NEW.id, NEW.title, {SQLITE_BODY.format(row="NEW")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER questions_question_fts_update
+    AFTER UPDATE OF title, data ON questions_question BEGIN
+        DELETE FROM questions_question_fts WHERE rowid = OLD.id;
+        INSERT INTO questions_question_fts (rowid, title, body)
+        VALUES (NEW.id, NEW.title, {SQLITE_BODY.format(row="NEW")});
+    END
+    """,
+    """
+    CREATE TRIGGER questions_question_fts_delete
+    AFTER DELETE ON questions_question BEGIN
+        DELETE FROM questions_question_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    INSERT INTO questions_question_fts (rowid, title, body)
+    SELECT id, title, {SQLITE_BODY.format(row="questions_question")}
+    FROM questions_question
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER questions_question_fts_insert",
+    "DROP TRIGGER questions_question_fts_update",
+    "DROP TRIGGER questions_question_fts_delete",
+    "DROP TABLE questions_question_fts",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("questions", "0006_alter_question_type_question_question_active_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run({"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
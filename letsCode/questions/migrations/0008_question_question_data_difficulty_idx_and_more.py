@@ -0,0 +1,40 @@
+# Generated by Django 4.2.5 on 2026-10-18 07:45
+
+from django.db import migrations, models
+import questions.functions
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("questions", "0007_question_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                questions.functions.JSONKeyText("data", "difficulty"),
+                models.F("id"),
+                condition=models.Q(("isDeleted", False)),
+                name="question_data_difficulty_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                questions.functions.JSONKeyText("data", "language"),
+                models.F("id"),
+                condition=models.Q(("isDeleted", False)),
+                name="question_data_language_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                questions.functions.JSONArrayLength("data", "options"),
+                models.F("id"),
+                condition=models.Q(("isDeleted", False)),
+                name="question_data_options_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:19
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search_index = import_module("questions.migrations.0007_question_search_index")
+
+# SQLite adds the column by rebuilding the table, which drops the triggers
+# that keep the search index current, so they are created again afterwards.
+SQLITE_TRIGGERS = [
+    statement
+    for statement in search_index.SQLITE_FORWARD
+    if "CREATE TRIGGER" in statement
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("questions", "0008_question_question_data_difficulty_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, search_index.run({"sqlite": SQLITE_TRIGGERS})
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(
+            search_index.run({"sqlite": SQLITE_TRIGGERS}), migrations.RunPython.noop
+        ),
+    ]
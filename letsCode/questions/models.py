@@ -1,5 +1,19 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from letsCode.cache import bump_version_on_commit
+
+from .functions import JSONArrayLength, JSONKeyText
+
+# Paths inside Question.data that the question list can be filtered on. Each
+# one is backed by an expression index over live questions.
+DATA_FILTERS = {
+    "difficulty": JSONKeyText("data", "difficulty"),
+    "language": JSONKeyText("data", "language"),
+    "options": JSONArrayLength("data", "options"),
+}
 
 
 class Question(models.Model):
@@ -10,10 +24,36 @@ class Question(models.Model):
     title = models.TextField(help_text="title or description of the question")
     # The 'data' field stores JSON data representing the question details.
     data = models.JSONField()
-    type = models.CharField(max_length=100,choices=TYPE_CHOICES, default="mcq")
+    type = models.CharField(max_length=100, choices=TYPE_CHOICES, default="mcq")
     isDeleted = models.BooleanField(default=False)
+    # Indexed so that the list ETag can read the latest change off the index.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Live questions in page order; soft-deleted rows are left out.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(isDeleted=False),
+                name="question_active_idx",
+            ),
+        ] + [
+            models.Index(
+                expression,
+                models.F("id"),
+                condition=models.Q(isDeleted=False),
+                name=f"question_data_{name}_idx",
+            )
+            for name, expression in DATA_FILTERS.items()
+        ]
+
     def __str__(self):
         return self.title
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_lists(sender, **kwargs):
+    bump_version_on_commit("questions")
@@ -0,0 +1,85 @@
+"""
+Ranked keyword search over question titles and the text inside their data.
+
+The index itself is maintained by database triggers, see migration
+``0007_question_search_index``.
+"""
+import re
+
+from django.db import connection
+
+from .models import Question
+
+_POSTGRES_SEARCH = """
+    SELECT q.id
+    FROM questions_question q, websearch_to_tsquery('english', %s) query
+    WHERE q.search_vector @@ query AND NOT q."isDeleted"
+    ORDER BY ts_rank(q.search_vector, query) DESC, q.id
+    LIMIT %s OFFSET %s
+"""
+
+# bm25() ranks better matches lower; title matches weigh more than body ones.
+_SQLITE_SEARCH = """
+    SELECT f.rowid
+    FROM questions_question_fts f
+    JOIN questions_question q ON q.id = f.rowid
+    WHERE questions_question_fts MATCH %s AND NOT q."isDeleted"
+    ORDER BY bm25(questions_question_fts, 4.0, 1.0), f.rowid
+    LIMIT %s OFFSET %s
+"""
+
+
+def _sqlite_match_expression(query):
+    # Quote every word so that user input cannot form FTS5 query syntax.
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+def search_question_ids(query, limit, offset=0):
+    """
+    Return the ids of live questions matching ``query``, best match first.
+
+    Args:
+    - query (str): The keywords to search for.
+    - limit (int): The maximum number of ids to return.
+    - offset (int): How many matches to skip.
+
+    Returns:
+    - list: The matching question ids, in rank order.
+    """
+    if connection.vendor == "postgresql":
+        sql, term = _POSTGRES_SEARCH, query
+    elif connection.vendor == "sqlite":
+        sql, term = _SQLITE_SEARCH, _sqlite_match_expression(query)
+        if not term:
+            return []
+    else:
+        return list(
+            Question.objects.filter(isDeleted=False, title__icontains=query)
+            .order_by("id")
+            .values_list("id", flat=True)[offset : offset + limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [term, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_questions(query, limit, offset=0, fields=None):
+    """
+    Return the live questions matching ``query``, best match first.
+
+    Args:
+    - query (str): The keywords to search for.
+    - limit (int): The maximum number of questions to return.
+    - offset (int): How many matches to skip.
+    - fields (list): Only load these fields of the questions.
+
+    Returns:
+    - list: The matching ``Question`` objects, in rank order.
+    """
+    ids = search_question_ids(query, limit, offset)
+    queryset = (
+        Question.objects.all() if fields is None else Question.objects.only(*fields)
+    )
+    questions = queryset.in_bulk(ids)
+    return [questions[question_id] for question_id in ids if question_id in questions]
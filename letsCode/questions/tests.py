@@ -1,3 +1,610 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import pstats
+import re
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from letsCode.cache import asingle_flight, get_version, single_flight
+from letsCode.profiling import profile_path
+from letsCode.testing import (
+    QueryBudgetAssertionsMixin,
+    QueryPlanAssertionsMixin,
+    handlers_without_budget,
+)
+
+from . import importing
+from .importing import import_questions
+from .models import Question
+from .search import search_question_ids
+from .serializers import QuestionSerializer
+
+
+class QuestionListQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.bulk_create(
+            Question(
+                title=f"q{i}",
+                data={
+                    "difficulty": ["easy", "medium", "hard"][i % 3],
+                    "language": ["python", "c"][i % 2],
+                    "options": ["a", "b", "c", "d"][: i % 5],
+                },
+                type=["mcq", "coding"][i % 2],
+                isDeleted=i % 4 == 0,
+            )
+            for i in range(2000)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_question_list_pages_use_an_index(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get("/api/questions/", {"page_size": 50})
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(response.json()["next"])
+
+        self.assertNoFullScans(first.captured_queries)
+        self.assertNoFullScans(second.captured_queries)
+
+    def test_anonymous_clients_never_see_deleted_questions(self):
+        for path in ("/api/questions/", "/api/questions/async/"):
+            for value in ("true", "1"):
+                response = self.client.get(
+                    path, {"isDeleted": value, "page_size": 1000}
+                )
+                self.assertEqual(response.status_code, 200)
+                ids = [row["id"] for row in response.json()["results"]]
+                self.assertFalse(
+                    Question.objects.filter(id__in=ids, isDeleted=True).exists()
+                )
+                self.assertEqual(len(ids), 1000)
+
+    def test_data_filters_use_an_index(self):
+        for params in (
+            {"difficulty": "hard"},
+            {"language": "c", "type": "coding"},
+            {"options": "4"},
+        ):
+            with self.subTest(**params):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get("/api/questions/", params)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.json()["results"])
+                self.assertNoFullScans(context.captured_queries)
+
+
+class QuestionQueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.questions = Question.objects.bulk_create(
+            Question(
+                title=f"sorting question {i}",
+                data={"options": ["a", "b"], "answer": "a"},
+                type="mcq",
+            )
+            for i in range(20)
+        )
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def send(self, method, path, data=None):
+        kwargs = dict(self.auth)
+        if data is not None:
+            kwargs.update(data=json.dumps(data), content_type="application/json")
+        return self.assertWithinQueryBudget(method, path, **kwargs)
+
+    def test_every_view_declares_a_budget(self):
+        self.assertEqual(handlers_without_budget("questions.views"), [])
+
+    def test_reads_stay_within_budget(self):
+        detail = f"/api/questions/{self.questions[0].id}/"
+        for path in (
+            "/api/questions/",
+            "/api/questions/async/",
+            "/api/questions/search/?q=sorting",
+            detail,
+        ):
+            self.assertEqual(self.send("GET", path).status_code, 200, path)
+
+    def test_writes_stay_within_budget(self):
+        question = {"title": "new", "type": "mcq", "data": {"options": ["a"]}}
+        detail = f"/api/questions/{self.questions[0].id}/"
+        self.assertEqual(
+            self.send("POST", "/api/questions/", question).status_code, 201
+        )
+        self.assertEqual(self.send("PUT", detail, question).status_code, 200)
+        self.assertEqual(self.send("PATCH", detail, {"title": "x"}).status_code, 200)
+        self.assertEqual(self.send("DELETE", detail).status_code, 200)
+        response = self.send("POST", "/api/questions/import/", [question] * 5)
+        self.assertEqual(response.status_code, 201)
+
+    def test_server_timing_reports_the_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/questions/", **self.auth)
+        timing = response["Server-Timing"]
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+        self.assertEqual(int(match.group(1)), len(queries))
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn("view;dur=", timing)
+
+
+class QuestionListRenderingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.bulk_create(
+            Question(
+                title=f'Ünïcode \u2028 <q{i}> "quoted"',
+                data={
+                    "options": ["a", "\u2029", None, True],
+                    "score": 1.5 * i,
+                    "nested": {"é": [i, {"x": None}]},
+                },
+                type=["mcq", "coding"][i % 2],
+                isDeleted=i == 2,
+            )
+            for i in range(7)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_match_the_serializer_byte_for_byte(self):
+        for path in ("/api/questions/", "/api/questions/async/"):
+            url = path + "?page_size=3"
+            while url:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    body = response.json()
+                    ids = [row["id"] for row in body["results"]]
+                    questions = Question.objects.filter(id__in=ids).order_by("id")
+                    expected = {
+                        "next": body["next"],
+                        "previous": body["previous"],
+                        "results": QuestionSerializer(questions, many=True).data,
+                    }
+                    self.assertEqual(response.content, JSONRenderer().render(expected))
+                url = body["next"]
+
+    def test_indented_and_browsable_responses_are_rendered(self):
+        response = self.client.get(
+            "/api/questions/", HTTP_ACCEPT="application/json; indent=2"
+        )
+        self.assertTrue(response.content.startswith(b'{\n  "next"'))
+        response = self.client.get("/api/questions/", HTTP_ACCEPT="text/html")
+        self.assertContains(response, "&quot;results&quot;")
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.questions = Question.objects.bulk_create(
+            Question(title=f"sorting q{i}", data={"blob": "x" * 100}, type="mcq")
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def get(self, path, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params, **self.auth)
+        self.assertEqual(response.status_code, 200, response.content)
+        for query in queries:
+            self.assertNotIn('"data"', query["sql"])
+        return response.json()
+
+    def test_only_the_requested_fields_are_read_and_sent(self):
+        for path in ("/api/questions/", "/api/questions/async/"):
+            body = self.get(path, fields="type,title", page_size=2)
+            self.assertEqual(body["results"][0], {"title": "sorting q0", "type": "mcq"})
+            # The cursor still works without the id in the output.
+            body = self.client.get(body["next"]).json()
+            self.assertEqual(body["results"][0]["title"], "sorting q2")
+
+        question = self.questions[1]
+        body = self.get(f"/api/questions/{question.id}/", fields="id,title")
+        self.assertEqual(body, {"id": question.id, "title": "sorting q1"})
+
+        body = self.get("/api/questions/search/", q="sorting", fields="title")
+        self.assertEqual(len(body["results"]), 5)
+        self.assertEqual(set(body["results"][0]), {"title"})
+
+    def test_unknown_fields_are_rejected(self):
+        for fields in ("title,answer", "data.options", ""):
+            response = self.client.get("/api/questions/", {"fields": fields})
+            self.assertEqual(response.status_code, 400, fields)
+            self.assertIn("fields", response.json())
+
+
+class ConditionalListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.questions = Question.objects.bulk_create(
+            Question(title=f"q{i}", data={"options": ["a"]}, type="mcq")
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_lists_are_not_modified(self):
+        for path in ("/api/questions/", "/api/questions/async/"):
+            with self.subTest(path=path):
+                etag = self.client.get(path)["ETag"]
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(len(queries), 1)
+
+    def test_etag_follows_the_questions_and_the_query(self):
+        etag = self.client.get("/api/questions/")["ETag"]
+        self.assertNotEqual(
+            self.client.get("/api/questions/", {"page_size": 2})["ETag"], etag
+        )
+
+        question = self.questions[0]
+        token = RefreshToken.for_user(self.admin).access_token
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/questions/{question.id}/",
+                json.dumps({"title": "edited"}),
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+        response = self.client.get("/api/questions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["results"][0]["title"], "edited")
+
+        # Deleting a row leaves no newer timestamp behind.
+        etag = response["ETag"]
+        Question.objects.filter(id=self.questions[-1].id).delete()
+        response = self.client.get("/api/questions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.bulk_create(
+            Question(title=f"q{i}", data={"options": ["a"]}, type="mcq")
+            for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self):
+        response = self.client.get("/api/questions/")
+        return [row["title"] for row in response.json()["results"]]
+
+    def test_writes_outside_the_views_invalidate_the_list(self):
+        self.assertEqual(self.titles(), ["q0", "q1", "q2"])
+        version = get_version("questions")
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            question = Question.objects.create(title="new", data={}, type="mcq")
+            # Not before the transaction commits.
+            self.assertEqual(get_version("questions"), version)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.titles(), ["q0", "q1", "q2", "new"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.isDeleted = True
+            question.save()
+        self.assertEqual(self.titles(), ["q0", "q1", "q2"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.filter(title="q1").delete()
+        self.assertEqual(self.titles(), ["q0", "q2"])
+
+    @override_settings(ALLOWED_HOSTS=["a.example", "b.example"])
+    def test_pages_are_cached_per_host(self):
+        for host in ("a.example", "b.example"):
+            response = self.client.get(
+                "/api/questions/", {"page_size": 1}, HTTP_HOST=host
+            )
+            self.assertTrue(response.json()["next"].startswith(f"http://{host}/"))
+
+    def test_concurrent_misses_build_once(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        values = []
+        threads = [
+            threading.Thread(target=lambda: values.append(single_flight("k", build)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(builds), values), (1, ["value"] * 8))
+
+        async def abuild():
+            builds.append(1)
+            await asyncio.sleep(0.1)
+            return "value"
+
+        async def misses():
+            return await asyncio.gather(
+                *(asingle_flight("async-k", abuild) for _ in range(8))
+            )
+
+        self.assertEqual(asyncio.run(misses()), ["value"] * 8)
+        self.assertEqual(len(builds), 2)
+
+
+class TrickleStream(io.BytesIO):
+    """
+    An upload read back a few bytes at a time, so that rows and multi-byte
+    characters are split across reads.
+    """
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+def question(title):
+    return {"title": title, "type": "mcq", "data": {"options": ["ä", "b"]}}
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def titles(self):
+        return list(Question.objects.order_by("id").values_list("title", flat=True))
+
+    def admin_token(self):
+        admin = User.objects.create_superuser("admin", password="secret")
+        return RefreshToken.for_user(admin).access_token
+
+    def test_ndjson(self):
+        lines = [
+            json.dumps(question("é1")),
+            json.dumps(question("é2")),
+            "",
+            '{"title": "broken"',
+            json.dumps({"type": "mcq", "data": {}}),
+            json.dumps(question("é3")),
+        ]
+        upload = "\n".join(lines).encode()  # No trailing newline.
+        report = import_questions(TrickleStream(upload), chunk_size=2)
+
+        self.assertEqual((report["created"], report["failed"]), (3, 2))
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4])
+        self.assertIn("title", report["errors"][1]["errors"])
+        self.assertEqual(self.titles(), ["é1", "é2", "é3"])
+
+    def test_json_array(self):
+        rows = [question("é1"), {"title": "x", "type": "other", "data": {}}]
+        rows += [question(f"é{i}") for i in range(2, 6)]
+        upload = json.dumps(rows, indent=2).encode()
+        report = import_questions(TrickleStream(upload), chunk_size=2)
+
+        self.assertEqual((report["created"], report["failed"]), (5, 1))
+        self.assertEqual(report["errors"][0]["row"], 2)
+        self.assertEqual(self.titles(), ["é1", "é2", "é3", "é4", "é5"])
+
+        self.assertEqual(
+            import_questions(io.BytesIO(b" [ ] ")),
+            {"created": 0, "failed": 0, "errors": [], "errors_truncated": False},
+        )
+
+    def test_truncated_json_array_counts_as_a_failure(self):
+        upload = json.dumps([question("a"), question("b")]).encode()
+        for cut, created in ((-1, 2), (-10, 1)):
+            with self.subTest(cut=cut):
+                Question.objects.all().delete()
+                report = import_questions(io.BytesIO(upload[:cut]))
+                self.assertEqual((report["created"], report["failed"]), (created, 1))
+                self.assertEqual(report["errors"][-1]["row"], None)
+
+        response = self.client.post(
+            "/api/questions/import/",
+            b"[" + upload[1:-10],
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token()}",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            (response.json()["created"], response.json()["failed"]), (1, 1)
+        )
+
+    def test_each_chunk_is_inserted_and_committed_on_its_own(self):
+        rows = [question(f"q{i}") for i in range(5)]
+        upload = ("\n".join(json.dumps(row) for row in rows) + "\n{").encode()
+        with CaptureQueriesContext(connection) as queries:
+            report = import_questions(io.BytesIO(upload), chunk_size=2)
+        inserts = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("INSERT")
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual((report["created"], report["failed"]), (5, 1))
+
+        # A chunk that fails to insert leaves the ones before it in place.
+        upload = "\n".join(json.dumps(row) for row in rows).encode()
+        original = Question.objects.bulk_create
+        calls = []
+
+        def bulk_create(questions, *args, **kwargs):
+            calls.append(len(questions))
+            if len(calls) == 2:
+                raise RuntimeError("insert failed")
+            return original(questions, *args, **kwargs)
+
+        Question.objects.all().delete()
+        with mock.patch.object(Question.objects, "bulk_create", bulk_create):
+            with self.assertRaises(RuntimeError):
+                import_questions(io.BytesIO(upload), chunk_size=2)
+        self.assertEqual(self.titles(), ["q0", "q1"])
+
+    @mock.patch.object(importing, "MAX_REPORTED_ERRORS", 2)
+    def test_reported_errors_are_capped(self):
+        upload = b"{}\n" * 3 + b"x\n"
+        report = import_questions(io.BytesIO(upload))
+        self.assertEqual(report["failed"], 4)
+        self.assertEqual([error["row"] for error in report["errors"]], [1, 2])
+        self.assertTrue(report["errors_truncated"])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="secret")
+        cls.title_match = Question.objects.create(
+            title="Sorting arrays", data={"hint": "merge halves"}, type="coding"
+        )
+        cls.body_match = Question.objects.create(
+            title="Merge intervals", data={"hint": "sort them first"}, type="coding"
+        )
+        cls.option_match = Question.objects.create(
+            title="Complexity",
+            data={"options": ["sorted input", "n log n"]},
+            type="mcq",
+        )
+        cls.deleted = Question.objects.create(
+            title="Sorting lists", data={}, type="mcq", isDeleted=True
+        )
+        cls.unrelated = Question.objects.create(
+            title="Graphs", data={"hint": "breadth first"}, type="mcq"
+        )
+
+    def test_title_matches_rank_first(self):
+        ids = search_question_ids("sort", 10)
+        self.assertEqual(ids[0], self.title_match.id)
+        self.assertEqual(
+            set(ids), {self.title_match.id, self.body_match.id, self.option_match.id}
+        )
+        # Every word must match.
+        self.assertEqual(
+            set(search_question_ids("merge sort", 10)),
+            {self.title_match.id, self.body_match.id},
+        )
+
+    def test_soft_deleted_questions_are_left_out(self):
+        self.assertNotIn(self.deleted.id, search_question_ids("sorting lists", 10))
+        self.unrelated.isDeleted = True
+        self.unrelated.save()
+        self.assertEqual(search_question_ids("graphs", 10), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ('sort"', "sort OR graphs", "title:graphs", "sort*", "-sort"):
+            with self.subTest(query=query):
+                self.assertNotIn(self.unrelated.id, search_question_ids(query, 10))
+        self.assertEqual(search_question_ids("!!!", 10), [])
+
+    def test_pages(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        ids = []
+        url = "/api/questions/search/?q=sort&page_size=2"
+        while url:
+            body = self.client.get(url, **auth).json()
+            ids += [row["id"] for row in body["results"]]
+            url = body["next"]
+        self.assertEqual(ids, search_question_ids("sort", 10))
+        self.assertIsNotNone(body["previous"])
+
+        response = self.client.get("/api/questions/search/", **auth)
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchMigrationTests(TransactionTestCase):
+    """
+    SQLite adds columns by rebuilding the table, which drops the search
+    triggers; the migrations that do so must create them again.
+    """
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_questions_are_found_after_migrating_back_and_forth(self):
+        question = Question.objects.create(title="binary heaps", data={}, type="mcq")
+        leaf = MigrationExecutor(connection).loader.graph.leaf_nodes("questions")[0]
+        self.migrate(("questions", "0007_question_search_index"))
+        self.migrate(leaf)
+
+        Question.objects.filter(id=question.id).update(title="binomial heaps")
+        added = Question.objects.create(title="binary trees", data={}, type="mcq")
+        self.assertEqual(search_question_ids("binomial", 10), [question.id])
+        self.assertEqual(search_question_ids("binary", 10), [added.id])
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="secret", is_staff=True)
+        cls.candidate = User.objects.create_user("candidate", password="secret")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PROFILE_DIR=directory.name, PROFILE_KEEP=2)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, user, path="/api/questions/", **headers):
+        token = RefreshToken.for_user(user).access_token
+        return self.client.get(path, HTTP_AUTHORIZATION=f"Bearer {token}", **headers)
+
+    def test_staff_requests_are_profiled_on_request(self):
+        response = self.get(self.staff, HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        stats = pstats.Stats(str(profile_path(response["X-Profile-Id"])))
+        self.assertTrue(stats.total_calls)
+
+        response = self.get(self.staff, "/api/questions/?profile=1")
+        self.assertTrue(profile_path(response["X-Profile-Id"]).exists())
+
+    def test_other_requests_are_not_profiled(self):
+        self.assertNotIn("X-Profile-Id", self.get(self.staff))
+        self.assertNotIn("X-Profile-Id", self.get(self.candidate, HTTP_X_PROFILE="1"))
+        response = self.client.get("/api/questions/", HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_only_the_newest_profiles_are_kept(self):
+        ids = [
+            self.get(self.staff, HTTP_X_PROFILE="1")["X-Profile-Id"] for _ in range(3)
+        ]
+        self.assertEqual(
+            [profile_path(profile_id).exists() for profile_id in ids],
+            [False, True, True],
+        )
@@ -1,7 +1,11 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import QuestionViewSet
+from .views import AsyncQuestionListView, QuestionViewSet
 
 question_router = DefaultRouter()
 question_router.register(r"api/questions", QuestionViewSet)
+
+urlpatterns = [
+    path("questions/async/", AsyncQuestionListView.as_view(), name="questions-async"),
+]
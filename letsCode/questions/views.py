@@ -1,23 +1,52 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, NotFound
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, get_object_or_404
 from rest_framework.permissions import (
     IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.status import (
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST,
 )
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from letsCode.async_views import AsyncListView
+from letsCode.cache import acached_list_data, cached_list_data
+from letsCode.conditional import etag_list
+from letsCode.rendering import encode_json, encoded_page, page_columns, value_rows
+from letsCode.sparse_fields import requested_fields
+from letsCode.timing import query_budget
+from submissions.results import invalidate_results, tests_digest
+
+from .filters import filter_questions
+from .importing import import_questions
 from .models import Question
-from .serializers import QuestionSerializer
+from .search import search_questions
+from .serializers import (
+    QUESTION_FIELDS,
+    QuestionSerializer,
+    question_to_dict,
+    question_values,
+)
 
 
+@query_budget(
+    list=3,
+    create=2,
+    retrieve=2,
+    update=3,
+    partial_update=3,
+    destroy=3,
+    bulk_import=3,
+    search=3,
+)
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
@@ -30,10 +59,20 @@ class QuestionViewSet(viewsets.ModelViewSet):
             authentication_classes = [JWTAuthentication]
         return [permission() for permission in permission_classes]
 
+    @etag_list(Question)
     def list(self, request):
-        queryset = Question.objects.filter(isDeleted=False)
-        serializer = QuestionSerializer(queryset, many=True)
-        return Response(serializer.data)
+        fields = requested_fields(request, QUESTION_FIELDS)
+
+        def build():
+            queryset = filter_questions(Question.objects.all(), request.query_params)
+            return encoded_page(self, queryset, question_values(fields))
+
+        return Response(cached_list_data(request, ["questions"], build))
+
+    def retrieve(self, request, pk=None):
+        fields = requested_fields(request, QUESTION_FIELDS)
+        question = get_object_or_404(Question.objects.only(*fields), pk=pk)
+        return Response(QuestionSerializer(question, fields=fields).data)
 
     def create(self, request, *args, **kwargs):
         serializer = QuestionSerializer(data=request.data)
@@ -63,9 +102,115 @@ class QuestionViewSet(viewsets.ModelViewSet):
         except:
             raise NotFound("Question not found")
 
+        old_tests = tests_digest(instance.data)
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            if tests_digest(instance.data) != old_tests:
+                invalidate_results(instance)
             return Response(serializer.data)
         else:
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_import(self, request):
+        """
+        Import questions from an NDJSON or JSON array request body.
+
+        The body is streamed rather than parsed up front, so uploads of any
+        size are imported in constant memory.
+
+        Returns:
+        - Response: The import report, with HTTP_400_BAD_REQUEST if no row
+          could be imported.
+        """
+        report = import_questions(request.stream)
+        if report["errors"] and not report["created"]:
+            return Response(report, status=HTTP_400_BAD_REQUEST)
+        return Response(report, status=HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Search live questions by keyword in their title and data.
+
+        Query parameters:
+        - q: The keywords to search for.
+        - page: The 1-based page number.
+        - page_size: The number of results per page.
+        - fields: The question fields to return, see letsCode.sparse_fields.
+
+        Returns:
+        - Response: The page of ranked results with next and previous links.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"detail": "The q parameter is required."},
+                status=HTTP_400_BAD_REQUEST,
+            )
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = int(
+                request.query_params.get("page_size", api_settings.PAGE_SIZE)
+            )
+        except ValueError:
+            return Response(
+                {"detail": "page and page_size must be integers."},
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        page_size = min(max(1, page_size), self.paginator.max_page_size)
+        fields = requested_fields(request, QUESTION_FIELDS)
+
+        # One extra row tells whether there is a following page.
+        questions = search_questions(
+            query, page_size + 1, (page - 1) * page_size, fields=list(fields)
+        )
+        url = request.build_absolute_uri()
+        previous_url = None
+        if page == 2:
+            previous_url = remove_query_param(url, "page")
+        elif page > 2:
+            previous_url = replace_query_param(url, "page", page - 1)
+
+        return Response(
+            {
+                "next": replace_query_param(url, "page", page + 1)
+                if len(questions) > page_size
+                else None,
+                "previous": previous_url,
+                "results": [
+                    question_to_dict(question, fields)
+                    for question in questions[:page_size]
+                ],
+            }
+        )
+
+
+@query_budget(get=3)
+class AsyncQuestionListView(AsyncListView):
+    """
+    Async variant of ``QuestionViewSet.list``, for ASGI deployments.
+    """
+
+    etag_models = (Question,)
+
+    async def get_page(self, request):
+        values = question_values(requested_fields(request, QUESTION_FIELDS))
+
+        async def build():
+            queryset = filter_questions(Question.objects.all(), request.query_params)
+            data = await self.paginate(
+                request,
+                queryset.values(*page_columns(values)),
+                lambda page: value_rows(page, values),
+            )
+            return encode_json(data)
+
+        return await acached_list_data(request, ["questions"], build)
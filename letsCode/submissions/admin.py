@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from .models import GradingJob, Submission
+
+admin.site.register(Submission)
+admin.site.register(GradingJob)
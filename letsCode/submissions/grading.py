@@ -0,0 +1,76 @@
+"""
+Grading of stored submissions.
+
+MCQ answers are correct when the response equals the question's
+``data["answer"]``. Coding answers are run against the question's test
+cases in the sandbox, or looked up in the result cache, and are correct
+when every test case passes. The score of a submission is its number of
+correct answers.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from assignments import leaderboard
+from assignments.models import AssignmentEnrollment
+
+from .models import Answer, Submission
+from .results import get_result, result_key, store_result
+from .sandbox import PASSED
+
+
+def grade_mcq(answer):
+    return answer.response == answer.question.data.get("answer")
+
+
+def grade_submission(submission, engine):
+    """
+    Grade every answer of a submission and write the scores back.
+
+    Coding answers of the submission are run in parallel on ``engine``,
+    except those whose result is already cached.
+
+    Args:
+    - submission (Submission): The submission to grade.
+    - engine (ExecutionEngine): The sandbox pool for coding answers.
+
+    Returns:
+    - int: The submission's score.
+    """
+    answers = list(submission.answers.select_related("question"))
+
+    runs = {}
+    for answer in answers:
+        if answer.question.type != "coding":
+            answer.is_correct = grade_mcq(answer)
+            continue
+
+        source = str(answer.response)
+        key = result_key(answer.question, source)
+        answer.result = get_result(key)
+        if answer.result is None:
+            runs[answer.id] = key, engine.submit(source, answer.question.data)
+
+    for answer in answers:
+        if answer.id in runs:
+            key, run = runs[answer.id]
+            outcome = run.result()
+            answer.result = {
+                "status": outcome["status"],
+                "passed": outcome["passed"],
+                "total": outcome["total"],
+            }
+            store_result(key, answer.result)
+        if answer.result is not None:
+            answer.is_correct = answer.result["status"] == PASSED
+
+    score = sum(1 for answer in answers if answer.is_correct)
+    with transaction.atomic():
+        Answer.objects.bulk_update(answers, ["is_correct", "result"])
+        Submission.objects.filter(id=submission.id).update(
+            status="graded", score=score, graded_at=timezone.now()
+        )
+        AssignmentEnrollment.objects.filter(id=submission.enrollment_id).update(
+            score=score
+        )
+        leaderboard.record_score(submission.enrollment, score)
+    return score
@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from assignments.models import Assignment, AssignmentEnrollment
+from letsCode.benchmarking import isolated_database
+from questions.models import Question
+from submissions.models import Answer, Submission
+from submissions.regrading import SUBMISSION_CHUNK_SIZE, regrade_mcq
+
+OPTIONS = ["a", "b", "c", "d"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark re-grading every submission of an MCQ assignment after an "
+        "answer key change. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=100000)
+        parser.add_argument("--questions", type=int, default=10)
+        parser.add_argument("--chunk-size", type=int, default=SUBMISSION_CHUNK_SIZE)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count, batch_size = options["submissions"], options["batch_size"]
+        rng = random.Random(0)
+
+        with isolated_database():
+            started = time.perf_counter()
+            user = User.objects.create_user("bench")
+            questions = Question.objects.bulk_create(
+                Question(
+                    title=f"Question {i}",
+                    type="mcq",
+                    data={"options": OPTIONS, "answer": "a"},
+                )
+                for i in range(options["questions"])
+            )
+            assignment = Assignment.objects.create(
+                title="Benchmark", description="", creator=user
+            )
+            assignment.questions.set(questions)
+
+            for offset in range(0, count, batch_size):
+                size = min(batch_size, count - offset)
+                enrollments = AssignmentEnrollment.objects.bulk_create(
+                    AssignmentEnrollment(
+                        user=user, assignment=assignment, status="attempted"
+                    )
+                    for _ in range(size)
+                )
+                submissions = Submission.objects.bulk_create(
+                    Submission(enrollment=enrollment, status="graded")
+                    for enrollment in enrollments
+                )
+                Answer.objects.bulk_create(
+                    Answer(
+                        submission=submission,
+                        question=question,
+                        response=rng.choice(OPTIONS),
+                    )
+                    for submission in submissions
+                    for question in questions
+                )
+            self.stdout.write(
+                f"Seeded {count} submissions of {len(questions)} answers in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+
+            runs = [("initial grade", None), ("unchanged key", None)]
+            runs.append(("answer key fix", questions[0]))
+            for label, fixed in runs:
+                if fixed is not None:
+                    fixed.data["answer"] = "b"
+                    fixed.save(update_fields=["data"])
+                started = time.perf_counter()
+                report = regrade_mcq(assignment, options["chunk_size"])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:>15}: {elapsed:7.2f}s "
+                    f"{report['submissions'] / elapsed:>9.0f} submissions/s, "
+                    f"{report['changed_answers']} answers and "
+                    f"{report['changed_scores']} scores changed"
+                )
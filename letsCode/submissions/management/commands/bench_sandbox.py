@@ -0,0 +1,48 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from submissions.sandbox import ExecutionEngine
+
+SOURCE = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+class Command(BaseCommand):
+    help = "Measure sandbox throughput (submissions per second) per worker count."
+
+    def add_arguments(self, parser):
+        cores = os.cpu_count()
+        parser.add_argument(
+            "--workers",
+            default=",".join(str(n) for n in sorted({1, 2, cores, 2 * cores})),
+            help="Comma separated worker counts to measure.",
+        )
+        parser.add_argument("--submissions", type=int, default=200)
+        parser.add_argument("--tests", type=int, default=3)
+        parser.add_argument(
+            "--fail-fast", action="store_true", help="Stop at the first failing test."
+        )
+
+    def handle(self, *args, **options):
+        question_data = {
+            "language": "python",
+            "tests": [
+                {"input": f"{i} {i}\n", "output": f"{2 * i}\n"}
+                for i in range(options["tests"])
+            ],
+        }
+        submissions = [(SOURCE, question_data)] * options["submissions"]
+
+        self.stdout.write(f"{'workers':>8} {'seconds':>9} {'subs/s':>8} {'tests/s':>8}")
+        for workers in (int(n) for n in options["workers"].split(",")):
+            with ExecutionEngine(workers, options["fail_fast"]) as engine:
+                started = time.perf_counter()
+                results = engine.run_many(submissions)
+                elapsed = time.perf_counter() - started
+
+            tests = sum(len(result["cases"]) for result in results)
+            self.stdout.write(
+                f"{workers:>8} {elapsed:>9.2f} {len(results) / elapsed:>8.1f} "
+                f"{tests / elapsed:>8.1f}"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assignments.models import Assignment
+from submissions.regrading import SUBMISSION_CHUNK_SIZE, regrade_mcq
+
+
+class Command(BaseCommand):
+    help = "Re-grade the MCQ answers of an assignment, e.g. after an answer key fix."
+
+    def add_arguments(self, parser):
+        parser.add_argument("assignment", type=int, help="Id of the assignment.")
+        parser.add_argument("--chunk-size", type=int, default=SUBMISSION_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            assignment = Assignment.objects.get(pk=options["assignment"])
+        except Assignment.DoesNotExist:
+            raise CommandError(f"Assignment {options['assignment']} does not exist.")
+
+        report = regrade_mcq(assignment, options["chunk_size"])
+        self.stdout.write(
+            f"Re-graded {report['submissions']} submissions "
+            f"({report['answers']} answers): {report['changed_answers']} answers "
+            f"and {report['changed_scores']} scores changed."
+        )
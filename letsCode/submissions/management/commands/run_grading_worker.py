@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from submissions import queue, results
+from submissions.grading import grade_submission
+from submissions.sandbox import ExecutionEngine
+
+# Seconds between looks for jobs abandoned by workers that died.
+REQUEUE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Grade queued submissions, retrying failed jobs with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of submissions graded at once.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is ready instead of polling for more.",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        self.requeue_lock = threading.Lock()
+        self.next_requeue = 0
+        self.requeue_abandoned()
+
+        with ExecutionEngine() as engine:
+            threads = [
+                threading.Thread(
+                    target=self.work,
+                    args=(engine, options["poll_interval"], options["once"]),
+                    name=f"grading-{n}",
+                )
+                for n in range(options["concurrency"])
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                for thread in threads:
+                    thread.join()
+            except KeyboardInterrupt:
+                self.stopping.set()
+                for thread in threads:
+                    thread.join()
+
+        cache = results.stats()
+        if cache["hit_rate"] is not None:
+            self.stdout.write(
+                f"Result cache: {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_rate']:.0%} hit rate)."
+            )
+
+    def requeue_abandoned(self):
+        """
+        Recover the jobs of crashed peers, at most every ``REQUEUE_INTERVAL``
+        seconds across this worker's threads.
+        """
+        with self.requeue_lock:
+            if time.monotonic() < self.next_requeue:
+                return
+            self.next_requeue = time.monotonic() + REQUEUE_INTERVAL
+        requeued, failed = queue.requeue_abandoned()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} abandoned jobs.")
+        if failed:
+            self.stderr.write(f"Failed {failed} abandoned jobs out of attempts.")
+
+    def work(self, engine, poll_interval, once):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                self.requeue_abandoned()
+                jobs = queue.claim()
+                if not jobs:
+                    if once:
+                        return
+                    self.stopping.wait(poll_interval)
+                    continue
+
+                job = jobs[0]
+                try:
+                    score = grade_submission(job.submission, engine)
+                except Exception:
+                    queue.fail(job, traceback.format_exc())
+                    self.stderr.write(f"Job {job.id} failed (attempt {job.attempts}).")
+                else:
+                    queue.complete(job)
+                    self.stdout.write(
+                        f"Graded submission {job.submission_id}: score {score}."
+                    )
+        finally:
+            connection.close()
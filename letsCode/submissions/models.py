@@ -0,0 +1,81 @@
+from django.db import models
+from django.utils import timezone
+
+from assignments.models import AssignmentEnrollment
+from questions.models import Question
+
+
+class Submission(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("graded", "Graded"),
+        ("failed", "Failed"),
+    )
+
+    enrollment = models.ForeignKey(
+        AssignmentEnrollment, on_delete=models.CASCADE, related_name="submissions"
+    )
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    score = models.IntegerField(null=True, blank=True)
+    graded_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+
+class Answer(models.Model):
+    submission = models.ForeignKey(
+        Submission, on_delete=models.CASCADE, related_name="answers"
+    )
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    # The chosen option for MCQs, the source code for coding questions.
+    response = models.JSONField()
+    is_correct = models.BooleanField(null=True, blank=True)
+    # Test case outcome of a coding answer, as reported by the sandbox.
+    result = models.JSONField(null=True, blank=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["submission", "question"], name="answer_unique_question"
+            ),
+        ]
+
+
+class GradingJob(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    submission = models.OneToOneField(
+        Submission, on_delete=models.CASCADE, related_name="grading_job"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # The queue itself: jobs ready to run, oldest first.
+            models.Index(
+                fields=["run_after", "id"],
+                condition=models.Q(status="queued"),
+                name="grading_job_queued_idx",
+            ),
+            # Running jobs, to find those whose worker died.
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="grading_job_running_idx",
+            ),
+        ]
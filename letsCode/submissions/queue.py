@@ -0,0 +1,138 @@
+"""
+A durable grading job queue stored in the database.
+
+Workers claim jobs by stamping them with a unique token in a single
+conditional UPDATE (``... WHERE status = 'queued'``), then read back what
+they won. On PostgreSQL the candidates are first locked with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so that concurrent workers pick
+disjoint jobs instead of queueing behind each other's row locks. SQLite
+serialises writers, so there the conditional UPDATE alone is enough.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GradingJob, Submission
+
+
+def enqueue(submission):
+    """
+    Queue a submission for grading.
+
+    Args:
+    - submission (Submission): The submission to grade.
+
+    Returns:
+    - GradingJob: The queued job.
+    """
+    return GradingJob.objects.create(submission=submission)
+
+
+def claim(limit=1):
+    """
+    Claim up to ``limit`` jobs that are ready to run.
+
+    Args:
+    - limit (int): The maximum number of jobs to claim.
+
+    Returns:
+    - list: The claimed ``GradingJob`` objects, now marked running.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    ready = GradingJob.objects.filter(status="queued", run_after__lte=now).order_by(
+        "run_after", "id"
+    )
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        GradingJob.objects.filter(id__in=ids, status="queued").update(
+            status="running",
+            locked_by=token,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+
+    return list(
+        GradingJob.objects.filter(locked_by=token, status="running").select_related(
+            "submission"
+        )
+    )
+
+
+def complete(job):
+    """
+    Mark a claimed job as done.
+    """
+    GradingJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status="done", last_error=""
+    )
+
+
+def fail(job, error):
+    """
+    Record a failed attempt, retrying later with exponential backoff.
+
+    After ``GRADING_MAX_ATTEMPTS`` attempts the job and its submission are
+    marked failed.
+
+    Args:
+    - job (GradingJob): The claimed job.
+    - error (str): Description of the failure.
+    """
+    if job.attempts >= settings.GRADING_MAX_ATTEMPTS:
+        with transaction.atomic():
+            GradingJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+                status="failed", last_error=error
+            )
+            Submission.objects.filter(id=job.submission_id).update(status="failed")
+        return
+
+    delay = settings.GRADING_RETRY_DELAY * 2 ** (job.attempts - 1)
+    GradingJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status="queued",
+        run_after=timezone.now() + timedelta(seconds=delay),
+        locked_by="",
+        locked_at=None,
+        last_error=error,
+    )
+
+
+def requeue_abandoned():
+    """
+    Queue again the running jobs whose worker stopped without finishing.
+
+    Jobs that already used their ``GRADING_MAX_ATTEMPTS`` attempts are marked
+    failed with their submission instead, so that a job which keeps killing
+    its worker is not retried forever.
+
+    Returns:
+    - tuple: The numbers of jobs queued again and of jobs failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.GRADING_JOB_TIMEOUT)
+    abandoned = GradingJob.objects.filter(status="running", locked_at__lt=cutoff)
+    with transaction.atomic():
+        spent = list(
+            abandoned.filter(attempts__gte=settings.GRADING_MAX_ATTEMPTS).values_list(
+                "id", flat=True
+            )
+        )
+        failed = GradingJob.objects.filter(id__in=spent, status="running").update(
+            status="failed",
+            locked_by="",
+            locked_at=None,
+            last_error="Abandoned by its worker.",
+        )
+        Submission.objects.filter(
+            grading_job__id__in=spent, grading_job__status="failed"
+        ).update(status="failed")
+        requeued = abandoned.update(status="queued", locked_by="", locked_at=None)
+    return requeued, failed
@@ -0,0 +1,199 @@
+"""
+Batch re-grading of the MCQ answers of a whole assignment.
+
+The assignment's answer key is compiled once into arrays: the MCQ question
+ids in sorted order and, for each, the code of its correct option in a
+small vocabulary of option values. Each chunk of submissions is then graded
+with a handful of NumPy operations over all of its answers at once, and
+only the answers and scores that actually changed are written back, with
+one UPDATE per distinct value.
+"""
+import json
+
+import numpy as np
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from assignments import leaderboard
+from assignments.models import AssignmentEnrollment
+
+from .models import Answer, Submission
+
+SUBMISSION_CHUNK_SIZE = 20000
+# Ids per ``id IN (...)`` list, below SQLite's bound parameter limit.
+UPDATE_BATCH_SIZE = 5000
+
+# Codes that never match a key: unanswerable questions and unknown options.
+NO_KEY = -1
+UNKNOWN_RESPONSE = -2
+
+
+def _token(value):
+    # JSON values as dictionary keys; lists and objects are not hashable.
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+def compile_answer_key(assignment):
+    """
+    Compile the answer key of an assignment's MCQ questions into arrays.
+
+    Args:
+    - assignment (Assignment): The assignment to compile.
+
+    Returns:
+    - tuple: ``(question_ids, key, vocabulary)``, the sorted MCQ question
+      ids, the code of each question's answer (``NO_KEY`` when it has
+      none) and the mapping from answer values to codes.
+    """
+    questions = sorted(
+        assignment.questions.filter(type="mcq").values_list("id", "data")
+    )
+    vocabulary = {}
+    key = np.full(len(questions), NO_KEY, dtype=np.int64)
+    for column, (question_id, data) in enumerate(questions):
+        if "answer" in data:
+            token = _token(data["answer"])
+            key[column] = vocabulary.setdefault(token, len(vocabulary))
+    question_ids = np.array([question_id for question_id, _ in questions], np.int64)
+    return question_ids, key, vocabulary
+
+
+def grade_answers(answer_key, question_ids, responses, stored):
+    """
+    Grade a batch of answers against a compiled answer key.
+
+    Answers to questions outside the key (coding questions) keep their
+    stored correctness.
+
+    Args:
+    - answer_key (tuple): As returned by ``compile_answer_key``.
+    - question_ids (ndarray): The question of each answer.
+    - responses (list): The response of each answer.
+    - stored (ndarray): The stored ``is_correct`` of each answer, as 1, 0
+      or -1 for ungraded.
+
+    Returns:
+    - tuple: ``(correct, is_mcq)`` boolean arrays over the answers.
+    """
+    key_questions, key, vocabulary = answer_key
+    if not len(key_questions):
+        return stored == 1, np.zeros(len(question_ids), dtype=bool)
+
+    column = np.searchsorted(key_questions, question_ids)
+    column = np.minimum(column, len(key_questions) - 1)
+    is_mcq = key_questions[column] == question_ids
+    codes = np.fromiter(
+        (vocabulary.get(_token(response), UNKNOWN_RESPONSE) for response in responses),
+        dtype=np.int64,
+        count=len(responses),
+    )
+    correct = np.where(is_mcq, codes == key[column], stored == 1)
+    return correct, is_mcq
+
+
+def _update_in_batches(queryset, ids, **values):
+    ids = ids.tolist()
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        queryset.filter(id__in=ids[start : start + UPDATE_BATCH_SIZE]).update(**values)
+
+
+def _regrade_chunk(answer_key, graded, submissions):
+    submission_ids = np.array([id for id, _ in submissions], dtype=np.int64)
+    old_scores = np.array(
+        [-1 if score is None else score for _, score in submissions], dtype=np.int64
+    )
+    # Selected by id range rather than a list of ids, which could exceed the
+    # backend's bound parameter limit.
+    rows = list(
+        Answer.objects.filter(
+            submission__in=graded.filter(
+                id__gte=submissions[0][0], id__lte=submissions[-1][0]
+            )
+        ).values_list("id", "submission_id", "question_id", "response", "is_correct")
+    )
+    if not rows:
+        return 0, 0, 0
+
+    answer_ids, owners, question_ids, responses, stored = zip(*rows)
+    answer_ids = np.array(answer_ids, dtype=np.int64)
+    stored = np.array(
+        [-1 if value is None else int(value) for value in stored], dtype=np.int64
+    )
+    correct, is_mcq = grade_answers(
+        answer_key, np.array(question_ids, dtype=np.int64), responses, stored
+    )
+
+    # Submissions are fetched in id order, so each answer's owner is found
+    # by binary search and the scores are one weighted count.
+    owner = np.searchsorted(submission_ids, np.array(owners, dtype=np.int64))
+    scores = np.bincount(owner, weights=correct, minlength=len(submission_ids))
+    scores = scores.astype(np.int64)
+
+    changed_answers = is_mcq & (correct.astype(np.int64) != stored)
+    changed_scores = scores != old_scores
+    with transaction.atomic():
+        for value in (True, False):
+            _update_in_batches(
+                Answer.objects,
+                answer_ids[changed_answers & (correct == value)],
+                is_correct=value,
+            )
+        for score in np.unique(scores[changed_scores]):
+            _update_in_batches(
+                Submission.objects,
+                submission_ids[changed_scores & (scores == score)],
+                score=int(score),
+            )
+    return len(rows), int(changed_answers.sum()), int(changed_scores.sum())
+
+
+def regrade_mcq(assignment, chunk_size=SUBMISSION_CHUNK_SIZE):
+    """
+    Re-grade the MCQ answers of every graded submission of an assignment.
+
+    Use after fixing an answer key. Coding answers keep their stored
+    results; submission scores and the enrollments' scores (taken from
+    their latest graded submission) are rewritten where they changed, and
+    the assignment's leaderboard is then rebuilt.
+
+    Args:
+    - assignment (Assignment): The assignment to re-grade.
+    - chunk_size (int): How many submissions to grade per batch.
+
+    Returns:
+    - dict: Counts of ``submissions`` and ``answers`` graded, and of
+      ``changed_answers`` and ``changed_scores``.
+    """
+    answer_key = compile_answer_key(assignment)
+    graded = Submission.objects.filter(
+        enrollment__assignment=assignment, status="graded"
+    ).order_by("id")
+
+    report = {"submissions": 0, "answers": 0, "changed_answers": 0, "changed_scores": 0}
+    last_id = 0
+    while True:
+        submissions = list(
+            graded.filter(id__gt=last_id).values_list("id", "score")[:chunk_size]
+        )
+        if not submissions:
+            break
+        last_id = submissions[-1][0]
+
+        answers, changed_answers, changed_scores = _regrade_chunk(
+            answer_key, graded, submissions
+        )
+        report["submissions"] += len(submissions)
+        report["answers"] += answers
+        report["changed_answers"] += changed_answers
+        report["changed_scores"] += changed_scores
+
+    if report["changed_scores"]:
+        latest = graded.filter(enrollment=OuterRef("pk")).order_by("-id")
+        AssignmentEnrollment.objects.filter(
+            assignment=assignment,
+            id__in=graded.values("enrollment_id"),
+        ).update(score=Subquery(latest.values("score")[:1]))
+        leaderboard.rebuild(assignment.id)
+    return report
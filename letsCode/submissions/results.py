@@ -0,0 +1,127 @@
+"""
+Content-addressed cache of sandbox results for coding answers.
+
+Candidates often submit identical solutions, so a result is cached under a
+digest of the normalized source together with the question's test-case
+version: the question's ``tests`` cache namespace (bumped by
+``QuestionViewSet.update`` when the tests change) and a digest of
+everything in ``Question.data`` that affects a run. The digest alone keeps
+a worker correct even if it missed the bump, e.g. with a per-process cache.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from letsCode.cache import bump_version, get_version
+
+from .sandbox import TIME_LIMIT_EXCEEDED
+
+RESULT_KEY = "sandbox-result:{question}:{version}:{tests}:{source}"
+STATS_KEY = "sandbox-result-stats:{}"
+
+# The parts of Question.data that decide the outcome of a run.
+TEST_FIELDS = ("language", "tests", "time_limit", "memory_limit")
+
+# Time limits also trip when the machine is overloaded, so those results are
+# not trusted for other candidates.
+UNCACHED_STATUSES = {TIME_LIMIT_EXCEEDED}
+
+
+def normalize_source(source):
+    """
+    Normalize line endings and trailing whitespace, which cannot change
+    what a program does.
+    """
+    lines = source.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def tests_digest(question_data):
+    """
+    Return a digest of the test cases and limits of a coding question.
+
+    Args:
+    - question_data (dict): The question's ``data``.
+
+    Returns:
+    - str: The hex digest.
+    """
+    spec = {field: question_data.get(field) for field in TEST_FIELDS}
+    encoded = json.dumps(spec, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _namespace(question_id):
+    return f"question-tests-{question_id}"
+
+
+def result_key(question, source):
+    """
+    Return the cache key of a source's result on a question's tests.
+
+    Args:
+    - question (Question): The coding question.
+    - source (str): The candidate's source code.
+
+    Returns:
+    - str: The cache key.
+    """
+    return RESULT_KEY.format(
+        question=question.id,
+        version=get_version(_namespace(question.id)),
+        tests=tests_digest(question.data),
+        source=hashlib.sha256(normalize_source(source).encode()).hexdigest(),
+    )
+
+
+def _count(outcome):
+    key = STATS_KEY.format(outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_result(key):
+    """
+    Return the cached result under ``key``, or None, counting the lookup.
+    """
+    result = cache.get(key)
+    _count("hits" if result is not None else "misses")
+    return result
+
+
+def store_result(key, result):
+    """
+    Cache a sandbox result unless its status may not be reproducible.
+    """
+    if result["status"] not in UNCACHED_STATUSES:
+        cache.set(key, result, settings.SANDBOX_RESULT_CACHE_TIMEOUT)
+
+
+def invalidate_results(question):
+    """
+    Make every cached result of a question unreachable.
+    """
+    bump_version(_namespace(question.id))
+
+
+def stats():
+    """
+    Return the lookups made so far and the hit rate.
+
+    Returns:
+    - dict: ``hits``, ``misses`` and ``hit_rate`` (a fraction, or None
+      before the first lookup).
+    """
+    hits = cache.get(STATS_KEY.format("hits"), 0)
+    misses = cache.get(STATS_KEY.format("misses"), 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
@@ -0,0 +1,283 @@
+"""
+Sandboxed execution of coding submissions against their test cases.
+
+Every test case runs the candidate's program in a fresh child process with
+an empty environment, a private working directory and resource limits on
+CPU time, address space, output size, open files and processes, plus a
+wall-clock timeout. The limits are applied by a small launcher that then
+execs the interpreter, so no code runs between fork and exec in the parent.
+The child leads its own process group, which is killed as a whole once the
+test case is over, so nothing it started outlives it.
+
+The process limit is not enforced for root: run grading workers as an
+unprivileged user.
+
+This isolates runaway or hostile-but-naive programs; it is not a substitute
+for OS-level isolation (containers, seccomp) against a determined attacker.
+
+Coding questions store their tests in ``Question.data``::
+
+    {
+        "language": "python",
+        "tests": [{"input": "1 2\\n", "output": "3\\n"}, ...],
+        "time_limit": 2,        # optional, CPU seconds per test
+        "memory_limit": 256,    # optional, MiB
+    }
+"""
+import math
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+SUPPORTED_LANGUAGES = {"python"}
+
+PASSED = "passed"
+WRONG_ANSWER = "wrong_answer"
+RUNTIME_ERROR = "runtime_error"
+TIME_LIMIT_EXCEEDED = "time_limit_exceeded"
+MEMORY_LIMIT_EXCEEDED = "memory_limit_exceeded"
+OUTPUT_LIMIT_EXCEEDED = "output_limit_exceeded"
+UNSUPPORTED = "unsupported"
+INVALID_TESTS = "invalid_tests"
+
+# Sets the limits given on its command line, then replaces itself with an
+# isolated interpreter running the submission.
+_LAUNCHER = """
+import os, resource, sys
+cpu, memory, output, processes = map(int, sys.argv[1:5])
+source = sys.argv[5]
+resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+resource.setrlimit(resource.RLIMIT_NOFILE, (16, 16))
+resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+resource.setrlimit(resource.RLIMIT_NPROC, (processes, processes))
+os.execv(sys.executable, [sys.executable, "-I", "-S", "-B", source])
+"""
+
+
+def limits_for(question_data):
+    """
+    Return the resource limits for a question, falling back to the defaults.
+
+    Args:
+    - question_data (dict): The question's ``data``.
+
+    Returns:
+    - dict: ``cpu_seconds``, ``memory_mb``, ``wall_seconds`` and
+      ``output_bytes``.
+    """
+    limits = dict(settings.SANDBOX_LIMITS)
+    if "time_limit" in question_data:
+        # Rounded up: RLIMIT_CPU counts whole seconds, and 0 means no time.
+        limits["cpu_seconds"] = max(1, math.ceil(float(question_data["time_limit"])))
+        limits["wall_seconds"] = max(limits["wall_seconds"], 2 * limits["cpu_seconds"])
+    if "memory_limit" in question_data:
+        limits["memory_mb"] = int(question_data["memory_limit"])
+    return limits
+
+
+def invalid_tests(question_data):
+    """
+    Return what is wrong with a question's test cases, if anything.
+
+    Args:
+    - question_data (dict): The question's ``data``.
+
+    Returns:
+    - str: The problem, or None if every test case can be run.
+    """
+    tests = question_data.get("tests", [])
+    if not isinstance(tests, list):
+        return "tests must be a list."
+    for number, test in enumerate(tests, start=1):
+        if not isinstance(test, dict) or not isinstance(test.get("output"), str):
+            return f"Test {number} has no output."
+        if not isinstance(test.get("input", ""), str):
+            return f"The input of test {number} is not text."
+    return None
+
+
+def _kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _normalize_output(text):
+    return "\n".join(line.rstrip() for line in text.rstrip().splitlines())
+
+
+def run_case(source_path, workdir, stdin, expected, limits):
+    """
+    Run one test case in a sandboxed child process.
+
+    Args:
+    - source_path (str): Path of the submission's source file.
+    - workdir (str): Private working directory of the run.
+    - stdin (str): Input fed to the program.
+    - expected (str): Expected output, compared ignoring trailing whitespace.
+    - limits (dict): Resource limits, as returned by ``limits_for``.
+
+    Returns:
+    - dict: ``status``, wall-clock ``seconds`` and a truncated ``stderr``.
+    """
+    stdout_path = os.path.join(workdir, "stdout")
+    stderr_path = os.path.join(workdir, "stderr")
+    command = [
+        sys.executable,
+        "-I",
+        "-S",
+        "-c",
+        _LAUNCHER,
+        str(limits["cpu_seconds"]),
+        str(limits["memory_mb"] * 1024 * 1024),
+        str(limits["output_bytes"]),
+        str(limits["processes"]),
+        source_path,
+    ]
+
+    started = time.perf_counter()
+    with open(stdout_path, "w+b") as stdout, open(stderr_path, "w+b") as stderr:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=stdout,
+            stderr=stderr,
+            cwd=workdir,
+            env={},
+            start_new_session=True,
+        )
+        try:
+            process.communicate(stdin.encode(), timeout=limits["wall_seconds"])
+            returncode = process.returncode
+        except subprocess.TimeoutExpired:
+            returncode = None
+        finally:
+            # Also reaps whatever the program started and left running.
+            _kill_group(process)
+            process.wait()
+        seconds = time.perf_counter() - started
+
+        stdout.seek(0)
+        output = stdout.read(limits["output_bytes"]).decode(errors="replace")
+        stderr.seek(0)
+        errors = stderr.read(4096).decode(errors="replace")
+
+    if returncode is None or returncode == -24:  # SIGXCPU
+        status = TIME_LIMIT_EXCEEDED
+    elif returncode == -25 or "[Errno 27]" in errors:  # SIGXFSZ / EFBIG
+        status = OUTPUT_LIMIT_EXCEEDED
+    elif returncode != 0:
+        status = MEMORY_LIMIT_EXCEEDED if "MemoryError" in errors else RUNTIME_ERROR
+    elif _normalize_output(output) == _normalize_output(expected):
+        status = PASSED
+    else:
+        status = WRONG_ANSWER
+
+    return {"status": status, "seconds": seconds, "stderr": errors}
+
+
+def run_submission(source, question_data, fail_fast=False):
+    """
+    Run a submission against every test case of a coding question.
+
+    Args:
+    - source (str): The candidate's source code.
+    - question_data (dict): The question's ``data``, holding its tests.
+    - fail_fast (bool): Stop at the first test case that does not pass.
+
+    Returns:
+    - dict: Overall ``status`` (``passed`` or the first failing status),
+      ``passed`` and ``total`` test counts, and per-test ``cases``.
+    """
+    tests = question_data.get("tests", [])
+    language = question_data.get("language", "python")
+    if language not in SUPPORTED_LANGUAGES:
+        return {"status": UNSUPPORTED, "passed": 0, "total": len(tests), "cases": []}
+    problem = invalid_tests(question_data)
+    if problem is not None:
+        return {
+            "status": INVALID_TESTS,
+            "passed": 0,
+            "total": len(tests) if isinstance(tests, list) else 0,
+            "cases": [],
+            "error": problem,
+        }
+
+    limits = limits_for(question_data)
+    cases = []
+    with tempfile.TemporaryDirectory(prefix="sandbox-") as workdir:
+        source_path = os.path.join(workdir, "main.py")
+        with open(source_path, "w") as source_file:
+            source_file.write(source)
+
+        for test in tests:
+            result = run_case(
+                source_path, workdir, test.get("input", ""), test["output"], limits
+            )
+            cases.append(result)
+            if fail_fast and result["status"] != PASSED:
+                break
+
+    failed = [case["status"] for case in cases if case["status"] != PASSED]
+    return {
+        "status": failed[0] if failed else PASSED,
+        "passed": len(cases) - len(failed),
+        "total": len(tests),
+        "cases": cases,
+    }
+
+
+class ExecutionEngine:
+    """
+    Runs many submissions in parallel on a bounded pool of workers.
+
+    Each worker thread only waits on its sandboxed child process, so the
+    number of workers is the number of programs running at once. It
+    defaults to ``SANDBOX_WORKERS``, or one per CPU core.
+
+    Usage::
+
+        with ExecutionEngine() as engine:
+            results = engine.run_many([(source, question.data), ...])
+    """
+
+    def __init__(self, workers=None, fail_fast=False):
+        self.workers = workers or settings.SANDBOX_WORKERS or os.cpu_count()
+        self.fail_fast = fail_fast
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="sandbox"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, source, question_data):
+        """
+        Queue one submission.
+
+        Returns:
+        - Future: Resolves to the ``run_submission`` result.
+        """
+        return self._pool.submit(run_submission, source, question_data, self.fail_fast)
+
+    def run_many(self, submissions):
+        """
+        Run ``(source, question_data)`` pairs and return results in order.
+        """
+        futures = [self.submit(source, data) for source, data in submissions]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,80 @@
+from rest_framework import serializers
+from rest_framework.serializers import ValidationError
+
+from assignments.models import AssignmentEnrollment
+
+from .models import Answer, Submission
+
+
+class AnswerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Answer
+        fields = ["id", "question", "response", "is_correct", "result"]
+        read_only_fields = ["is_correct", "result"]
+
+
+class SubmissionSerializer(serializers.ModelSerializer):
+    answers = AnswerSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Submission
+        fields = [
+            "id",
+            "enrollment",
+            "status",
+            "score",
+            "submitted_at",
+            "graded_at",
+            "answers",
+        ]
+        read_only_fields = fields
+
+
+class AnswerInputSerializer(serializers.Serializer):
+    question = serializers.IntegerField(min_value=1)
+    response = serializers.JSONField()
+
+
+class SubmissionCreateSerializer(serializers.Serializer):
+    """
+    Serializer for submitting an attempt at an assignment.
+
+    Fields:
+    - assignment (int): The assignment being attempted.
+    - answers (list): ``{"question": id, "response": ...}`` objects, one per
+      answered question of the assignment.
+
+    The requesting user must hold an approved enrollment in the assignment.
+    """
+
+    assignment = serializers.IntegerField(min_value=1)
+    answers = AnswerInputSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        user = self.context["request"].user
+        enrollment = (
+            AssignmentEnrollment.objects.filter(
+                user=user, assignment_id=data["assignment"], status="approved"
+            )
+            .select_related("assignment")
+            .first()
+        )
+        if enrollment is None:
+            raise ValidationError("No approved enrollment in this assignment.")
+
+        question_ids = [answer["question"] for answer in data["answers"]]
+        if len(set(question_ids)) != len(question_ids):
+            raise ValidationError("Each question may only be answered once.")
+        members = set(
+            enrollment.assignment.questions.filter(id__in=question_ids).values_list(
+                "id", flat=True
+            )
+        )
+        foreign = [str(id) for id in question_ids if id not in members]
+        if foreign:
+            raise ValidationError(
+                f"Questions not in this assignment: {', '.join(foreign)}."
+            )
+
+        data["enrollment"] = enrollment
+        return data
@@ -0,0 +1,428 @@
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from assignments import leaderboard
+from assignments.models import Assignment, AssignmentEnrollment
+from questions.models import Question
+
+from . import queue, results, sandbox
+from .grading import grade_submission
+from .models import Answer, GradingJob, Submission
+
+QUICK_LIMITS = {**settings.SANDBOX_LIMITS, "wall_seconds": 1}
+
+
+def coding(source_tests, **data):
+    return {"language": "python", "tests": source_tests, **data}
+
+
+ADD = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+class SandboxTests(SimpleTestCase):
+    def test_verdicts(self):
+        tests = [{"input": "1 2\n", "output": "3\n"}]
+        for source, data, status in (
+            (ADD, {}, sandbox.PASSED),
+            ("print(4)", {}, sandbox.WRONG_ANSWER),
+            ("while True:\n    pass\n", {"time_limit": 1}, sandbox.TIME_LIMIT_EXCEEDED),
+            (
+                "x = bytearray(512 * 1024 * 1024)",
+                {"memory_limit": 64},
+                sandbox.MEMORY_LIMIT_EXCEEDED,
+            ),
+            ("raise SystemExit(3)", {}, sandbox.RUNTIME_ERROR),
+        ):
+            with self.subTest(status=status):
+                result = sandbox.run_submission(source, coding(tests, **data))
+                self.assertEqual(result["status"], status)
+                self.assertEqual(result["cases"][0]["status"], status)
+                self.assertEqual(result["passed"], int(status == sandbox.PASSED))
+
+    def test_fail_fast_stops_at_the_first_failure(self):
+        tests = [
+            {"input": "1 1\n", "output": "2"},
+            {"input": "1 2\n", "output": "4"},
+            {"input": "2 2\n", "output": "4"},
+        ]
+        result = sandbox.run_submission(ADD, coding(tests))
+        self.assertEqual(
+            [case["status"] for case in result["cases"]],
+            [sandbox.PASSED, sandbox.WRONG_ANSWER, sandbox.PASSED],
+        )
+        self.assertEqual((result["passed"], result["total"]), (2, 3))
+
+        result = sandbox.run_submission(ADD, coding(tests), fail_fast=True)
+        self.assertEqual(result["status"], sandbox.WRONG_ANSWER)
+        self.assertEqual(len(result["cases"]), 2)
+        self.assertEqual((result["passed"], result["total"]), (1, 3))
+
+    def test_sub_second_time_limits_round_up(self):
+        self.assertEqual(sandbox.limits_for({"time_limit": 0.5})["cpu_seconds"], 1)
+        self.assertEqual(sandbox.limits_for({"time_limit": 1.2})["cpu_seconds"], 2)
+
+    def test_test_cases_without_output_are_rejected_up_front(self):
+        result = sandbox.run_submission(
+            "print(1)", coding([{"input": "", "output": "1"}, {"input": "2"}])
+        )
+        self.assertEqual(result["status"], sandbox.INVALID_TESTS)
+        self.assertEqual(result["cases"], [])
+        self.assertIn("Test 2", result["error"])
+
+    @override_settings(SANDBOX_LIMITS=QUICK_LIMITS)
+    def test_processes_started_by_the_program_are_killed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            marker = os.path.join(directory, "escaped")
+            source = (
+                "import os, time\n"
+                "if os.fork() == 0:\n"
+                "    time.sleep(1.5)\n"
+                f"    open({marker!r}, 'w').close()\n"
+                "    os._exit(0)\n"
+                "time.sleep(60)\n"
+            )
+            result = sandbox.run_submission(source, coding([{"output": ""}]))
+            self.assertEqual(result["status"], sandbox.TIME_LIMIT_EXCEEDED)
+            time.sleep(2)
+            self.assertFalse(os.path.exists(marker))
+
+
+def create_submission(username="candidate", assignment=None):
+    user = User.objects.create_user(username)
+    if assignment is None:
+        assignment = Assignment.objects.create(title="a", description="d", creator=user)
+    enrollment = AssignmentEnrollment.objects.create(
+        user=user, assignment=assignment, status="approved"
+    )
+    return Submission.objects.create(enrollment=enrollment)
+
+
+class RecordingEngine:
+    """
+    Stands in for ``ExecutionEngine``: records the sources it is asked to
+    run and returns ``outcome`` for each.
+    """
+
+    def __init__(self, outcome=None):
+        self.outcome = outcome
+        self.sources = []
+
+    def submit(self, source, question_data):
+        self.sources.append(source)
+        future = Future()
+        future.set_result(self.outcome)
+        return future
+
+
+def answer_and_grade(submission, responses, engine=None):
+    for question, response in responses.items():
+        Answer.objects.create(
+            submission=submission, question=question, response=response
+        )
+    return grade_submission(submission, engine or RecordingEngine())
+
+
+class QueueTests(TestCase):
+    def test_claim_retry_and_complete(self):
+        job = queue.enqueue(create_submission())
+
+        (claimed,) = queue.claim()
+        self.assertEqual(
+            (claimed.id, claimed.status, claimed.attempts), (job.id, "running", 1)
+        )
+        self.assertEqual(queue.claim(), [])
+
+        queue.fail(claimed, "boom")
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.locked_by, job.last_error), ("queued", "", "boom")
+        )
+        self.assertGreater(job.run_after, timezone.now())
+        # Backing off: not ready yet.
+        self.assertEqual(queue.claim(), [])
+
+        GradingJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        (claimed,) = queue.claim()
+        self.assertEqual(claimed.attempts, 2)
+        queue.complete(claimed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), ("done", ""))
+
+    def test_jobs_fail_for_good_after_the_last_attempt(self):
+        job = queue.enqueue(create_submission())
+        GradingJob.objects.filter(id=job.id).update(
+            attempts=settings.GRADING_MAX_ATTEMPTS - 1
+        )
+        (claimed,) = queue.claim()
+        queue.fail(claimed, "boom")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.submission.status, "failed")
+        self.assertEqual(queue.claim(), [])
+
+    def abandoned_job(self, username, attempts):
+        job = queue.enqueue(create_submission(username))
+        stale = timezone.now() - timedelta(seconds=settings.GRADING_JOB_TIMEOUT + 1)
+        GradingJob.objects.filter(id=job.id).update(
+            status="running", locked_by="dead", locked_at=stale, attempts=attempts
+        )
+        return job
+
+    def test_abandoned_jobs_are_requeued_until_out_of_attempts(self):
+        retry = self.abandoned_job("retry", settings.GRADING_MAX_ATTEMPTS - 1)
+        spent = self.abandoned_job("spent", settings.GRADING_MAX_ATTEMPTS)
+        running = queue.enqueue(create_submission("running"))
+        (claimed,) = queue.claim()
+        self.assertEqual(claimed.id, running.id)
+
+        self.assertEqual(queue.requeue_abandoned(), (1, 1))
+
+        retry.refresh_from_db()
+        spent.refresh_from_db()
+        claimed.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by), ("queued", ""))
+        self.assertEqual(spent.status, "failed")
+        self.assertEqual(spent.submission.status, "failed")
+        self.assertEqual(claimed.status, "running")
+        self.assertEqual(queue.requeue_abandoned(), (0, 0))
+
+
+class GradingWorkerTests(TransactionTestCase):
+    def test_once_grades_the_queued_submissions_and_exits(self):
+        question = Question.objects.create(
+            title="q", data={"options": ["a", "b"], "answer": "a"}, type="mcq"
+        )
+        submissions = [create_submission(f"c{i}") for i in range(2)]
+        for submission, response in zip(submissions, ("a", "b")):
+            Answer.objects.create(
+                submission=submission, question=question, response=response
+            )
+            queue.enqueue(submission)
+
+        call_command(
+            "run_grading_worker", "--once", "--concurrency", "1", stdout=StringIO()
+        )
+
+        self.assertEqual(
+            list(GradingJob.objects.values_list("status", flat=True)), ["done"] * 2
+        )
+        for submission, score in zip(submissions, (1, 0)):
+            submission.refresh_from_db()
+            self.assertEqual((submission.status, submission.score), ("graded", score))
+
+
+class RegradeTests(TestCase):
+    def test_scores_follow_a_fixed_answer_key(self):
+        author = User.objects.create_user("author")
+        assignment = Assignment.objects.create(
+            title="a", description="d", creator=author
+        )
+        fixed = Question.objects.create(
+            title="fixed", data={"options": ["a", "b"], "answer": "a"}, type="mcq"
+        )
+        other = Question.objects.create(
+            title="other", data={"options": ["x", "y"], "answer": "x"}, type="mcq"
+        )
+        assignment.questions.add(fixed, other)
+        submissions = []
+        for username, responses in (("c1", "ax"), ("c2", "bx"), ("c3", "by")):
+            submission = create_submission(username, assignment)
+            answer_and_grade(submission, dict(zip((fixed, other), responses)))
+            submissions.append(submission)
+
+        fixed.data["answer"] = "b"
+        fixed.save()
+        out = StringIO()
+        call_command(
+            "regrade_assignment", assignment.id, "--chunk-size", "2", stdout=out
+        )
+        self.assertIn(
+            "Re-graded 3 submissions (6 answers): 3 answers and 3 scores changed.",
+            out.getvalue(),
+        )
+
+        self.assertEqual(
+            list(
+                Answer.objects.filter(question=fixed)
+                .order_by("submission_id")
+                .values_list("is_correct", flat=True)
+            ),
+            [False, True, True],
+        )
+        for submission, score in zip(submissions, (1, 2, 1)):
+            submission.refresh_from_db()
+            submission.enrollment.refresh_from_db()
+            self.assertEqual(submission.score, score)
+            self.assertEqual(submission.enrollment.score, score)
+        self.assertEqual(
+            [
+                (entry["username"], entry["rank"])
+                for entry in leaderboard.top(assignment.id, 10)
+            ],
+            [("c2", 1), ("c1", 2), ("c3", 2)],
+        )
+
+        out = StringIO()
+        call_command("regrade_assignment", assignment.id, stdout=out)
+        self.assertIn("0 answers and 0 scores changed.", out.getvalue())
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(
+            title="add",
+            data=coding([{"input": "1 2\n", "output": "3\n"}]),
+            type="coding",
+        )
+        self.engine = RecordingEngine(
+            {"status": sandbox.PASSED, "passed": 1, "total": 1}
+        )
+        self.candidates = 0
+
+    def grade(self, source):
+        self.candidates += 1
+        submission = create_submission(f"c{self.candidates}")
+        return answer_and_grade(submission, {self.question: source}, self.engine)
+
+    def test_identical_sources_are_run_once(self):
+        self.assertEqual(self.grade(ADD), 1)
+        # Same program, other line endings and trailing whitespace.
+        self.assertEqual(self.grade(ADD.replace("\n", "  \r\n")), 1)
+        self.assertEqual(self.engine.sources, [ADD])
+        self.assertEqual(
+            list(Answer.objects.values_list("result", flat=True)),
+            [{"status": sandbox.PASSED, "passed": 1, "total": 1}] * 2,
+        )
+
+        self.grade("print(3)")
+        self.assertEqual(len(self.engine.sources), 2)
+
+    def test_time_limit_results_are_not_reused(self):
+        self.engine.outcome = {
+            "status": sandbox.TIME_LIMIT_EXCEEDED,
+            "passed": 0,
+            "total": 1,
+        }
+        self.grade(ADD)
+        self.grade(ADD)
+        self.assertEqual(len(self.engine.sources), 2)
+
+    def edit_question(self, **changes):
+        admin = User.objects.create_superuser(f"admin{self.candidates}")
+        token = RefreshToken.for_user(admin).access_token
+        response = self.client.patch(
+            f"/api/questions/{self.question.id}/",
+            changes,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_editing_the_tests_invalidates_results(self):
+        self.grade(ADD)
+
+        # Edits that leave the tests alone keep the results.
+        self.edit_question(title="sum")
+        self.grade(ADD)
+        self.assertEqual(len(self.engine.sources), 1)
+
+        self.edit_question(data=coding([{"input": "2 2\n", "output": "4\n"}]))
+        self.grade(ADD)
+        self.assertEqual(len(self.engine.sources), 2)
+
+    def test_invalidation_holds_even_when_the_digest_is_unchanged(self):
+        self.grade(ADD)
+        results.invalidate_results(self.question)
+        self.grade(ADD)
+        self.assertEqual(len(self.engine.sources), 2)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user("author")
+        self.assignment = Assignment.objects.create(
+            title="a", description="d", creator=author
+        )
+        self.questions = [
+            Question.objects.create(
+                title=f"q{n}", data={"options": ["a", "b"], "answer": "a"}, type="mcq"
+            )
+            for n in range(2)
+        ]
+        self.assignment.questions.add(*self.questions)
+
+    def score(self, submission, score):
+        responses = ["a"] * score + ["b"] * (len(self.questions) - score)
+        answer_and_grade(submission, dict(zip(self.questions, responses)))
+
+    def standings(self):
+        return [
+            (entry["username"], entry["rank"], entry["score"])
+            for entry in leaderboard.top(self.assignment.id, 10)
+        ]
+
+    def test_ties_share_a_rank_in_the_order_they_were_reached(self):
+        submissions = {}
+        for username, score in (("c1", 2), ("c2", 1), ("c3", 2), ("c4", 0)):
+            submissions[username] = create_submission(username, self.assignment)
+            self.score(submissions[username], score)
+
+        self.assertEqual(
+            self.standings(),
+            [("c1", 1, 2), ("c3", 1, 2), ("c2", 3, 1), ("c4", 4, 0)],
+        )
+        user = submissions["c3"].enrollment.user_id
+        self.assertEqual(
+            leaderboard.rank_of(self.assignment.id, user), {"rank": 1, "score": 2}
+        )
+
+        # c2 resubmits and joins the tie at the top, behind those already there.
+        resubmission = Submission.objects.create(
+            enrollment=submissions["c2"].enrollment
+        )
+        self.score(resubmission, 2)
+        expected = [("c1", 1, 2), ("c3", 1, 2), ("c2", 1, 2), ("c4", 4, 0)]
+        self.assertEqual(self.standings(), expected)
+        user = submissions["c4"].enrollment.user_id
+        self.assertEqual(
+            leaderboard.rank_of(self.assignment.id, user), {"rank": 4, "score": 0}
+        )
+
+        self.assertEqual(leaderboard.rebuild(self.assignment.id), 4)
+        self.assertEqual(self.standings(), expected)
+
+    def test_view_lists_the_top_and_the_requesting_user(self):
+        for username, score in (("c1", 2), ("c2", 2), ("c3", 0)):
+            self.score(create_submission(username, self.assignment), score)
+        token = RefreshToken.for_user(User.objects.get(username="c3")).access_token
+
+        response = self.client.get(
+            f"/api/assignments/{self.assignment.id}/leaderboard/",
+            {"limit": 2},
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(
+            [(entry["username"], entry["rank"]) for entry in body["results"]],
+            [("c1", 1), ("c2", 1)],
+        )
+        self.assertEqual(body["me"], {"rank": 3, "score": 0})
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import SubmissionCreateView, SubmissionDetailView
+
+urlpatterns = [
+    path("submissions/", SubmissionCreateView.as_view(), name="submissions"),
+    path(
+        "submissions/<int:pk>/",
+        SubmissionDetailView.as_view(),
+        name="submission-detail",
+    ),
+]
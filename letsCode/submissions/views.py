@@ -0,0 +1,63 @@
+from django.db import transaction
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.status import HTTP_202_ACCEPTED
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from assignments.models import AssignmentEnrollment
+from user_profile.authentication import StatelessJWTAuthentication
+
+from .models import Answer, Submission
+from .queue import enqueue
+from .serializers import SubmissionCreateSerializer, SubmissionSerializer
+
+
+class SubmissionCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request):
+        """
+        Store an attempt and queue it for grading.
+
+        Grading happens in the ``run_grading_worker`` command, so this only
+        writes the submission, its answers and a grading job.
+
+        Returns:
+        - Response: The pending submission, with status 202.
+        """
+        serializer = SubmissionCreateSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        enrollment = serializer.validated_data["enrollment"]
+
+        with transaction.atomic():
+            submission = Submission.objects.create(enrollment=enrollment)
+            Answer.objects.bulk_create(
+                Answer(
+                    submission=submission,
+                    question_id=answer["question"],
+                    response=answer["response"],
+                )
+                for answer in serializer.validated_data["answers"]
+            )
+            enqueue(submission)
+            AssignmentEnrollment.objects.filter(id=enrollment.id).update(
+                status="attempted"
+            )
+
+        return Response(SubmissionSerializer(submission).data, status=HTTP_202_ACCEPTED)
+
+
+class SubmissionDetailView(RetrieveAPIView):
+    serializer_class = SubmissionSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get_queryset(self):
+        return Submission.objects.filter(
+            enrollment__user_id=self.request.user.id
+        ).prefetch_related("answers")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UserProfileConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_profile"
+
+    def ready(self):
+        # Registers the signal handlers that drop cached authentication state.
+        from . import authentication  # noqa: F401
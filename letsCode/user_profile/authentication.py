@@ -0,0 +1,174 @@
+"""
+JWT authentication that trusts claims signed into the token.
+
+``issue_tokens`` embeds the user's username, ``is_staff`` and role in the
+token, so ``StatelessJWTAuthentication`` can build ``request.user`` from the
+token alone instead of loading the ``User`` row on every request.
+
+To keep deactivation and password changes effective, each user's state is
+cached for ``AUTH_STATE_CACHE_TIMEOUT`` seconds and checked against the
+token: an inactive user, a changed password or a changed ``is_staff`` or
+role rejects it. The entry is dropped whenever the user is saved, so within
+one cache the change applies at once; other caches catch up within the
+timeout.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+STATE_KEY = "auth-state:{}"
+
+# Claims that must all be present for a token to be trusted without a lookup.
+CLAIMS = ("username", "is_staff", "role", api_settings.REVOKE_TOKEN_CLAIM)
+
+
+def role_of(user):
+    return "admin" if user.is_superuser else "candidate"
+
+
+def issue_tokens(user):
+    """
+    Return a refresh token, and its access token, carrying the user's claims.
+
+    Args:
+    - user (User): The authenticated user.
+
+    Returns:
+    - RefreshToken: The refresh token; ``.access_token`` has the same claims.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh["username"] = user.username
+    refresh["is_staff"] = user.is_staff
+    refresh["role"] = role_of(user)
+    refresh[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(user.password)
+    return refresh
+
+
+class ClaimsUser(TokenUser):
+    """
+    A user built from token claims, see ``TokenUser``.
+    """
+
+    @property
+    def is_superuser(self):
+        return self.token.get("role") == "admin"
+
+
+def _state_of(user):
+    if user is None:
+        return ()
+    return (
+        user.is_active,
+        user.is_staff,
+        role_of(user),
+        get_md5_hash_password(user.password),
+    )
+
+
+def _state_query(user_id):
+    return User.objects.filter(id=user_id).only(
+        "is_active", "is_staff", "is_superuser", "password"
+    )
+
+
+def user_state(user_id):
+    """
+    Return the cached ``(is_active, is_staff, role, password digest)`` of a
+    user.
+
+    Returns:
+    - tuple: The state, or None if the user does not exist.
+    """
+    key = STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = _state_of(_state_query(user_id).first())
+        cache.set(key, state, settings.AUTH_STATE_CACHE_TIMEOUT)
+    return state or None
+
+
+async def auser_state(user_id):
+    """
+    Async variant of ``user_state``.
+    """
+    key = STATE_KEY.format(user_id)
+    state = await cache.aget(key)
+    if state is None:
+        state = _state_of(await _state_query(user_id).afirst())
+        await cache.aset(key, state, settings.AUTH_STATE_CACHE_TIMEOUT)
+    return state or None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_state(sender, instance, **kwargs):
+    cache.delete(STATE_KEY.format(instance.id))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticate from the token's claims, without loading the user.
+
+    Tokens issued before the claims were added fall back to the regular
+    lookup in ``JWTAuthentication``.
+    """
+
+    def get_user(self, validated_token):
+        if not self.has_claims(validated_token):
+            return JWTAuthentication.get_user(self, validated_token)
+
+        user = super().get_user(validated_token)
+        self.check_state(validated_token, user_state(user.id))
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async variant of ``authenticate``, for async views.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if not self.has_claims(validated_token):
+            get_user = sync_to_async(JWTAuthentication.get_user)
+            return await get_user(self, validated_token), validated_token
+
+        user = super().get_user(validated_token)
+        self.check_state(validated_token, await auser_state(user.id))
+        return user, validated_token
+
+    def has_claims(self, validated_token):
+        return all(claim in validated_token for claim in CLAIMS)
+
+    def check_state(self, validated_token, state):
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        is_active, is_staff, role, password = state
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if validated_token[api_settings.REVOKE_TOKEN_CLAIM] != password:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        if validated_token["is_staff"] != is_staff or validated_token["role"] != role:
+            raise AuthenticationFailed(
+                _("The user's permissions have changed."), code="permissions_changed"
+            )
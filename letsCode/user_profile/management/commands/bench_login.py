@@ -0,0 +1,100 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+from letsCode.benchmarking import isolated_database, percentile
+
+PASSWORD = "bench-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark login throughput of the sync (WSGI) and async (ASGI) login "
+        "views under a burst of concurrent logins. Runs against a throwaway "
+        "test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Logins in flight at once (WSGI threads, or ASGI tasks).",
+        )
+        parser.add_argument(
+            "--session",
+            action="store_true",
+            help=(
+                "Also write a session, as browser clients do. SQLite test "
+                "databases reject concurrent session writes."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        count, concurrency = options["logins"], options["concurrency"]
+        with isolated_database():
+            # Hashing once and sharing the hash keeps seeding fast.
+            encoded = make_password(PASSWORD)
+            User.objects.bulk_create(
+                User(username=f"candidate{i}", password=encoded) for i in range(count)
+            )
+            bodies = [
+                {
+                    "username": f"candidate{i}",
+                    "password": PASSWORD,
+                    "session": options["session"],
+                }
+                for i in range(count)
+            ]
+
+            self.stdout.write(
+                f"{'view':>6} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+                f"{'p99 ms':>8} {'errors':>7}"
+            )
+            self.report("wsgi", *self.run_sync(bodies, concurrency))
+            self.report("asgi", *asyncio.run(self.run_async(bodies, concurrency)))
+
+    def run_sync(self, bodies, concurrency):
+        def login(body):
+            started = time.perf_counter()
+            response = Client(raise_request_exception=False).post(
+                "/api/login/", body, "application/json"
+            )
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(login, bodies))
+        return time.perf_counter() - started, results
+
+    async def run_async(self, bodies, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+
+        async def login(body):
+            async with slots:
+                started = time.perf_counter()
+                response = await AsyncClient(raise_request_exception=False).post(
+                    "/api/login/async/", body, "application/json"
+                )
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(login(body) for body in bodies))
+        return time.perf_counter() - started, results
+
+    def report(self, label, elapsed, results):
+        latencies = [seconds * 1000 for seconds, _ in results]
+        errors = sum(1 for _, status in results if status != 200)
+        self.stdout.write(
+            f"{label:>6} {len(results) / elapsed:>9.1f} "
+            f"{statistics.median(latencies):>8.1f} "
+            f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+            f"{errors:>7}"
+        )
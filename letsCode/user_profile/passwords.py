@@ -0,0 +1,52 @@
+"""
+Password checks off the event loop.
+
+PBKDF2 is deliberately slow, so the async login path runs it on a bounded
+pool of threads instead of the event loop. ``hashlib`` releases the GIL while
+hashing, so up to ``LOGIN_HASHING_WORKERS`` checks run in parallel while the
+loop keeps serving other requests; further logins wait in the pool's queue.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_pool = ThreadPoolExecutor(
+    max_workers=settings.LOGIN_HASHING_WORKERS or os.cpu_count(),
+    thread_name_prefix="login-hash",
+)
+
+
+def _verify(encoded, password):
+    upgrade = []
+    if encoded is None:
+        # Hash anyway so that unknown usernames take as long as wrong
+        # passwords, as Django's ModelBackend does.
+        make_password(password)
+        return False, None
+    valid = check_password(password, encoded, setter=upgrade.append)
+    # The hasher's settings changed: rehash now, while on the pool.
+    return valid, make_password(password) if valid and upgrade else None
+
+
+async def acheck_password(user, password):
+    """
+    Check a user's password on the hashing pool.
+
+    Args:
+    - user (User): The user, or None for an unknown username.
+    - password (str): The password to check.
+
+    Returns:
+    - bool: Whether the password is correct.
+    """
+    loop = asyncio.get_running_loop()
+    valid, upgraded = await loop.run_in_executor(
+        _pool, _verify, user.password if user else None, password
+    )
+    if upgraded:
+        user.password = upgraded
+        await user.asave(update_fields=["password"])
+    return valid
@@ -1,13 +1,15 @@
 from django.contrib.auth.models import User
-from django.db.models import Q
 from rest_framework.response import Response
 from rest_framework.serializers import (
+    BooleanField,
     CharField,
     EmailField,
     ModelSerializer,
     ValidationError,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from .authentication import issue_tokens, role_of
 
 
 class UserSerializer(ModelSerializer):
@@ -80,6 +82,30 @@ class UserCreationSerializer(ModelSerializer):
         return validated_data
 
 
+def login_payload(user):
+    """
+    Build the login response for an authenticated user.
+
+    Args:
+    - user (User): The user who logged in.
+
+    Returns:
+    - dict: The user's details with a fresh access and refresh token, which
+      carry the claims read by StatelessJWTAuthentication.
+    """
+    refresh = issue_tokens(user)
+    return {
+        "id": user.id,
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "role": role_of(user),
+        "access_token": str(refresh.access_token),
+        "refresh_token": str(refresh),
+    }
+
+
 class UserLoginSerializer(ModelSerializer):
     """
     Serializer for user login.
@@ -90,6 +116,8 @@ class UserLoginSerializer(ModelSerializer):
     - token (str): A token generated for the user's session.
     - first_name (str): The first name of the user.
     - last_name (str): The last name of the user.
+    - session (bool): Whether to also start a session, defaults to True.
+      JWT-only clients can pass False to skip the session write.
 
     Methods:
     - validate(data): Validates the user's login data.
@@ -102,6 +130,7 @@ class UserLoginSerializer(ModelSerializer):
     last_name = CharField(read_only=True)
     username = CharField(required=True)
     role = CharField(read_only=True)
+    session = BooleanField(default=True, write_only=True)
 
     class Meta:
         model = User
@@ -115,6 +144,7 @@ class UserLoginSerializer(ModelSerializer):
             "role",
             "access_token",
             "refresh_token",
+            "session",
         ]
         extra_kwargs = {"password": {"write_only": True}}
 
@@ -122,6 +152,9 @@ class UserLoginSerializer(ModelSerializer):
         """
         Validate the user's login data.
 
+        The authenticated user is kept on ``self.user`` so that the view does
+        not have to fetch it again.
+
         Args:
         - data (dict): The data to be validated.
 
@@ -135,22 +168,28 @@ class UserLoginSerializer(ModelSerializer):
         password = data.get("password", None)
         if not username:
             raise ValidationError("User is required to login.")
-        user = User.objects.filter(Q(username=username)).distinct()
-        user_obj = user.first()
-        if not user_obj or not user_obj.check_password(password):
+        user_obj = User.objects.filter(username=username).first()
+        if (
+            not user_obj
+            or not user_obj.check_password(password)
+            or not user_obj.is_active
+        ):
             raise ValidationError("Invalid Credentials please try again.")
 
-        refresh = RefreshToken.for_user(user_obj)
+        self.user = user_obj
+        data.update(login_payload(user_obj))
+        return data
 
-        data["access_token"] = str(refresh.access_token)
-        data["refresh_token"] = str(refresh)
-        data["first_name"] = user_obj.first_name
-        data["id"] = user_obj.id
-        data["last_name"] = user_obj.last_name
-        data["email"] = user_obj.email
-        data["role"] = "admin" if user_obj.is_superuser else "candidate"
 
-        return data
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer for /api/token/ whose tokens carry the same claims
+    as those issued at login.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return issue_tokens(user)
 
 
 class UserUpdateSerializer(ModelSerializer):
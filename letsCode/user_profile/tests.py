@@ -1,3 +1,185 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from assignments.models import Assignment, AssignmentEnrollment
+from letsCode.testing import QueryBudgetAssertionsMixin, handlers_without_budget
+
+from .authentication import issue_tokens
+
+ENROLLMENTS_URL = "/api/user-enrollments/"
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("candidate", password="secret")
+        assignment = Assignment.objects.create(
+            title="a", description="", creator=cls.user
+        )
+        AssignmentEnrollment.objects.create(
+            user=cls.user, assignment=assignment, status="approved"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def client_with(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def test_claims_token_skips_the_user_lookup(self):
+        client = self.client_with(issue_tokens(self.user).access_token)
+        # The first request reads the user's state into the cache.
+        with self.assertNumQueries(2):
+            response = client.get(ENROLLMENTS_URL)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        with self.assertNumQueries(1):
+            response = client.get(ENROLLMENTS_URL)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_token_without_claims_falls_back_to_the_lookup(self):
+        client = self.client_with(RefreshToken.for_user(self.user).access_token)
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                response = client.get(ENROLLMENTS_URL)
+            self.assertEqual(response.status_code, 200)
+
+    def test_login_issues_claims(self):
+        response = APIClient().post(
+            "/api/login/",
+            {"username": "candidate", "password": "secret", "session": False},
+            format="json",
+        )
+        client = self.client_with(response.data["access_token"])
+        client.get(ENROLLMENTS_URL)
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 200)
+
+    def test_deactivation_and_password_change_revoke_tokens(self):
+        client = self.client_with(issue_tokens(self.user).access_token)
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 200)
+
+        self.user.set_password("changed")
+        self.user.save()
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 401)
+
+        client = self.client_with(issue_tokens(self.user).access_token)
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 401)
+
+    def test_permission_change_revokes_tokens(self):
+        client = self.client_with(issue_tokens(self.user).access_token)
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 200)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(client.get(ENROLLMENTS_URL).status_code, 401)
+
+
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("candidate", password="secret")
+        cls.inactive = User.objects.create_user(
+            "inactive", password="secret", is_active=False
+        )
+
+    def login(self, path, **data):
+        return self.client.post(path, json.dumps(data), content_type="application/json")
+
+    def test_bad_credentials_and_inactive_users_are_refused(self):
+        for path in ("/api/login/", "/api/login/async/"):
+            for username, password in (
+                ("candidate", "wrong"),
+                ("nobody", "secret"),
+                ("inactive", "secret"),
+            ):
+                with self.subTest(path=path, username=username):
+                    response = self.login(path, username=username, password=password)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(
+                        response.json()["non_field_errors"],
+                        ["Invalid Credentials please try again."],
+                    )
+                    self.assertNotIn("_auth_user_id", self.client.session)
+
+    def test_session_flag_is_parsed_like_the_serializer(self):
+        for path in ("/api/login/", "/api/login/async/"):
+            for session, logged_in in (
+                ("false", False),
+                (0, False),
+                ("off", False),
+                ("true", True),
+                (1, True),
+            ):
+                with self.subTest(path=path, session=session):
+                    self.client.logout()
+                    response = self.login(
+                        path, username="candidate", password="secret", session=session
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual("_auth_user_id" in self.client.session, logged_in)
+
+            response = self.login(
+                path, username="candidate", password="secret", session="maybe"
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("session", response.json())
+
+
+class UserQueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("candidate", password="secret")
+
+    def send(self, method, path, data=None, token=None):
+        kwargs = {}
+        if token is not None:
+            kwargs["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        if data is not None:
+            kwargs.update(data=json.dumps(data), content_type="application/json")
+        return self.assertWithinQueryBudget(method, path, **kwargs)
+
+    def test_every_view_declares_a_budget(self):
+        self.assertEqual(handlers_without_budget("user_profile.views"), [])
 
-# Create your tests here.
+    def test_requests_stay_within_budget(self):
+        credentials = {"username": "candidate", "password": "secret"}
+        token = issue_tokens(self.user).access_token
+        response = self.send(
+            "POST",
+            "/api/register/",
+            {
+                "username": "new",
+                "email": "new@example.com",
+                "password": "secret",
+                "first_name": "New",
+                "last_name": "User",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        for path in ("/api/login/", "/api/login/async/"):
+            for session in (True, False):
+                data = {**credentials, "session": session}
+                self.assertEqual(self.send("POST", path, data).status_code, 200)
+        self.assertEqual(self.send("GET", "/api/update/", token=token).status_code, 200)
+        profile = {
+            "username": "candidate",
+            "first_name": "Can",
+            "last_name": "Didate",
+            "email": "candidate@example.com",
+        }
+        for method in ("PUT", "PATCH"):
+            response = self.send(method, "/api/update/", profile, token=token)
+            self.assertEqual(response.status_code, 200)
+        response = self.send("POST", "/api/logout/", {}, token=token)
+        self.assertEqual(response.status_code, 200)
@@ -1,6 +1,14 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth import login, logout
 from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import permissions
+from rest_framework.fields import empty
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
@@ -8,35 +16,41 @@ from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from letsCode.timing import query_budget
+
+from .passwords import acheck_password
 from .serializers import (
     UserCreationSerializer,
     UserLoginSerializer,
     UserUpdateSerializer,
+    login_payload,
 )
 
 
+@query_budget(post=3)
 class UserRegisterAPIView(CreateAPIView):
     """
     API view for user registration.
     Allows creating a new user using the UserCreationSerializer.
 
     Attributes:
-       serializer_class (class): The serializer class for user creation.
-       queryset (QuerySet): Queryset containing all User objects.
+    - serializer_class (class): The serializer class for user creation.
+    - queryset (QuerySet): Queryset containing all User objects.
     """
 
     serializer_class = UserCreationSerializer
     queryset = User.objects.all()
 
 
+@query_budget(post=5)
 class UserLoginAPIView(APIView):
     """
     API view for user login.
     Allows users to log in using the UserLoginSerializer.
 
     Attributes:
-        permission_classes (list): List of permission classes, allowing any user.
-        serializer_class (class): The serializer class for user login.
+    - permission_classes (list): List of permission classes, allowing any user.
+    - serializer_class (class): The serializer class for user login.
     """
 
     permission_classes = [permissions.AllowAny]
@@ -47,35 +61,100 @@ class UserLoginAPIView(APIView):
         Handle user login request.
 
         Args:
-            request (Request): The HTTP request object.
-            *args: Variable-length argument list.
-            **kwargs: Arbitrary keyword arguments.
+        - request (Request): The HTTP request object.
+        - *args: Variable-length argument list.
+        - **kwargs: Arbitrary keyword arguments.
 
         Returns:
-            Response: Response object with user data if login is successful,
-                      or error response with HTTP_400_BAD_REQUEST status.
+        - Response: Response object with user data if login is successful,
+          or error response with HTTP_400_BAD_REQUEST status.
         """
         data = request.data
         serializer = UserLoginSerializer(data=data)
         if serializer.is_valid(raise_exception=True):
             new_data = serializer.data
-            current_user = User.objects.get(username=serializer.data["username"])
-            login(request, current_user)
-            print(request.user)
+            if serializer.validated_data["session"]:
+                login(request, serializer.user)
             return Response(new_data, status=HTTP_200_OK)
 
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
+@method_decorator(csrf_exempt, name="dispatch")
+@query_budget(post=5)
+class AsyncUserLoginView(View):
+    """
+    Async login for ASGI deployments, with the same request and response as
+    UserLoginAPIView.
+
+    The user is fetched once and the password is checked on the bounded
+    hashing pool, so a burst of logins does not block the event loop. Clients
+    that only use the JWT pass ``"session": false`` to skip the session write.
+    """
+
+    http_method_names = ["post"]
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle user login request.
+
+        Args:
+        - request (HttpRequest): The HTTP request object.
+
+        Returns:
+        - JsonResponse: The user data with tokens if login is successful,
+          or the errors with HTTP_400_BAD_REQUEST status.
+        """
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse(
+                {"detail": "JSON parse error."}, status=HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(data, dict):
+            data = {}
+
+        errors = {
+            field: ["This field is required."]
+            for field in ("username", "password")
+            if not data.get(field)
+        }
+        # Parsed by the serializer's own field, so that "false", 0 and the
+        # like mean the same as on UserLoginAPIView.
+        try:
+            session = (
+                UserLoginSerializer()
+                .fields["session"]
+                .run_validation(data.get("session", empty))
+            )
+        except ValidationError as exc:
+            errors["session"] = exc.detail
+        if errors:
+            return JsonResponse(errors, status=HTTP_400_BAD_REQUEST)
+
+        user = await User.objects.filter(username=data["username"]).afirst()
+        valid = await acheck_password(user, data["password"])
+        if not valid or not user.is_active:
+            return JsonResponse(
+                {"non_field_errors": ["Invalid Credentials please try again."]},
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        if session:
+            await sync_to_async(login)(request, user)
+        return JsonResponse(login_payload(user), status=HTTP_200_OK)
+
+
+@query_budget(get=1, put=6, patch=6)
 class UserUpdateAPIView(RetrieveUpdateAPIView):
     """
     API view for updating user information.
     Allows authenticated users to retrieve and update their own user data.
 
     Attributes:
-        permission_classes (list): List of permission classes, requiring authentication.
-        queryset (QuerySet): Queryset containing all User objects.
-        serializer_class (class): The serializer class for user updates.
+    - permission_classes (list): List of permission classes, requiring authentication.
+    - queryset (QuerySet): Queryset containing all User objects.
+    - serializer_class (class): The serializer class for user updates.
     """
 
     permission_classes = [permissions.IsAuthenticated]
@@ -88,7 +167,7 @@ class UserUpdateAPIView(RetrieveUpdateAPIView):
         Get the user object associated with the current request.
 
         Returns:
-            User: The user object.
+        - User: The user object.
         """
         return self.request.user
 
@@ -103,6 +182,7 @@ class UserUpdateAPIView(RetrieveUpdateAPIView):
             return Response({"detail": str(e)}, status=HTTP_400_BAD_REQUEST)
 
 
+@query_budget(post=3)
 class UserLogoutAPIView(APIView):
     """
     API view for user logout.
@@ -117,10 +197,10 @@ class UserLogoutAPIView(APIView):
         Handle user logout request.
 
         Args:
-            request (Request): The HTTP request object.
+        - request (Request): The HTTP request object.
 
         Returns:
-            Response: Response object with HTTP_200_OK status indicating successful logout.
+        - Response: Response object with HTTP_200_OK status indicating successful logout.
         """
         logout(request)
         return Response("user logged out", status=HTTP_200_OK)